@@ -1,44 +1,136 @@
 # backend/app/core/compliance.py
+from dataclasses import dataclass, replace
+from datetime import datetime
+from functools import lru_cache
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from collections import Counter, OrderedDict
+import hashlib
+import logging
 import re
+import string
+import sys
+import threading
+import time
+
+from app.core.pii_audit import AuditEvent, BufferedAuditExporter, LangSmithAuditSink
+
+
+@dataclass(frozen=True, slots=True)
+class PIIMatch:
+    """A single PII span found in a piece of text"""
+    pii_type: str
+    start: int
+    end: int
+    value: str
+
+    @property
+    def masked(self) -> str:
+        return f"[{self.pii_type.upper()}_MASKED]"
+
+
+@dataclass(frozen=True, slots=True)
+class ScrubResult:
+    """Scrubbed text together with the spans (in the original text) that were masked"""
+    text: str
+    matches: Tuple[PIIMatch, ...]
+
+    @property
+    def pii_found(self) -> bool:
+        return bool(self.matches)
+
+
+@lru_cache(maxsize=8)
+def _compile_scanner(patterns: Tuple[Tuple[str, str], ...]) -> "re.Pattern[str]":
+    """Compile all PII patterns into one alternation of named groups.
+
+    Alternatives are tried in declaration order at each position, so earlier
+    entries win ties (e.g. NRIC before FIN) and the text is scanned once.
+    """
+    combined = "|".join(f"(?P<{pii_type}>{pattern})" for pii_type, pattern in patterns)
+    return re.compile(combined, re.IGNORECASE)
+
 
 class PII_Scrubber:
     """Singapore PDPA-compliant PII scrubber with cultural context awareness"""
     
-    # Singapore-specific PII patterns
+    # Singapore-specific PII patterns. Keys must be valid regex group names;
+    # open-ended runs are anchored with a lookbehind so each run is only
+    # attempted from its first character, keeping the scan linear.
     SINGAPORE_PII_PATTERNS = {
         'NRIC': r'[STFG]\d{7}[A-Z]',
         'FIN': r'[G]\d{7}[A-Z]',  # Foreign Identification Number
         'PHONE': r'(\+65\s?)?(\d{4}\s?\d{4}|\d{8})',  # Singapore phone format
-        'EMAIL': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-        'ADDRESS': r'(\d+\s+\w+\s+street|block\s+\d+\s+\w+|singapore\s+\d{6})',
+        'EMAIL': r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+        'ADDRESS': r'((?<!\d)\d+\s+\w+\s+street|block\s+\d+\s+\w+|singapore\s+\d{6})',
     }
     
-    def __init__(self, langsmith_client):
+    def __init__(self, langsmith_client, audit_exporter: Optional[BufferedAuditExporter] = None):
         self.langsmith_client = langsmith_client
         self.logger = logging.getLogger(__name__)
+        self._audit_exporter = audit_exporter
+
+    @property
+    def audit_exporter(self) -> BufferedAuditExporter:
+        """Batches audit events off the request path; created on first detection"""
+        if self._audit_exporter is None:
+            self._audit_exporter = BufferedAuditExporter(LangSmithAuditSink(self.langsmith_client))
+        return self._audit_exporter
+
+    @property
+    def scanner(self) -> "re.Pattern[str]":
+        """Combined single-pass pattern for SINGAPORE_PII_PATTERNS"""
+        return _compile_scanner(tuple(self.SINGAPORE_PII_PATTERNS.items()))
+
+    def find_pii(self, text: str) -> List[PIIMatch]:
+        """Return non-overlapping PII spans in ``text``, left to right"""
+        return [
+            PIIMatch(match.lastgroup, match.start(), match.end(), match.group())
+            for match in self.scanner.finditer(text)
+        ]
+
+    def scrub(self, text: str) -> ScrubResult:
+        """Mask every PII span in one pass over ``text`` without audit logging"""
+        matches = self.find_pii(text)
+        if not matches:
+            return ScrubResult(text, ())
+
+        parts = []
+        position = 0
+        for match in matches:
+            parts.append(text[position:match.start])
+            parts.append(match.masked)
+            position = match.end
+        parts.append(text[position:])
+        return ScrubResult("".join(parts), tuple(matches))
         
     def scrub_pii(self, text: str, session_id: str) -> str:
         """Scrub PII while preserving context for Singapore business conversations"""
-        scrubbed_text = text
-        
-        for pii_type, pattern in self.SINGAPORE_PII_PATTERNS.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                original = match.group()
-                masked = f"[{pii_type.upper()}_MASKED]"
-                scrubbed_text = scrubbed_text.replace(original, masked)
-                
-                # Log PII detection for audit trail
-                self.logger.info(f"PII detected: {pii_type} in session {session_id}")
-                self.langsmith_client.log_event(
-                    session_id=session_id,
-                    event_type="PII_DETECTED",
-                    details={"type": pii_type, "masked_value": masked}
-                )
-        
-        return scrubbed_text
+        result = self.scrub(text)
+        self.record(result, session_id)
+        return result.text
+
+    def record(self, result: ScrubResult, session_id: str) -> None:
+        """Write the audit trail for an already-computed scrub result"""
+        if not result.pii_found:
+            return
+        counts = Counter(match.pii_type for match in result.matches)
+        summary = ", ".join(f"{pii_type} x{count}" for pii_type, count in counts.items())
+        self.logger.info(f"PII detected: {summary} in session {session_id}")
+        for match in result.matches:
+            self.log_detection(match, session_id)
+
+    def log_detection(self, match: PIIMatch, session_id: str) -> None:
+        """Queue a PII_DETECTED event for the audit trail"""
+        self.audit_exporter.submit(AuditEvent(
+            session_id=session_id,
+            event_type="PII_DETECTED",
+            details={"type": match.pii_type, "masked_value": match.masked}
+        ))
+
+    def stream(self, session_id: str, **kwargs) -> "StreamingPIIScrubber":
+        """Create an incremental scrubber for chunked (e.g. token-streamed) text"""
+        return StreamingPIIScrubber(self, session_id, **kwargs)
     
     def create_compliance_trace(self, run_id: str, metadata: Dict[str, Any]):
         """Create LangSmith trace with PDPA compliance metadata"""
@@ -53,20 +145,200 @@ class PII_Scrubber:
         }
         return compliance_metadata
 
+# Characters an EMAIL match can span (local part, "@" and domain)
+_EMAIL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-@")
+
+
+class StreamingPIIScrubber:
+    """Incremental PII scrubber for text that arrives in chunks.
+
+    Each ``feed`` returns the longest prefix that can no longer change when
+    more text arrives, already masked. The trailing ``carry_words``
+    whitespace-delimited words (enough for "+65 9123 4567" or
+    "12 Orchard street") are held back so values split across chunk
+    boundaries are still caught. Text without spaces (Chinese and other CJK
+    replies) has no word boundaries to count, so when none falls inside the
+    last ``max_span`` characters (longer than any NRIC or phone value) only
+    that window is held back, widened to the start of any trailing run of
+    email characters so a long address is never split. The carry never
+    grows beyond ``max_carry`` characters; a single token longer than that
+    is cut, trading detection of pathological values for bounded memory.
+    """
+
+    def __init__(
+        self,
+        scrubber: PII_Scrubber,
+        session_id: str,
+        carry_words: int = 3,
+        max_span: int = 40,
+        max_carry: int = 256,
+    ):
+        self.scrubber = scrubber
+        self.session_id = session_id
+        self.carry_words = carry_words
+        self.max_span = max_span
+        self.max_carry = max_carry
+        self.matches: List[PIIMatch] = []
+        self._carry = ""
+        self._offset = 0  # position of the carry in the overall stream
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the scrubbed text that is now safe to emit"""
+        buffer = self._carry + chunk
+        cut = self._holdback_start(buffer)
+        return self._emit(buffer, cut)
+
+    def flush(self) -> str:
+        """Scrub and return whatever is still held back at end of stream"""
+        buffer, self._carry = self._carry, ""
+        return self._emit(buffer, len(buffer))
+
+    def _holdback_start(self, buffer: str) -> int:
+        """Start of the trailing words that may still be part of a PII value"""
+        window_start = max(len(buffer) - self.max_span, 0)
+        if not any(char.isspace() for char in buffer[window_start:]):
+            cut = window_start
+            while cut > 0 and buffer[cut - 1] in _EMAIL_CHARS:
+                cut -= 1
+            return max(cut, len(buffer) - self.max_carry)
+        cut = len(buffer)
+        words = 0
+        while cut > 0 and words < self.carry_words:
+            while cut > 0 and buffer[cut - 1].isspace():
+                cut -= 1
+            while cut > 0 and not buffer[cut - 1].isspace():
+                cut -= 1
+            words += 1
+        return max(cut, len(buffer) - self.max_carry)
+
+    def _emit(self, buffer: str, cut: int) -> str:
+        parts = []
+        position = 0
+        for match in self.scrubber.find_pii(buffer):
+            if match.end > cut or match.end == cut < len(buffer):
+                # Straddles or follows the cut: keep it whole in the carry
+                cut = min(cut, match.start)
+                break
+            parts.append(buffer[position:match.start])
+            parts.append(match.masked)
+            position = match.end
+
+            stream_match = PIIMatch(
+                match.pii_type,
+                self._offset + match.start,
+                self._offset + match.end,
+                match.value,
+            )
+            self.matches.append(stream_match)
+            self.scrubber.log_detection(stream_match, self.session_id)
+
+        parts.append(buffer[position:cut])
+        self._carry = buffer[cut:]
+        self._offset += cut
+        return "".join(parts)
+
+
+class ScrubCache:
+    """Thread-safe LRU/TTL cache of scrub results keyed by a content hash.
+
+    Only the masked text and match positions are kept (the original PII
+    values are dropped), so the cache never holds raw personal data.
+    ``max_bytes`` bounds the approximate memory held by cached text.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 3600.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[float, int, ScrubResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[ScrubResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: bytes, result: ScrubResult) -> None:
+        result = ScrubResult(
+            result.text, tuple(replace(match, value="") for match in result.matches)
+        )
+        size = sys.getsizeof(result.text) + 64 * len(result.matches)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, result)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: bytes) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
 # Integration with LangChain
 from langchain_community.callbacks import LangChainTracer
 
 class PDPA_Compliant_Tracer(LangChainTracer):
     """Custom tracer that enforces Singapore PDPA compliance"""
+
+    # Prompts are cached per blank-line separated segment (system prompt,
+    # each retrieved chunk, each turn), so only novel text is re-scanned.
+    SEGMENT_SEPARATOR = re.compile(r"(\n\s*\n)")
+    # Below this length hashing costs about as much as scanning
+    MIN_CACHED_SEGMENT = 64
     
-    def __init__(self, langsmith_client, pii_scrubber):
+    def __init__(self, langsmith_client, pii_scrubber, scrub_cache: Optional[ScrubCache] = None):
         super().__init__(client=langsmith_client)
         self.pii_scrubber = pii_scrubber
+        self.scrub_cache = scrub_cache or ScrubCache()
         
     def on_llm_start(self, serialized, prompts, **kwargs):
         # Scrub PII from prompts before tracing
-        scrubbed_prompts = [
-            self.pii_scrubber.scrub_pii(prompt, kwargs.get('session_id', 'unknown'))
-            for prompt in prompts
-        ]
+        session_id = kwargs.get('session_id', 'unknown')
+        scrubbed_prompts = [self._scrub_prompt(prompt, session_id) for prompt in prompts]
         return super().on_llm_start(serialized, scrubbed_prompts, **kwargs)
+
+    def _scrub_prompt(self, prompt: str, session_id: str) -> str:
+        parts = []
+        for segment in self.SEGMENT_SEPARATOR.split(prompt):
+            if len(segment) < self.MIN_CACHED_SEGMENT:
+                result = self.pii_scrubber.scrub(segment)
+            else:
+                key = self.scrub_cache.key(segment)
+                result = self.scrub_cache.get(key)
+                if result is None:
+                    result = self.pii_scrubber.scrub(segment)
+                    self.scrub_cache.put(key, result)
+            self.pii_scrubber.record(result, session_id)
+            parts.append(result.text)
+        return "".join(parts)
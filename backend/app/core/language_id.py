@@ -0,0 +1,168 @@
+# backend/app/core/language_id.py
+from dataclasses import dataclass
+from typing import Dict, Optional
+import math
+import re
+
+# Unicode script runs. Counting run lengths (rather than characters one by one)
+# keeps the histogram to a handful of regex passes in C.
+HAN_RUNS = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+TAMIL_RUNS = re.compile(r"[\u0b80-\u0bff]+")
+LATIN_RUNS = re.compile(r"[A-Za-z\u00c0-\u024f]+")
+
+# Seed text for the Malay/English character trigram model. Kept to the kind of
+# enquiries SMBs actually receive; a few hundred words per language is enough
+# to separate the two reliably on sentence-length input.
+_SEED_CORPUS = {
+    "en": """
+        hello i would like to know the price of this product
+        what are your opening hours on weekends and public holidays
+        do you deliver to jurong west and how much is the delivery fee
+        can i make an appointment for tomorrow afternoon
+        thank you for your help i will wait for your reply
+        is this item still available in stock
+        how long does shipping usually take
+        i want to return my order because it arrived damaged
+        please send me the invoice for my last purchase
+        could you tell me where your shop is located
+        do you accept credit card or paynow payment
+        my order has not arrived yet can you check the status
+        is there any discount for bulk orders
+        what is the warranty period for this service
+        can someone call me back about the quotation
+        i need help with my account password
+        the booking confirmation email did not come through
+        are you open on sunday morning
+        how do i cancel my subscription
+        please let me know if there are other colours available
+        good morning i have a question about your services
+        we are a small company looking for a reliable supplier
+        which branch is nearest to the mrt station
+        the staff were very friendly and helpful
+        i would like to speak with a customer service officer
+    """,
+    "ms": """
+        selamat pagi saya ingin tahu harga produk ini
+        bilakah waktu operasi kedai pada hujung minggu dan cuti umum
+        adakah anda menghantar ke jurong barat dan berapa caj penghantaran
+        boleh saya buat temujanji untuk petang esok
+        terima kasih atas bantuan anda saya akan tunggu jawapan
+        adakah barang ini masih ada dalam stok
+        berapa lama biasanya penghantaran mengambil masa
+        saya mahu memulangkan pesanan saya kerana rosak semasa sampai
+        sila hantar invois untuk pembelian saya yang terakhir
+        boleh beritahu saya di mana kedai anda terletak
+        adakah anda terima kad kredit atau bayaran paynow
+        pesanan saya belum sampai lagi boleh semak status
+        ada diskaun untuk pesanan secara pukal
+        berapa lama tempoh jaminan untuk perkhidmatan ini
+        boleh seseorang hubungi saya semula tentang sebut harga
+        saya perlukan bantuan dengan kata laluan akaun saya
+        emel pengesahan tempahan tidak diterima
+        adakah kedai dibuka pada pagi ahad
+        bagaimana saya boleh membatalkan langganan saya
+        sila maklumkan jika ada warna lain yang tersedia
+        selamat petang saya ada soalan tentang perkhidmatan syarikat anda
+        kami syarikat kecil yang mencari pembekal yang boleh dipercayai
+        cawangan mana yang paling dekat dengan stesen mrt
+        kakitangan sangat mesra dan membantu
+        saya ingin bercakap dengan pegawai khidmat pelanggan
+    """,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class DetectionResult:
+    """Language code plus the detector's confidence in it (0-1)"""
+    lang: str
+    confidence: float
+
+
+class _TrigramModel:
+    """Add-one smoothed character trigram log-probabilities for one language"""
+
+    def __init__(self, text: str):
+        counts: Dict[str, int] = {}
+        for trigram in _trigrams(text):
+            counts[trigram] = counts.get(trigram, 0) + 1
+        total = sum(counts.values())
+        # +1 bucket for everything unseen
+        denominator = total + len(counts) + 1
+        self.log_probs = {t: math.log((c + 1) / denominator) for t, c in counts.items()}
+        self.unseen = math.log(1 / denominator)
+
+    def score(self, trigram: str) -> float:
+        return self.log_probs.get(trigram, self.unseen)
+
+
+def _trigrams(text: str):
+    for word in LATIN_RUNS.findall(text.lower()):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+
+class LocalLanguageDetector:
+    """Offline Singapore language detector.
+
+    A script histogram settles Mandarin (Han) and Tamil outright; Latin-script
+    text is split between English and Malay by a character trigram model
+    weighted with the Singapore traffic priors. Runs in microseconds with no
+    network access; callers should only fall back to a remote detector when
+    ``confidence`` is low.
+    """
+
+    # Share of letters that must be in a script to call it by script alone
+    SCRIPT_DOMINANCE = 0.3
+
+    def __init__(self, priors: Optional[Dict[str, float]] = None):
+        priors = priors or {"en": 0.5, "ms": 0.5}
+        self._prior_log_ratio = math.log(priors["ms"] / priors["en"])
+        # Collapse both models into one Malay-over-English table: one lookup per trigram
+        en, ms = (_TrigramModel(_SEED_CORPUS[lang]) for lang in ("en", "ms"))
+        self._log_ratios = {
+            trigram: ms.score(trigram) - en.score(trigram)
+            for trigram in en.log_probs.keys() | ms.log_probs.keys()
+        }
+        self._unseen_log_ratio = ms.unseen - en.unseen
+
+    def detect(self, text: str) -> DetectionResult:
+        han = _run_length(HAN_RUNS, text)
+        tamil = _run_length(TAMIL_RUNS, text)
+        latin = _run_length(LATIN_RUNS, text)
+        letters = han + tamil + latin
+        if not letters:
+            # Digits, emoji, punctuation: nothing to detect, answer in English
+            return DetectionResult("en", 1.0)
+
+        if han / letters >= self.SCRIPT_DOMINANCE and han >= tamil:
+            return DetectionResult("zh", min(1.0, 0.5 + han / letters))
+        if tamil / letters >= self.SCRIPT_DOMINANCE:
+            return DetectionResult("ta", min(1.0, 0.5 + tamil / letters))
+
+        # Log-likelihood ratio of Malay over English, starting from the prior
+        log_ratios, unseen = self._log_ratios, self._unseen_log_ratio
+        log_ratio = self._prior_log_ratio
+        for trigram in _trigrams(text):
+            log_ratio += log_ratios.get(trigram, unseen)
+
+        log_ratio = max(-50.0, min(50.0, log_ratio))
+        p_malay = 1 / (1 + math.exp(-log_ratio))
+        if p_malay >= 0.5:
+            return DetectionResult("ms", p_malay)
+        return DetectionResult("en", 1 - p_malay)
+
+
+def _run_length(pattern: "re.Pattern[str]", text: str) -> int:
+    return sum(match.end() - match.start() for match in pattern.finditer(text))
+
+
+def dominant_script(text: str) -> str:
+    """Cheap script signature: "han", "tamil", "latin" or "none" (no letters)"""
+    counts = {
+        "han": _run_length(HAN_RUNS, text),
+        "tamil": _run_length(TAMIL_RUNS, text),
+        "latin": _run_length(LATIN_RUNS, text),
+    }
+    script = max(counts, key=counts.get)
+    return script if counts[script] else "none"
@@ -1,22 +1,144 @@
 # backend/app/core/multilingual.py
+from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Any, Optional
-import spacy
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+import asyncio
+import csv
+import json
+import logging
 from googletrans import Translator
 
+from app.core.language_id import DetectionResult, LocalLanguageDetector
+from app.core.nlp_models import SpacyModelPool
+from app.core.phrase_index import PhraseIndex
+from app.core.translation_cache import TranslationCache
+from app.core.translation_service import AsyncTranslationService, CircuitOpen, TranslationUnavailable
+
+if TYPE_CHECKING:
+    from app.core.segmenter import Segment
+    from app.core.session_language import SessionLanguageCache
+
+logger = logging.getLogger(__name__)
+
 class SingaporeLanguage(Enum):
     ENGLISH = "en"
     MANDARIN = "zh"
     MALAY = "ms"
     TAMIL = "ta"
 
+# Common Singapore phrases that identify a language outright
+SINGAPORE_PHRASES: Dict[str, List[str]] = {
+    'zh': ['你好', '谢谢', '请问', '多少钱'],
+    'ms': ['selamat', 'terima kasih', 'berapa', 'boleh'],
+    'ta': ['வணக்கம்', 'நன்றி', 'எவ்வளவு', 'உதவி']
+}
+
+# Built once per process and shared by detectors without extra phrases
+_DEFAULT_PHRASE_INDEX = PhraseIndex(SINGAPORE_PHRASES)
+
+# Source-language business terms that translators tend to leave untranslated
+BUSINESS_TERMS: Dict[str, Dict[str, str]] = {
+    'zh': {
+        '公司': 'company',
+        '产品': 'product',
+        '服务': 'service',
+        '价格': 'price',
+        '折扣': 'discount'
+    },
+    'ms': {
+        'syarikat': 'company',
+        'produk': 'product',
+        'perkhidmatan': 'service',
+        'harga': 'price',
+        'diskaun': 'discount'
+    },
+    'ta': {
+        'நிறுவனம்': 'company',
+        'பொருள்': 'product',
+        'சேவை': 'service',
+        'விலை': 'price',
+        'தள்ளுபடி': 'discount'
+    }
+}
+
+
+def load_glossary(path: str) -> Dict[str, Dict[str, str]]:
+    """Load business terms as {lang: {term: replacement}}.
+    
+    ``.json`` files hold that mapping directly; anything else is read as CSV
+    with ``lang,term,replacement`` columns (header row optional).
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        glossary: Dict[str, Dict[str, str]] = {}
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0].strip().lower() == "lang":
+                continue
+            lang, term, replacement = (cell.strip() for cell in row[:3])
+            glossary.setdefault(SingaporeLanguage(lang).value, {})[term] = replacement
+        return glossary
+
+
+def _build_term_indexes(*glossaries: Mapping[str, Mapping[str, str]]) -> Dict[str, PhraseIndex]:
+    """One substitution index per language, later glossaries overriding earlier ones"""
+    indexes: Dict[str, PhraseIndex] = {}
+    for glossary in glossaries:
+        for lang, terms in glossary.items():
+            index = indexes.setdefault(lang, PhraseIndex())
+            for term, replacement in terms.items():
+                index.add(replacement, [term])
+    return indexes
+
+
+_DEFAULT_TERM_INDEXES = _build_term_indexes(BUSINESS_TERMS)
+
+
+@dataclass(frozen=True)
+class BatchTranslation:
+    """One ``translate_many`` result; ``text`` falls back to the input when ``error`` is set"""
+    source_text: str
+    source_lang: SingaporeLanguage
+    text: str
+    error: Optional[str] = None
+
+
 class LanguageDetector:
     """Singapore-optimized language detection with cultural context"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        preload_languages: Optional[Iterable[SingaporeLanguage]] = None,
+        nlp_memory_budget_mb: float = 500.0,
+        extra_phrases: Optional[Mapping[str, Iterable[str]]] = None,
+        translation_cache: Optional[TranslationCache] = None,
+        translation_service: Optional[AsyncTranslationService] = None,
+        glossary_path: Optional[str] = None,
+        session_languages: Optional["SessionLanguageCache"] = None,
+        segment_code_mixed: bool = False,
+    ):
         self.translator = Translator()
-        self.nlp_models = {}
-        self._load_nlp_models()
+        # Async callers go through a deadline-bounded, circuit-broken wrapper
+        self.translation_service = translation_service or AsyncTranslationService(self.translator)
+        # Local LRU, optionally backed by Redis when a client is configured
+        self.translation_cache = translation_cache or TranslationCache()
+        
+        # Phrase fast-path; configured extras get their own index, built once here
+        self.phrase_index = _DEFAULT_PHRASE_INDEX
+        if extra_phrases:
+            self.phrase_index = PhraseIndex(SINGAPORE_PHRASES)
+            for lang, phrases in extra_phrases.items():
+                self.phrase_index.add(SingaporeLanguage(lang).value, phrases)
+        # Business-term substitution tables, compiled once per language
+        self.business_term_indexes = _DEFAULT_TERM_INDEXES
+        if glossary_path:
+            self.business_term_indexes = _build_term_indexes(
+                BUSINESS_TERMS, load_glossary(glossary_path)
+            )
+        
+        # spaCy pipelines are loaded per language on first use, within a memory budget
+        self.nlp_models = SpacyModelPool(memory_budget_mb=nlp_memory_budget_mb)
+        self._load_nlp_models(preload_languages or ())
         
         # Singapore-specific language weights
         self.SINGAPORE_LANGUAGE_WEIGHTS = {
@@ -25,33 +147,88 @@ class LanguageDetector:
             'ms': 0.07, # Malay - national language
             'ta': 0.03  # Tamil - minority community
         }
+        
+        # Offline detector; the remote translator is only asked below this confidence
+        self.local_detector = LocalLanguageDetector(priors=self.SINGAPORE_LANGUAGE_WEIGHTS)
+        self.local_confidence_threshold = 0.9
+        
+        # Sticky per-session languages, used when callers pass a session_id
+        self.session_languages = session_languages
+        
+        # Code-mixed messages get only their non-English runs translated
+        self.code_mix = None
+        if segment_code_mixed:
+            from app.core.segmenter import CodeMixTranslator  # imports this module
+            self.code_mix = CodeMixTranslator(self)
     
-    def _load_nlp_models(self):
-        """Load lightweight NLP models for language detection"""
-        for lang in SingaporeLanguage:
-            try:
-                self.nlp_models[lang.value] = spacy.load(f"{lang.value}_core_web_sm")
-            except:
-                self.nlp_models[lang.value] = None
+    def _load_nlp_models(self, languages: Iterable[SingaporeLanguage]):
+        """Eagerly load lightweight NLP models for the given languages only"""
+        self.nlp_models.preload(lang.value for lang in languages)
+    
+    def get_nlp_model(self, lang: SingaporeLanguage):
+        """spaCy pipeline for ``lang`` (None if not installed); blocks while loading"""
+        return self.nlp_models.get(lang.value)
+    
+    async def aget_nlp_model(self, lang: SingaporeLanguage):
+        """spaCy pipeline for ``lang``, loaded off the event loop"""
+        return await self.nlp_models.aget(lang.value)
     
     def detect_language(self, text: str, context: Dict[str, Any] = None) -> SingaporeLanguage:
         """Detect language with Singapore cultural context awareness"""
+        decided, local = self._detect_offline(text)
+        if decided is not None:
+            return decided
         
-        # First pass: Fast pattern matching for common Singapore phrases
-        singapore_phrases = {
-            'zh': ['你好', '谢谢', '请问', '多少钱'],
-            'ms': ['selamat', 'terima kasih', 'berapa', 'boleh'],
-            'ta': ['வணக்கம்', 'நன்றி', 'எவ்வளவு', 'உதவி']
-        }
+        detected_lang = local.lang
+        if local.confidence < self.local_confidence_threshold:
+            # Truly ambiguous text: ask the remote detector, keep the local guess on failure
+            try:
+                detected_lang = self.translator.detect(text).lang
+            except Exception as e:
+                logger.warning(f"Remote language detection failed: {e}")
         
-        text_lower = text.lower()
-        for lang, phrases in singapore_phrases.items():
-            if any(phrase in text_lower for phrase in phrases):
-                return SingaporeLanguage(lang)
+        return self._resolve_language(detected_lang, context)
+    
+    async def adetect_language(
+        self, text: str, context: Dict[str, Any] = None, session_id: Optional[str] = None
+    ) -> SingaporeLanguage:
+        """Non-blocking ``detect_language``; the remote fallback is deadline-bounded.
         
-        # Second pass: Statistical detection with cultural weights
-        detected_lang = self.translator.detect(text).lang
+        With a ``session_id`` and a session language cache, a session whose
+        language is already settled skips detection entirely.
+        """
+        if session_id is not None and self.session_languages is not None:
+            return await self.session_languages.detect(session_id, text, self._adetect, context)
+        return await self._adetect(text, context)
+    
+    async def _adetect(self, text: str, context: Optional[Dict[str, Any]]) -> SingaporeLanguage:
+        decided, local = self._detect_offline(text)
+        if decided is not None:
+            return decided
         
+        detected_lang = local.lang
+        if local.confidence < self.local_confidence_threshold:
+            try:
+                detected_lang = await self.translation_service.detect(text)
+            except TranslationUnavailable as e:
+                logger.info(f"Remote language detection unavailable, using local guess: {e}")
+        
+        return self._resolve_language(detected_lang, context)
+    
+    def _detect_offline(self, text: str) -> Tuple[Optional[SingaporeLanguage], Optional[DetectionResult]]:
+        """Phrase fast-path decision, else the local detector's scored guess"""
+        # First pass: One scan for common Singapore phrases. Code-mixed messages
+        # go to the language with the most hits, ties to the more common language.
+        phrase_hits = self.phrase_index.count(text)
+        if phrase_hits:
+            weights = self.SINGAPORE_LANGUAGE_WEIGHTS
+            best = max(phrase_hits, key=lambda lang: (phrase_hits[lang], weights.get(lang, 0)))
+            return SingaporeLanguage(best), None
+        
+        # Second pass: Offline script histogram + n-gram model with cultural weights
+        return None, self.local_detector.detect(text)
+    
+    def _resolve_language(self, detected_lang: str, context: Optional[Dict[str, Any]]) -> SingaporeLanguage:
         # Apply Singapore context weighting
         if detected_lang not in [lang.value for lang in SingaporeLanguage]:
             # Default to English for Singapore business context
@@ -75,40 +252,171 @@ class LanguageDetector:
         if source_lang == SingaporeLanguage.ENGLISH:
             return text
             
+        cached = self.translation_cache.get(source_lang.value, text)
+        if cached is not None:
+            if cached.failed:
+                return text
+            return self._preserve_business_context(cached.text, source_lang)
+            
         try:
             translation = self.translator.translate(text, src=source_lang.value, dest='en')
-            return self._preserve_business_context(translation.text, source_lang)
         except Exception as e:
             logger.warning(f"Translation failed: {e}")
+            self.translation_cache.set_failure(source_lang.value, text)
+            return text
+        
+        # Cache the raw translation so glossary changes apply to cached entries too
+        self.translation_cache.set(source_lang.value, text, translation.text)
+        return self._preserve_business_context(translation.text, source_lang)
+    
+    async def atranslate_to_english(self, text: str, source_lang: SingaporeLanguage) -> str:
+        """Non-blocking ``translate_to_english``; returns ``text`` unchanged when
+        the translator times out, fails or its circuit is open"""
+        if source_lang == SingaporeLanguage.ENGLISH:
             return text
+        
+        if self.code_mix is not None:
+            segments = self.code_mix.mixed_segments(text)
+            if segments is not None:
+                return (await self.code_mix.translate_segmented([segments]))[0].text
+        
+        cached = await self.translation_cache.aget(source_lang.value, text)
+        if cached is not None:
+            if cached.failed:
+                return text
+            return self._preserve_business_context(cached.text, source_lang)
+        
+        try:
+            translated = await self.translation_service.translate(text, src=source_lang.value, dest='en')
+        except CircuitOpen:
+            return text
+        except TranslationUnavailable as e:
+            logger.warning(f"Translation failed: {e}")
+            await self.translation_cache.aset_failure(source_lang.value, text)
+            return text
+        
+        await self.translation_cache.aset(source_lang.value, text, translated)
+        return self._preserve_business_context(translated, source_lang)
+    
+    async def translate_many(
+        self,
+        texts: Sequence[str],
+        source_lang: Optional[SingaporeLanguage] = None,
+        max_concurrency: int = 4,
+        batch_size: int = 50,
+        batch_chars: int = 4500,
+        segment_code_mixed: bool = True,
+    ) -> List[BatchTranslation]:
+        """Translate many texts to English, results in input order.
+        
+        Duplicates are translated once. Texts are grouped by (given or
+        detected) language and sent in batches of at most ``batch_size``
+        texts / ``batch_chars`` characters, ``max_concurrency`` batches at a
+        time. A failed batch marks each of its items with an error and
+        returns the original text for them.
+        
+        On a detector built with ``segment_code_mixed``, texts mixing English
+        with another language contribute only their non-English runs to those
+        batches and are stitched back afterwards; pass
+        ``segment_code_mixed=False`` to send whole texts for this call.
+        """
+        unique = list(dict.fromkeys(texts))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def detect(text: str) -> SingaporeLanguage:
+            async with semaphore:
+                return await self.adetect_language(text)
+        
+        if source_lang is None:
+            languages = await asyncio.gather(*(detect(text) for text in unique))
+        else:
+            languages = [source_lang] * len(unique)
+        
+        # Keyed by language too: a code-mixed run can repeat a whole text in another language
+        results: Dict[Tuple[SingaporeLanguage, str], BatchTranslation] = {}
+        by_lang: Dict[SingaporeLanguage, Dict[str, None]] = {}
+        mixed: Dict[str, List["Segment"]] = {}
+        segmenter = self.code_mix if segment_code_mixed else None
+        for text, lang in zip(unique, languages):
+            if lang == SingaporeLanguage.ENGLISH:
+                results[(lang, text)] = BatchTranslation(text, lang, text)
+                continue
+            segments = segmenter.mixed_segments(text) if segmenter is not None else None
+            if segments is None:
+                by_lang.setdefault(lang, {})[text] = None
+                continue
+            mixed[text] = segments
+            for segment in segments:
+                if segment.lang != SingaporeLanguage.ENGLISH:
+                    by_lang.setdefault(segment.lang, {})[segment.text] = None
+        
+        # One cache round trip per language instead of one per text
+        pending: Dict[SingaporeLanguage, List[str]] = {}
+        for lang, lang_texts in by_lang.items():
+            lang_texts = list(lang_texts)
+            cached_entries = await self.translation_cache.aget_many(lang.value, lang_texts)
+            for text, cached in zip(lang_texts, cached_entries):
+                if cached is None:
+                    pending.setdefault(lang, []).append(text)
+                elif cached.failed:
+                    results[(lang, text)] = BatchTranslation(text, lang, text, "translation recently failed")
+                else:
+                    results[(lang, text)] = BatchTranslation(
+                        text, lang, self._preserve_business_context(cached.text, lang)
+                    )
+        
+        async def translate_batch(lang: SingaporeLanguage, batch: List[str]) -> None:
+            async with semaphore:
+                try:
+                    translated = await self.translation_service.translate_batch(
+                        batch, src=lang.value, dest='en'
+                    )
+                except TranslationUnavailable as e:
+                    for text in batch:
+                        results[(lang, text)] = BatchTranslation(text, lang, text, str(e))
+                    return
+            if len(translated) != len(batch):
+                # Results can no longer be matched to inputs, so none are trusted
+                error = f"translator returned {len(translated)} results for {len(batch)} texts"
+                logger.warning(f"Batch translation ({lang.value}) failed: {error}")
+                for text in batch:
+                    results[(lang, text)] = BatchTranslation(text, lang, text, error)
+                return
+            await self.translation_cache.aset_many(lang.value, zip(batch, translated))
+            for text, english in zip(batch, translated):
+                results[(lang, text)] = BatchTranslation(
+                    text, lang, self._preserve_business_context(english, lang)
+                )
+        
+        await asyncio.gather(*(
+            translate_batch(lang, batch)
+            for lang, lang_texts in pending.items()
+            for batch in _batches(lang_texts, batch_size, batch_chars)
+        ))
+        
+        lang_of = dict(zip(unique, languages))
+        for text, segments in mixed.items():
+            stitched = self.code_mix.assemble(segments, results)
+            results[(lang_of[text], text)] = BatchTranslation(text, lang_of[text], stitched.text, stitched.error)
+        return [results[(lang_of[text], text)] for text in texts]
     
     def _preserve_business_context(self, text: str, source_lang: SingaporeLanguage) -> str:
         """Preserve Singapore business context during translation"""
-        business_terms = {
-            'zh': {
-                '公司': 'company',
-                '产品': 'product',
-                '服务': 'service',
-                '价格': 'price',
-                '折扣': 'discount'
-            },
-            'ms': {
-                'syarikat': 'company',
-                'produk': 'product',
-                'perkhidmatan': 'service',
-                'harga': 'price',
-                'diskaun': 'discount'
-            },
-            'ta': {
-                'நிறுவனம்': 'company',
-                'பொருள்': 'product',
-                'சேவை': 'service',
-                'விலை': 'price',
-                'தள்ளுபடி': 'discount'
-            }
-        }
-        
-        for term, replacement in business_terms.get(source_lang.value, {}).items():
-            if term in text:
-                text = text.replace(term, replacement)
-        return text
+        index = self.business_term_indexes.get(source_lang.value)
+        if index is None:
+            return text
+        return index.sub(text)
+
+
+def _batches(texts: List[str], max_items: int, max_chars: int) -> Iterable[List[str]]:
+    """Split texts into batches bounded by item count and total characters"""
+    batch: List[str] = []
+    chars = 0
+    for text in texts:
+        if batch and (len(batch) >= max_items or chars + len(text) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield batch
@@ -0,0 +1,120 @@
+# backend/app/core/nlp_models.py
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set
+import asyncio
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Used when the process RSS cannot be read (non-Linux) or the delta is noise
+DEFAULT_MODEL_MB = 60.0
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size in MB, if the platform exposes it cheaply"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class SpacyModelPool:
+    """Load spaCy pipelines on first use and keep them within a memory budget.
+
+    Models are kept in least-recently-used order; once the estimated total
+    exceeds ``memory_budget_mb`` the coldest models are dropped (the one just
+    requested is always kept). Sizes are estimated from the RSS growth
+    observed while loading, so the budget is approximate. Languages whose
+    model is not installed are remembered and not retried.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: float = 500.0,
+        model_name_template: str = "{lang}_core_web_sm",
+    ):
+        self.memory_budget_mb = memory_budget_mb
+        self.model_name_template = model_name_template
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, float] = {}
+        self._missing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, lang: str) -> Optional[Any]:
+        """Return the pipeline for ``lang``, loading it (blocking) if needed"""
+        with self._lock:
+            if lang in self._models:
+                self._models.move_to_end(lang)
+                return self._models[lang]
+            if lang in self._missing:
+                return None
+            load_lock = self._load_locks.setdefault(lang, threading.Lock())
+
+        # One loader per language; other callers for the same language wait
+        with load_lock:
+            with self._lock:
+                if lang in self._models:
+                    self._models.move_to_end(lang)
+                    return self._models[lang]
+                if lang in self._missing:
+                    return None
+            return self._load(lang)
+
+    async def aget(self, lang: str) -> Optional[Any]:
+        """Like ``get`` but loads in a worker thread so the event loop keeps running"""
+        with self._lock:
+            if lang in self._models:
+                self._models.move_to_end(lang)
+                return self._models[lang]
+            if lang in self._missing:
+                return None
+        return await asyncio.to_thread(self.get, lang)
+
+    def preload(self, langs: Iterable[str]) -> None:
+        for lang in langs:
+            self.get(lang)
+
+    def loaded(self) -> Dict[str, float]:
+        """Loaded languages with their estimated size in MB, coldest first"""
+        with self._lock:
+            return {lang: self._sizes[lang] for lang in self._models}
+
+    def _load(self, lang: str) -> Optional[Any]:
+        import spacy
+
+        before = _rss_mb()
+        try:
+            model = spacy.load(self.model_name_template.format(lang=lang))
+        except Exception as e:
+            logger.info(f"No spaCy model for '{lang}': {e}")
+            with self._lock:
+                self._missing.add(lang)
+            return None
+        after = _rss_mb()
+
+        size = DEFAULT_MODEL_MB
+        if before is not None and after is not None and after - before > 1.0:
+            size = after - before
+
+        with self._lock:
+            self._models[lang] = model
+            self._sizes[lang] = size
+            self._evict(keep=lang)
+        logger.info(f"Loaded spaCy model for '{lang}' (~{size:.0f} MB)")
+        return model
+
+    def _evict(self, keep: str) -> None:
+        total = sum(self._sizes[lang] for lang in self._models)
+        for lang in list(self._models):
+            if total <= self.memory_budget_mb:
+                break
+            if lang == keep:
+                continue
+            del self._models[lang]
+            total -= self._sizes.pop(lang)
+            logger.info(f"Evicted spaCy model for '{lang}' to stay within memory budget")
@@ -0,0 +1,105 @@
+# backend/app/core/phrase_index.py
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import string
+import threading
+
+# Case folding must keep offsets aligned with the original text, and
+# str.lower() does not ("İ" lowers to two characters), so only ASCII is folded.
+_ASCII_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Trie nodes are plain dicts of char -> child; the label of a phrase ending at
+# a node is stored under this key, which no single character can collide with
+_LABEL = ""
+
+
+class PhraseIndex:
+    """Labelled phrase table matched in a single pass over the text.
+
+    Phrases are compiled into a character trie. At each position the text is
+    walked down the trie and the longest phrase found wins, so a lookup costs
+    at most the longest phrase length per character regardless of how many
+    phrases are registered. Adding phrases only marks the index stale; it is
+    rebuilt once on the next lookup, never per request. Matching is substring
+    matching, case-insensitive for ASCII letters.
+    """
+
+    def __init__(self, phrases: Optional[Mapping[str, Iterable[str]]] = None):
+        self._labels: Dict[str, str] = {}
+        self._trie: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        for label, label_phrases in (phrases or {}).items():
+            self.add(label, label_phrases)
+
+    def add(self, label: str, phrases: Iterable[str]) -> None:
+        """Register ``phrases`` under ``label`` (later registrations win on duplicates)"""
+        with self._lock:
+            for phrase in phrases:
+                if phrase:
+                    self._labels[phrase.translate(_ASCII_FOLD)] = label
+            self._trie = None
+
+    def labels(self) -> Dict[str, str]:
+        """Copy of the phrase -> label table"""
+        with self._lock:
+            return dict(self._labels)
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """(start, end, label) for every non-overlapping phrase hit, left to right"""
+        trie = self._compiled()
+        if trie is None:
+            return []
+        folded = text.translate(_ASCII_FOLD)
+        length = len(folded)
+        hits: List[Tuple[int, int, str]] = []
+        start = 0
+        while start < length:
+            node = trie
+            best: Optional[Tuple[int, str]] = None
+            pos = start
+            while pos < length:
+                node = node.get(folded[pos])
+                if node is None:
+                    break
+                pos += 1
+                label = node.get(_LABEL)
+                if label is not None:
+                    best = (pos, label)
+            if best is None:
+                start += 1
+            else:
+                hits.append((start, best[0], best[1]))
+                start = best[0]
+        return hits
+
+    def count(self, text: str) -> "Counter[str]":
+        """Number of phrase hits per label"""
+        return Counter(label for _, _, label in self.find(text))
+
+    def sub(self, text: str) -> str:
+        """Replace every phrase hit with its label in one linear pass"""
+        parts: List[str] = []
+        last = 0
+        for start, end, label in self.find(text):
+            parts.append(text[last:start])
+            parts.append(label)
+            last = end
+        if not parts:
+            return text
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def _compiled(self) -> Optional[Dict[str, Any]]:
+        trie = self._trie
+        if trie is None and self._labels:
+            with self._lock:
+                if self._trie is None:
+                    root: Dict[str, Any] = {}
+                    for phrase, label in self._labels.items():
+                        node = root
+                        for char in phrase:
+                            node = node.setdefault(char, {})
+                        node[_LABEL] = label
+                    self._trie = root
+                trie = self._trie
+        return trie
@@ -0,0 +1,181 @@
+# backend/app/core/pii_audit.py
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Protocol
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class AuditEvent:
+    """A single compliance audit event (e.g. PII_DETECTED)"""
+    session_id: str
+    event_type: str
+    details: Dict[str, Any]
+    timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+class AuditSink(Protocol):
+    """Destination for batches of audit events"""
+
+    def write_batch(self, events: List[AuditEvent]) -> None: ...
+
+
+class LangSmithAuditSink:
+    """Forward audit events to the tracing client off the request path"""
+
+    def __init__(self, langsmith_client):
+        self.langsmith_client = langsmith_client
+
+    def write_batch(self, events: List[AuditEvent]) -> None:
+        log_events = getattr(self.langsmith_client, "log_events", None)
+        if log_events is not None:
+            log_events([asdict(event) for event in events])
+            return
+        for event in events:
+            self.langsmith_client.log_event(
+                session_id=event.session_id,
+                event_type=event.event_type,
+                details=event.details,
+            )
+
+
+class SQLiteAuditSink:
+    """Local SQLite audit trail, usable without a live tracing service"""
+
+    def __init__(self, path: str = "pii_audit.db"):
+        self.path = path
+        # Only the exporter's flusher thread writes after construction
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS audit_events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " session_id TEXT NOT NULL,"
+            " event_type TEXT NOT NULL,"
+            " details TEXT NOT NULL,"
+            " timestamp TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def write_batch(self, events: List[AuditEvent]) -> None:
+        self._conn.executemany(
+            "INSERT INTO audit_events (session_id, event_type, details, timestamp)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                (event.session_id, event.event_type, json.dumps(event.details), event.timestamp)
+                for event in events
+            ],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class BufferedAuditExporter:
+    """Bounded in-process queue with a background flusher.
+
+    ``submit`` never blocks: when the queue is full, or the exporter is
+    closed, the event is dropped and counted. The flusher thread writes a
+    batch to the sink once ``batch_size`` events are pending or
+    ``flush_interval`` seconds have passed since the first pending event.
+    """
+
+    def __init__(
+        self,
+        sink: AuditSink,
+        max_queue_size: int = 10_000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[AuditEvent]]" = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {"submitted": 0, "exported": 0, "dropped": 0, "failed": 0, "batches": 0}
+        self._closed = False
+        # Orders submits against close, so nothing is queued behind the sentinel
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="pii-audit-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: AuditEvent) -> bool:
+        """Enqueue an event; returns False if it was dropped"""
+        with self._submit_lock:
+            accepted = not self._closed
+            if accepted:
+                try:
+                    self._queue.put_nowait(event)
+                except queue.Full:
+                    accepted = False
+        if not accepted:
+            self._count("dropped")
+            return False
+        self._count("submitted")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Counters plus the current queue depth"""
+        with self._stats_lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending events and stop the flusher thread"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+        # The sentinel must get through even if the queue is full
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def __enter__(self) -> "BufferedAuditExporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _run(self) -> None:
+        batch: List[AuditEvent] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                event = False  # interval elapsed
+
+            if event:
+                batch.append(event)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                self._export(batch)
+                batch = []
+            deadline = None
+            if event is None:
+                return
+
+    def _export(self, batch: List[AuditEvent]) -> None:
+        try:
+            self.sink.write_batch(batch)
+        except Exception as e:
+            self._count("failed", len(batch))
+            logger.warning(f"Audit export failed for {len(batch)} events: {e}")
+        else:
+            self._count("exported", len(batch))
+            self._count("batches")
@@ -0,0 +1,202 @@
+# backend/app/core/segmenter.py
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import asyncio
+import re
+
+from app.core.language_id import HAN_RUNS, LATIN_RUNS, TAMIL_RUNS, LocalLanguageDetector
+from app.core.multilingual import BatchTranslation, LanguageDetector, SingaporeLanguage
+from app.core.phrase_index import PhraseIndex
+
+_SCRIPT_RUNS = re.compile(
+    f"(?P<zh>{HAN_RUNS.pattern})|(?P<ta>{TAMIL_RUNS.pattern})|(?P<latin>{LATIN_RUNS.pattern})"
+)
+_CLAUSE_BREAKS = re.compile(r"[.!?,;:\n。，！？；：]")
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    """A single-language run of a message"""
+    start: int
+    end: int
+    lang: SingaporeLanguage
+    text: str
+
+
+@dataclass(frozen=True)
+class SegmentedTranslation:
+    """Stitched English text plus how much of the message needed translating;
+    ``error`` is set when a run kept its original text because translation failed"""
+    text: str
+    segments: List[Segment]
+    translated_chars: int
+    total_chars: int
+    error: Optional[str] = None
+
+
+class CodeMixSegmenter:
+    """Split code-mixed (Singlish) messages into single-language runs.
+
+    Han and Tamil runs are labelled by script. A Latin-script clause is
+    labelled as a whole when the local detector is confident it is not
+    English; otherwise only phrases from the phrase table keep their
+    language and the rest stays English. Whitespace, digits and punctuation
+    join a surrounding run of the same language, or the English passthrough.
+    """
+
+    def __init__(
+        self,
+        phrase_index: PhraseIndex,
+        local_detector: LocalLanguageDetector,
+        clause_confidence: float = 0.9,
+        min_clause_words: int = 3,
+    ):
+        self.phrase_index = phrase_index
+        self.local_detector = local_detector
+        self.clause_confidence = clause_confidence
+        self.min_clause_words = min_clause_words
+
+    def segment(self, text: str) -> List[Segment]:
+        tokens = [[m.start(), m.end(), m.lastgroup] for m in _SCRIPT_RUNS.finditer(text)]
+        self._label_latin(text, tokens)
+
+        runs: List[List] = []
+        position = 0
+        for start, end, lang in tokens:
+            if runs and runs[-1][2] == lang:
+                runs[-1][1] = end  # absorb the gap between same-language tokens
+            else:
+                if start > position:
+                    _extend(runs, position, start, "en")
+                _extend(runs, start, end, lang)
+            position = end
+        if position < len(text):
+            _extend(runs, position, len(text), "en")
+        return [Segment(start, end, SingaporeLanguage(lang), text[start:end]) for start, end, lang in runs]
+
+    def _label_latin(self, text: str, tokens: List[List]) -> None:
+        latin = [token for token in tokens if token[2] == "latin"]
+        if not latin:
+            return
+        for token in latin:
+            token[2] = "en"
+
+        # Whole clauses the local model is sure are not English
+        index = 0
+        for clause_end in [m.start() for m in _CLAUSE_BREAKS.finditer(text)] + [len(text)]:
+            clause = []
+            while index < len(latin) and latin[index][0] < clause_end:
+                clause.append(latin[index])
+                index += 1
+            if len(clause) < self.min_clause_words:
+                continue
+            result = self.local_detector.detect(" ".join(text[s:e] for s, e, _ in clause))
+            if result.lang != "en" and result.confidence >= self.clause_confidence:
+                for token in clause:
+                    token[2] = result.lang
+
+        # Known phrases inside otherwise English clauses
+        hits = self.phrase_index.find(text)
+        index = 0
+        for token in latin:
+            while index < len(hits) and hits[index][1] <= token[0]:
+                index += 1
+            if token[2] == "en" and index < len(hits) and hits[index][0] < token[1]:
+                token[2] = hits[index][2]
+
+
+class CodeMixTranslator:
+    """Translate only the non-English runs of a message and stitch it back.
+
+    Most Singlish traffic is English with the odd Malay or Chinese phrase;
+    sending just those runs (batched per language through
+    ``LanguageDetector.translate_many``) keeps the English untouched and
+    cuts the characters sent to the translator accordingly.
+    ``LanguageDetector(segment_code_mixed=True)`` routes code-mixed messages
+    here from ``atranslate_to_english`` and ``translate_many``.
+    """
+
+    def __init__(self, detector: LanguageDetector, segmenter: CodeMixSegmenter = None):
+        self.detector = detector
+        self.segmenter = segmenter or CodeMixSegmenter(detector.phrase_index, detector.local_detector)
+        self.metrics = {"messages": 0, "total_chars": 0, "translated_chars": 0}
+
+    def mixed_segments(self, text: str) -> Optional[List[Segment]]:
+        """Segments of ``text`` when it mixes English words with another language"""
+        segments = self.segmenter.segment(text)
+        has_foreign = has_english = False
+        for segment in segments:
+            if segment.lang != SingaporeLanguage.ENGLISH:
+                has_foreign = True
+            elif any(ch.isalpha() for ch in segment.text):
+                has_english = True
+        return segments if has_foreign and has_english else None
+
+    async def translate(self, text: str) -> SegmentedTranslation:
+        return (await self.translate_segmented([self.segmenter.segment(text)]))[0]
+
+    async def translate_many(self, texts: Sequence[str]) -> List[SegmentedTranslation]:
+        return await self.translate_segmented([self.segmenter.segment(text) for text in texts])
+
+    async def translate_segmented(self, messages: Sequence[List[Segment]]) -> List[SegmentedTranslation]:
+        """Translate already segmented messages, one batch per language for all of them"""
+        foreign: Dict[SingaporeLanguage, Dict[str, None]] = {}
+        for segments in messages:
+            for segment in segments:
+                if segment.lang != SingaporeLanguage.ENGLISH:
+                    foreign.setdefault(segment.lang, {})[segment.text] = None
+
+        translations: Dict[Tuple[SingaporeLanguage, str], BatchTranslation] = {}
+        if foreign:
+            languages = list(foreign)
+            results = await asyncio.gather(*(
+                self.detector.translate_many(list(foreign[lang]), source_lang=lang, segment_code_mixed=False)
+                for lang in languages
+            ))
+            for lang, batch in zip(languages, results):
+                for translation in batch:
+                    translations[(lang, translation.source_text)] = translation
+        return [self.assemble(segments, translations) for segments in messages]
+
+    def assemble(
+        self,
+        segments: List[Segment],
+        translations: Mapping[Tuple[SingaporeLanguage, str], BatchTranslation],
+    ) -> SegmentedTranslation:
+        """Stitch a message from its English runs and the translations of the rest"""
+        parts = [segment.text for segment in segments]
+        translated = [segment.lang != SingaporeLanguage.ENGLISH for segment in segments]
+        error = None
+        for i, segment in enumerate(segments):
+            if translated[i]:
+                translation = translations[(segment.lang, segment.text)]
+                parts[i] = translation.text
+                error = error or translation.error
+        translated_chars = sum(len(s.text) for s, t in zip(segments, translated) if t)
+        total_chars = sum(len(s.text) for s in segments)
+        self.metrics["messages"] += 1
+        self.metrics["total_chars"] += total_chars
+        self.metrics["translated_chars"] += translated_chars
+        return SegmentedTranslation(
+            _stitch(parts, translated), segments, translated_chars, total_chars, error
+        )
+
+
+def _extend(runs: List[List], start: int, end: int, lang: str) -> None:
+    if runs and runs[-1][2] == lang:
+        runs[-1][1] = end
+    else:
+        runs.append([start, end, lang])
+
+
+def _stitch(parts: Sequence[str], translated: Sequence[bool]) -> str:
+    """Join segments, adding a space where a translated run would otherwise
+    run into an adjacent word (Chinese is written without spaces)"""
+    out: List[str] = []
+    for i, part in enumerate(parts):
+        if not part:
+            continue
+        if out and (translated[i] or translated[i - 1]) and out[-1][-1].isalnum() and part[0].isalnum():
+            out.append(" ")
+        out.append(part)
+    return "".join(out)
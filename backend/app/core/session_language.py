@@ -0,0 +1,204 @@
+# backend/app/core/session_language.py
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+
+from app.core.language_id import dominant_script
+from app.core.multilingual import SingaporeLanguage
+
+logger = logging.getLogger(__name__)
+
+# Scripts that identify the language on their own
+_DECISIVE_SCRIPTS = {"han": SingaporeLanguage.MANDARIN, "tamil": SingaporeLanguage.TAMIL}
+
+DetectFn = Callable[[str, Optional[Dict[str, Any]]], Awaitable[SingaporeLanguage]]
+
+
+@dataclass
+class SessionLanguage:
+    """Language currently attached to a chat session"""
+    lang: SingaporeLanguage
+    script: str
+    streak: int = 1  # consecutive detections that agreed
+
+
+class ConversationLanguageWriter:
+    """Batch write-back of session languages to ``conversations.detected_language``.
+
+    Updates are coalesced per session and flushed with a single UPDATE
+    either every ``flush_interval`` seconds (when started) or on ``flush()``.
+    """
+
+    def __init__(self, session_factory, flush_interval: float = 5.0):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, session_id: str, lang: SingaporeLanguage) -> None:
+        self._pending[session_id] = lang.value
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    text(
+                        "UPDATE conversations AS c SET detected_language = v.lang"
+                        " FROM (SELECT unnest(CAST(:session_ids AS text[])) AS session_id,"
+                        " unnest(CAST(:langs AS text[])) AS lang) AS v"
+                        " WHERE c.session_id = v.session_id"
+                        " AND c.detected_language IS DISTINCT FROM v.lang"
+                    ),
+                    {"session_ids": list(pending), "langs": list(pending.values())},
+                )
+                await session.commit()
+        except Exception as e:
+            # Keep newer values recorded meanwhile; retry the rest next flush
+            self._pending = {**pending, **self._pending}
+            logger.warning(f"Language write-back failed for {len(pending)} sessions: {e}")
+            return 0
+        return len(pending)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+class SessionLanguageCache:
+    """Sticky per-session language so follow-up messages skip detection.
+
+    Once a session's language is confident (decided by script, or
+    ``sticky_after`` consecutive detections agree) later messages reuse it
+    as long as their dominant script is unchanged; a script change (e.g. a
+    customer switching from English to Chinese) triggers a fresh detection.
+    State lives in an in-process LRU and, when a ``redis.asyncio`` client is
+    given, in a Redis hash shared across workers.
+
+    Used through ``LanguageDetector(session_languages=...)``: passing a
+    ``session_id`` to ``adetect_language`` routes detection through here.
+    """
+
+    KEY_PREFIX = "session_lang:"
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        writer: Optional[ConversationLanguageWriter] = None,
+        ttl_seconds: int = 1800,
+        max_local_sessions: int = 50_000,
+        sticky_after: int = 2,
+    ):
+        self.redis = redis_client
+        self.writer = writer
+        self.ttl_seconds = ttl_seconds
+        self.max_local_sessions = max_local_sessions
+        self.sticky_after = sticky_after
+        self._local: "OrderedDict[str, Tuple[float, SessionLanguage]]" = OrderedDict()
+        self.metrics = {"sticky_hits": 0, "detections": 0, "redis_errors": 0}
+
+    async def detect(
+        self,
+        session_id: str,
+        text: str,
+        detect: DetectFn,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> SingaporeLanguage:
+        """Session language for ``text``, calling ``detect`` only when not sticky"""
+        script = dominant_script(text)
+        state = await self._load(session_id)
+        if state is not None and self._is_sticky(state) and script in (state.script, "none"):
+            self.metrics["sticky_hits"] += 1
+            return state.lang
+
+        self.metrics["detections"] += 1
+        lang = await detect(text, context)
+        if state is not None and state.lang == lang and state.script == script:
+            state.streak += 1
+        else:
+            if self.writer is not None and (state is None or state.lang != lang):
+                self.writer.record(session_id, lang)
+            state = SessionLanguage(lang, script)
+        await self._save(session_id, state)
+        return lang
+
+    async def prime(self, session_id: str, lang: SingaporeLanguage) -> None:
+        """Seed from a stored answer (conversation row or customer preference)"""
+        script = next((s for s, l in _DECISIVE_SCRIPTS.items() if l == lang), "latin")
+        await self._save(session_id, SessionLanguage(lang, script, self.sticky_after))
+
+    def _is_sticky(self, state: SessionLanguage) -> bool:
+        return state.script in _DECISIVE_SCRIPTS or state.streak >= self.sticky_after
+
+    async def _load(self, session_id: str) -> Optional[SessionLanguage]:
+        item = self._local.get(session_id)
+        if item is not None:
+            expires_at, state = item
+            if expires_at >= time.monotonic():
+                self._local.move_to_end(session_id)
+                return state
+            del self._local[session_id]
+
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.hgetall(f"{self.KEY_PREFIX}{session_id}")
+        except Exception as e:
+            self.metrics["redis_errors"] += 1
+            logger.warning(f"Session language read failed: {e}")
+            return None
+        if not raw:
+            return None
+        raw = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in raw.items()
+        }
+        state = SessionLanguage(SingaporeLanguage(raw["lang"]), raw["script"], int(raw["streak"]))
+        self._remember(session_id, state)
+        return state
+
+    async def _save(self, session_id: str, state: SessionLanguage) -> None:
+        self._remember(session_id, state)
+        if self.redis is None:
+            return
+        key = f"{self.KEY_PREFIX}{session_id}"
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(key, mapping={
+                "lang": state.lang.value,
+                "script": state.script,
+                "streak": state.streak,
+            })
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            self.metrics["redis_errors"] += 1
+            logger.warning(f"Session language write failed: {e}")
+
+    def _remember(self, session_id: str, state: SessionLanguage) -> None:
+        self._local[session_id] = (time.monotonic() + self.ttl_seconds, state)
+        self._local.move_to_end(session_id)
+        while len(self._local) > self.max_local_sessions:
+            self._local.popitem(last=False)
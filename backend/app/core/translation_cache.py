@@ -0,0 +1,243 @@
+# backend/app/core/translation_cache.py
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_for_cache(text: str) -> str:
+    """Collapse the differences that never change a translation"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+@dataclass(frozen=True, slots=True)
+class CachedTranslation:
+    """Cached outcome of a translation; ``text`` is None for a cached failure"""
+    text: Optional[str]
+
+    @property
+    def failed(self) -> bool:
+        return self.text is None
+
+
+class TranslationCache:
+    """In-process LRU in front of an optional shared Redis cache.
+
+    Keys are a hash of (source language, normalized text), so neither tier
+    stores customer text as a key. Successful translations live for ``ttl``
+    seconds; failures are cached for ``negative_ttl`` seconds so a failing
+    upstream is not hammered with the same text. Redis errors are logged and
+    treated as misses. ``get``/``set`` need a sync ``redis.Redis`` client;
+    the async methods accept either a sync client, whose calls are moved off
+    the event loop into a worker thread, or a ``redis.asyncio`` client.
+    ``aget_many``/``aset_many`` cost one Redis round trip per call however
+    many texts they cover.
+    """
+
+    KEY_PREFIX = "translation:v1:"
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        max_local_entries: int = 10_000,
+        ttl: int = 7 * 24 * 3600,
+        negative_ttl: int = 60,
+        local_ttl: Optional[int] = 3600,
+    ):
+        self.redis = redis_client
+        self.max_local_entries = max_local_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local_ttl = local_ttl
+        self._local: "OrderedDict[str, Tuple[float, CachedTranslation]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "redis_errors": 0,
+        }
+
+    def key(self, source_lang: str, text: str) -> str:
+        digest = hashlib.blake2b(
+            f"{source_lang}\x00{normalize_for_cache(text)}".encode("utf-8", "surrogatepass"),
+            digest_size=16,
+        ).hexdigest()
+        return f"{self.KEY_PREFIX}{digest}"
+
+    def get(self, source_lang: str, text: str) -> Optional[CachedTranslation]:
+        key = self.key(source_lang, text)
+        entry = self._get_local(key)
+        if entry is not None:
+            return entry
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(key)
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Translation cache read failed: {e}")
+            else:
+                if raw is not None:
+                    return self._accept_remote(key, raw)
+
+        self._count("misses")
+        return None
+
+    def set(self, source_lang: str, text: str, translation: str) -> None:
+        self._store(self.key(source_lang, text), CachedTranslation(translation), self.ttl)
+
+    def set_failure(self, source_lang: str, text: str) -> None:
+        self._store(self.key(source_lang, text), CachedTranslation(None), self.negative_ttl)
+
+    async def aget(self, source_lang: str, text: str) -> Optional[CachedTranslation]:
+        return (await self.aget_many(source_lang, [text]))[0]
+
+    async def aget_many(
+        self, source_lang: str, texts: Sequence[str]
+    ) -> List[Optional[CachedTranslation]]:
+        """Look up many texts, in input order, with at most one Redis MGET"""
+        keys = [self.key(source_lang, text) for text in texts]
+        entries = [self._get_local(key) for key in keys]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+
+        if missing and self.redis is not None:
+            try:
+                raws = await self._remote(self.redis.mget, [keys[i] for i in missing])
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Translation cache read failed: {e}")
+            else:
+                for i, raw in zip(missing, raws):
+                    if raw is not None:
+                        entries[i] = self._accept_remote(keys[i], raw)
+
+        for entry in entries:
+            if entry is None:
+                self._count("misses")
+        return entries
+
+    async def aset(self, source_lang: str, text: str, translation: str) -> None:
+        await self._astore(self.key(source_lang, text), CachedTranslation(translation), self.ttl)
+
+    async def aset_failure(self, source_lang: str, text: str) -> None:
+        await self._astore(self.key(source_lang, text), CachedTranslation(None), self.negative_ttl)
+
+    async def aset_many(self, source_lang: str, translations: Iterable[Tuple[str, str]]) -> None:
+        """Store (text, translation) pairs with one pipelined Redis write"""
+        items = [
+            (self.key(source_lang, text), CachedTranslation(translation))
+            for text, translation in translations
+        ]
+        for key, entry in items:
+            self._set_local(key, entry, None)
+        if not items or self.redis is None:
+            return
+
+        def write(pipe: Any) -> Any:
+            for key, entry in items:
+                pipe.set(key, self._encode(entry), ex=self.ttl)
+            return pipe.execute()
+
+        try:
+            await self._remote(write, self.redis.pipeline(transaction=False))
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"Translation cache write failed: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics: Dict[str, Any] = dict(self._metrics)
+            metrics["local_entries"] = len(self._local)
+        lookups = metrics["local_hits"] + metrics["redis_hits"] + metrics["misses"]
+        hits = metrics["local_hits"] + metrics["redis_hits"]
+        metrics["hit_rate"] = hits / lookups if lookups else 0.0
+        return metrics
+
+    def _store(self, key: str, entry: CachedTranslation, ttl: int) -> None:
+        self._set_local(key, entry, ttl if entry.failed else None)
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(key, self._encode(entry), ex=ttl)
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"Translation cache write failed: {e}")
+
+    async def _astore(self, key: str, entry: CachedTranslation, ttl: int) -> None:
+        self._set_local(key, entry, ttl if entry.failed else None)
+        if self.redis is None:
+            return
+        try:
+            await self._remote(self.redis.set, key, self._encode(entry), ex=ttl)
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"Translation cache write failed: {e}")
+
+    async def _remote(self, call: Any, *args: Any, **kwargs: Any) -> Any:
+        """Run a Redis call without blocking the event loop"""
+        if inspect.iscoroutinefunction(getattr(self.redis, "execute_command", None)):
+            result = call(*args, **kwargs)
+            # A redis.asyncio pipeline is filled synchronously; only execute() awaits
+            return await result if inspect.isawaitable(result) else result
+        return await asyncio.to_thread(call, *args, **kwargs)
+
+    def _get_local(self, key: str) -> Optional[CachedTranslation]:
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            self._metrics["local_hits"] += 1
+            if entry.failed:
+                self._metrics["negative_hits"] += 1
+            return entry
+
+    def _set_local(self, key: str, entry: CachedTranslation, ttl: Optional[int]) -> None:
+        ttl = ttl if ttl is not None else (self.local_ttl or self.ttl)
+        with self._lock:
+            self._local[key] = (time.monotonic() + ttl, entry)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def _accept_remote(self, key: str, raw: Any) -> CachedTranslation:
+        """Record a Redis hit and promote it into the local tier"""
+        entry = self._decode(raw)
+        with self._lock:
+            self._metrics["redis_hits"] += 1
+            if entry.failed:
+                self._metrics["negative_hits"] += 1
+        self._set_local(key, entry, self.negative_ttl if entry.failed else None)
+        return entry
+
+    @staticmethod
+    def _encode(entry: CachedTranslation) -> str:
+        return json.dumps({"text": entry.text}, ensure_ascii=False)
+
+    @staticmethod
+    def _decode(raw: Any) -> CachedTranslation:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return CachedTranslation(json.loads(raw)["text"])
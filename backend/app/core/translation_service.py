@@ -0,0 +1,173 @@
+# backend/app/core/translation_service.py
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+import asyncio
+import inspect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationUnavailable(Exception):
+    """The remote translator could not answer in time (or at all)"""
+
+
+class CircuitOpen(TranslationUnavailable):
+    """Calls are being short-circuited after repeated failures"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive failures or timeouts. While
+    open every call is refused; after ``reset_timeout`` seconds a single
+    trial call is let through (half-open) and its outcome closes or re-opens
+    the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial that ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Translation circuit opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class AsyncTranslationService:
+    """Deadline-bounded, circuit-broken access to a googletrans-style translator.
+
+    Works with both synchronous translators (run on a small dedicated thread
+    pool so a hung call can never exhaust the loop's default executor) and
+    translators whose methods are coroutines. Every call is bounded by
+    ``timeout`` seconds; failures and timeouts feed the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        translator: Any,
+        timeout: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 8,
+        batch_timeout: float = 15.0,
+    ):
+        self.translator = translator
+        self.timeout = timeout
+        self.batch_timeout = batch_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate")
+        self._metrics = {"calls": 0, "timeouts": 0, "errors": 0, "short_circuited": 0}
+
+    async def translate(self, text: str, src: str, dest: str = "en") -> str:
+        """Translated text; raises TranslationUnavailable (or CircuitOpen)"""
+        result = await self._call(self.translator.translate, text, src=src, dest=dest)
+        return result.text
+
+    async def translate_batch(self, texts: List[str], src: str, dest: str = "en") -> List[str]:
+        """Translate several same-language texts in one upstream request.
+
+        Bounded by ``batch_timeout`` rather than the per-text ``timeout``.
+        """
+        results = await self._call(
+            self.translator.translate, list(texts), src=src, dest=dest, _timeout=self.batch_timeout
+        )
+        return [result.text for result in results]
+
+    async def detect(self, text: str) -> str:
+        """Detected language code; raises TranslationUnavailable (or CircuitOpen)"""
+        result = await self._call(self.translator.detect, text)
+        return result.lang
+
+    async def translate_or_original(self, text: str, src: str, dest: str = "en") -> str:
+        """Translated text, or ``text`` unchanged if the translator is unavailable"""
+        try:
+            return await self.translate(text, src, dest)
+        except TranslationUnavailable:
+            return text
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self._metrics, "circuit": self.breaker.state}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _call(self, method, *args, _timeout: Optional[float] = None, **kwargs):
+        timeout = _timeout or self.timeout
+        if not self.breaker.allow():
+            self._metrics["short_circuited"] += 1
+            raise CircuitOpen("translation circuit is open")
+        trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+
+        self._metrics["calls"] += 1
+        try:
+            if inspect.iscoroutinefunction(method):
+                awaitable = method(*args, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                awaitable = loop.run_in_executor(self._executor, partial(method, *args, **kwargs))
+            result = await asyncio.wait_for(awaitable, timeout)
+        except asyncio.CancelledError:
+            # Not the translator's fault (client went away or an outer deadline
+            # hit), but a cancelled trial must not leave the circuit half-open forever
+            if trial:
+                self.breaker.release_trial()
+            raise
+        except asyncio.TimeoutError:
+            self._metrics["timeouts"] += 1
+            self.breaker.record_failure()
+            raise TranslationUnavailable(f"translator did not answer within {timeout}s")
+        except Exception as e:
+            self._metrics["errors"] += 1
+            self.breaker.record_failure()
+            raise TranslationUnavailable(str(e)) from e
+
+        self.breaker.record_success()
+        return result
+
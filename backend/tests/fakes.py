@@ -0,0 +1,72 @@
+# backend/tests/fakes.py
+"""Test doubles shared by the translation and language detection tests."""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+import threading
+import time
+
+
+@dataclass
+class FakeTranslated:
+    text: str
+
+
+@dataclass
+class FakeDetected:
+    lang: str
+
+
+class FakeTranslator:
+    """Blocking stand-in for googletrans with injectable latency and failures.
+
+    ``translations`` maps source text to English; unknown text is echoed
+    with a ``[src->dest]`` prefix. ``max_active`` records the most calls
+    that were ever running at once, ``sent`` every text asked to translate.
+    """
+
+    def __init__(
+        self,
+        translations: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        fail: bool = False,
+        detected_lang: str = "en",
+    ):
+        self.translations = translations or {}
+        self.latency = latency
+        self.fail = fail
+        self.detected_lang = detected_lang
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.sent: List[str] = []
+        self._lock = threading.Lock()
+
+    def translate(
+        self, text: Union[str, List[str]], src: str = "auto", dest: str = "en"
+    ) -> Union[FakeTranslated, List[FakeTranslated]]:
+        self._simulate()
+        if isinstance(text, list):
+            return [self._translate_one(item, src, dest) for item in text]
+        return self._translate_one(text, src, dest)
+
+    def detect(self, text: str) -> FakeDetected:
+        self._simulate()
+        return FakeDetected(self.detected_lang)
+
+    def _translate_one(self, text: str, src: str, dest: str) -> FakeTranslated:
+        self.sent.append(text)
+        return FakeTranslated(self.translations.get(text, f"[{src}->{dest}] {text}"))
+
+    def _simulate(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if self.fail:
+                raise RuntimeError("fake translator failure")
+        finally:
+            with self._lock:
+                self.active -= 1
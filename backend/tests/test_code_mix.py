@@ -0,0 +1,86 @@
+# backend/tests/test_code_mix.py
+"""Code-mixed messages through LanguageDetector: only non-English runs reach the translator."""
+import pytest
+
+from app.core.multilingual import LanguageDetector, SingaporeLanguage
+from app.core.translation_service import AsyncTranslationService
+from tests.fakes import FakeTranslator
+
+pytestmark = pytest.mark.asyncio
+
+SINGLISH = "ok can, terima kasih for the help lah"
+MIXED_CHINESE = "我要 check my order 多少钱"
+
+
+@pytest.fixture
+def translator():
+    return FakeTranslator({"terima kasih": "thank you", "我要": "I want", "多少钱": "how much"})
+
+
+def make_detector(translator, segment_code_mixed=True) -> LanguageDetector:
+    service = AsyncTranslationService(translator)
+    return LanguageDetector(translation_service=service, segment_code_mixed=segment_code_mixed)
+
+
+async def test_translates_only_the_foreign_run(translator):
+    detector = make_detector(translator)
+
+    english = await detector.atranslate_to_english(SINGLISH, SingaporeLanguage.MALAY)
+
+    assert english == "ok can, thank you for the help lah"
+    assert translator.sent == ["terima kasih"]
+    assert detector.code_mix.metrics["translated_chars"] == len("terima kasih")
+
+
+async def test_whole_message_is_sent_when_segmentation_is_off(translator):
+    detector = make_detector(translator, segment_code_mixed=False)
+
+    await detector.atranslate_to_english(SINGLISH, SingaporeLanguage.MALAY)
+
+    assert translator.sent == [SINGLISH]
+    assert detector.code_mix is None
+
+
+async def test_single_language_message_is_translated_whole(translator):
+    detector = make_detector(translator)
+
+    assert await detector.atranslate_to_english("terima kasih", SingaporeLanguage.MALAY) == "thank you"
+    assert translator.sent == ["terima kasih"]
+
+
+async def test_translate_many_segments_mixed_texts_and_keeps_order(translator):
+    detector = make_detector(translator)
+
+    results = await detector.translate_many([MIXED_CHINESE, "terima kasih", "hello", SINGLISH])
+
+    assert [r.text for r in results] == [
+        "I want check my order how much",
+        "thank you",
+        "hello",
+        "ok can, thank you for the help lah",
+    ]
+    assert [r.source_lang for r in results] == [
+        SingaporeLanguage.MANDARIN,
+        SingaporeLanguage.MALAY,
+        SingaporeLanguage.ENGLISH,
+        SingaporeLanguage.MALAY,
+    ]
+    assert sorted(translator.sent) == sorted(["我要", "多少钱", "terima kasih"])
+    assert all(r.error is None for r in results)
+
+
+async def test_translate_many_can_skip_segmentation_per_call(translator):
+    detector = make_detector(translator)
+
+    await detector.translate_many([SINGLISH], source_lang=SingaporeLanguage.MALAY, segment_code_mixed=False)
+
+    assert translator.sent == [SINGLISH]
+
+
+async def test_failed_run_keeps_original_text_and_reports_error():
+    detector = make_detector(FakeTranslator(fail=True))
+
+    [result] = await detector.translate_many([SINGLISH], source_lang=SingaporeLanguage.MALAY)
+
+    assert result.text == SINGLISH
+    assert result.error is not None
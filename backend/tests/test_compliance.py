@@ -0,0 +1,81 @@
+# backend/tests/test_compliance.py
+"""The single-pass scanner must mask exactly what the per-pattern scan did."""
+import re
+import time
+
+import pytest
+
+from app.core.compliance import PII_Scrubber
+
+# Patterns and loop of the original per-pattern implementation
+LEGACY_PATTERNS = {
+    'NRIC': r'[STFG]\d{7}[A-Z]',
+    'FIN': r'[G]\d{7}[A-Z]',
+    'PHONE': r'(\+65\s?)?(\d{4}\s?\d{4}|\d{8})',
+    'EMAIL': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+    'ADDRESS': r'(\d+\s+\w+\s+street|block\s+\d+\s+\w+|singapore\s+\d{6})',
+}
+
+
+def legacy_scrub(text: str) -> str:
+    scrubbed_text = text
+    for pii_type, pattern in LEGACY_PATTERNS.items():
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            scrubbed_text = scrubbed_text.replace(match.group(), f"[{pii_type.upper()}_MASKED]")
+    return scrubbed_text
+
+
+TEXTS = [
+    "no pii here at all",
+    # Several PII types in one message
+    "NRIC S1234567D, phone 91234567, email mei@shop.sg, address block 5 Tampines",
+    "I live at 12 Orchard street, block 123 Ang Mo Kio, Singapore 560123.",
+    "Call +65 9123 4567 or 81234567 or 6123 4567 anytime.",
+    "Reach me at +6591234567 / t1234567z / lim_ah_kow+sg@gmail.com",
+    "2 emails: a@b.co, c.d@e-f.com; phones 9123 4567, 91234567",
+    "singapore 123456 and SINGAPORE 654321",
+    # Overlapping candidates
+    "G1234567N is a FIN that also matches NRIC",
+    "Email john.tan@example.com.sg or 91234567@mail.sg please",
+    "order 12345678 shipped to 10 Bukit street",
+    "a@b@c.com",
+]
+
+
+@pytest.fixture
+def scrubber():
+    return PII_Scrubber(None)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_scrub_matches_the_per_pattern_scan(scrubber, text):
+    assert scrubber.scrub(text).text == legacy_scrub(text)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_are_ordered_non_overlapping_spans_of_the_input(scrubber, text):
+    matches = scrubber.find_pii(text)
+    assert all(text[m.start:m.end] == m.value for m in matches)
+    assert all(a.end <= b.start for a, b in zip(matches, matches[1:]))
+
+
+def test_earlier_pattern_wins_on_the_same_span(scrubber):
+    matches = scrubber.find_pii("G1234567N")
+    assert [(m.pii_type, m.start, m.end) for m in matches] == [("NRIC", 0, 9)]
+
+
+def test_span_result_for_several_types(scrubber):
+    text = "NRIC S1234567D, phone +65 9123 4567, email mei@shop.sg"
+    result = scrubber.scrub(text)
+
+    assert result.pii_found
+    assert [m.pii_type for m in result.matches] == ["NRIC", "PHONE", "EMAIL"]
+    assert [m.value for m in result.matches] == ["S1234567D", "+65 9123 4567", "mei@shop.sg"]
+    assert result.text == "NRIC [NRIC_MASKED], phone [PHONE_MASKED], email [EMAIL_MASKED]"
+
+
+def test_long_runs_without_pii_scan_in_linear_time(scrubber):
+    text = "a" * 50_000 + " " + "1 " * 10_000
+    started = time.perf_counter()
+    assert scrubber.scrub(text).text == text
+    assert time.perf_counter() - started < 1.0
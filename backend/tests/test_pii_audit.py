@@ -0,0 +1,152 @@
+# backend/tests/test_pii_audit.py
+"""BufferedAuditExporter batching, shutdown and failure handling with in-memory sinks."""
+import sqlite3
+import threading
+import time
+
+from app.core.pii_audit import AuditEvent, BufferedAuditExporter, SQLiteAuditSink
+
+
+class ListSink:
+    """Records each batch written to it; ``fail`` makes writes raise"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    def write_batch(self, events):
+        if self.fail:
+            raise ConnectionError("tracing service unavailable")
+        self.batches.append(list(events))
+
+
+class BlockingSink(ListSink):
+    """Holds the flusher in its first write until ``release`` is set"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write_batch(self, events):
+        self.entered.set()
+        self.release.wait(5)
+        super().write_batch(events)
+
+
+def event(i: int = 0) -> AuditEvent:
+    return AuditEvent(f"session-{i}", "PII_DETECTED", {"type": "PHONE", "masked_value": "[PHONE_MASKED]"})
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_events_are_written_in_batches_of_batch_size():
+    sink = ListSink()
+    exporter = BufferedAuditExporter(sink, batch_size=3, flush_interval=60)
+    for i in range(6):
+        assert exporter.submit(event(i))
+
+    wait_for(lambda: len(sink.batches) == 2)
+    assert [len(batch) for batch in sink.batches] == [3, 3]
+    assert [e.session_id for e in sink.batches[0]] == ["session-0", "session-1", "session-2"]
+    exporter.close()
+
+
+def test_partial_batch_is_written_after_the_flush_interval():
+    sink = ListSink()
+    exporter = BufferedAuditExporter(sink, batch_size=100, flush_interval=0.05)
+    exporter.submit(event())
+
+    wait_for(lambda: sink.batches)
+    assert [len(batch) for batch in sink.batches] == [1]
+    exporter.close()
+
+
+def test_close_flushes_pending_events():
+    sink = ListSink()
+    exporter = BufferedAuditExporter(sink, batch_size=100, flush_interval=60)
+    for i in range(5):
+        exporter.submit(event(i))
+    exporter.close()
+
+    assert [len(batch) for batch in sink.batches] == [5]
+    assert exporter.stats() == {
+        "submitted": 5, "exported": 5, "dropped": 0, "failed": 0, "batches": 1, "queued": 0,
+    }
+
+
+def test_submit_after_close_is_rejected_and_counted():
+    exporter = BufferedAuditExporter(ListSink())
+    exporter.close()
+
+    assert exporter.submit(event()) is False
+    assert exporter.stats()["dropped"] == 1
+
+
+def test_event_submitted_while_closing_is_still_exported():
+    sink = ListSink()
+    exporter = BufferedAuditExporter(sink, flush_interval=60)
+    enqueue = exporter._queue.put_nowait
+    enqueuing = threading.Event()
+
+    def slow_enqueue(item):
+        enqueuing.set()
+        time.sleep(0.1)  # close() is called meanwhile
+        enqueue(item)
+
+    exporter._queue.put_nowait = slow_enqueue
+    submitter = threading.Thread(target=exporter.submit, args=(event(),))
+    submitter.start()
+    enqueuing.wait(2)
+    exporter.close()
+    submitter.join()
+
+    assert exporter.stats()["submitted"] == 1
+    assert sum(len(batch) for batch in sink.batches) == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    sink = BlockingSink()
+    exporter = BufferedAuditExporter(sink, max_queue_size=2, batch_size=1, flush_interval=60)
+    exporter.submit(event(0))
+    sink.entered.wait(2)  # the flusher is stuck writing the first event
+
+    results = [exporter.submit(event(i)) for i in range(1, 5)]
+    assert results == [True, True, False, False]
+    assert exporter.stats()["dropped"] == 2
+
+    sink.release.set()
+    exporter.close()
+    assert sum(len(batch) for batch in sink.batches) == 3
+
+
+def test_sink_failures_are_counted_and_do_not_stop_the_exporter():
+    sink = ListSink(fail=True)
+    exporter = BufferedAuditExporter(sink, batch_size=2, flush_interval=60)
+    exporter.submit(event(0))
+    exporter.submit(event(1))
+    wait_for(lambda: exporter.stats()["failed"] == 2)
+
+    sink.fail = False
+    exporter.submit(event(2))
+    exporter.close()
+    assert exporter.stats()["exported"] == 1
+    assert [[e.session_id for e in batch] for batch in sink.batches] == [["session-2"]]
+
+
+def test_sqlite_sink_stores_events(tmp_path):
+    path = str(tmp_path / "audit.db")
+    sink = SQLiteAuditSink(path)
+    with BufferedAuditExporter(sink, batch_size=10, flush_interval=60) as exporter:
+        for i in range(3):
+            exporter.submit(event(i))
+    sink.close()
+
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT session_id, event_type FROM audit_events ORDER BY id").fetchall()
+    assert rows == [(f"session-{i}", "PII_DETECTED") for i in range(3)]
@@ -0,0 +1,127 @@
+# backend/tests/test_session_language.py
+"""Sticky session languages through LanguageDetector, and the batched write-back."""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import pytest
+
+from app.core.multilingual import LanguageDetector, SingaporeLanguage
+from app.core.session_language import ConversationLanguageWriter, SessionLanguageCache
+from app.core.translation_service import AsyncTranslationService
+from tests.fakes import FakeTranslator
+
+pytestmark = pytest.mark.asyncio
+
+ENGLISH = "Could you check the delivery status of my order please"
+CHINESE = "我的订单什么时候到"
+
+
+class FakeSession:
+    def __init__(self, factory: "FakeSessionFactory"):
+        self.factory = factory
+
+    async def execute(self, statement: Any, params: Dict[str, Any]) -> None:
+        if self.factory.fail:
+            raise RuntimeError("database unavailable")
+        self.factory.updates.append(params)
+
+    async def commit(self) -> None:
+        pass
+
+
+class FakeSessionFactory:
+    """Records the parameters of each UPDATE instead of running it."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.updates: List[Dict[str, Any]] = []
+
+    @asynccontextmanager
+    async def __call__(self):
+        yield FakeSession(self)
+
+
+def make_detector(cache: SessionLanguageCache = None) -> LanguageDetector:
+    service = AsyncTranslationService(FakeTranslator(detected_lang="en"))
+    return LanguageDetector(translation_service=service, session_languages=cache)
+
+
+async def test_detects_every_message_without_a_session_id():
+    cache = SessionLanguageCache()
+    detector = make_detector(cache)
+
+    for _ in range(3):
+        assert await detector.adetect_language(ENGLISH) == SingaporeLanguage.ENGLISH
+    assert cache.metrics["detections"] == 0
+    assert cache.metrics["sticky_hits"] == 0
+
+
+async def test_latin_session_sticks_after_agreeing_detections():
+    cache = SessionLanguageCache(sticky_after=2)
+    detector = make_detector(cache)
+
+    for _ in range(4):
+        lang = await detector.adetect_language(ENGLISH, session_id="s1")
+        assert lang == SingaporeLanguage.ENGLISH
+    assert cache.metrics["detections"] == 2
+    assert cache.metrics["sticky_hits"] == 2
+
+
+async def test_script_change_triggers_fresh_detection():
+    cache = SessionLanguageCache()
+    detector = make_detector(cache)
+
+    assert await detector.adetect_language(CHINESE, session_id="s1") == SingaporeLanguage.MANDARIN
+    # Han script decides the language at once, so the next message is a sticky hit
+    assert await detector.adetect_language(CHINESE, session_id="s1") == SingaporeLanguage.MANDARIN
+    assert cache.metrics == {"sticky_hits": 1, "detections": 1, "redis_errors": 0}
+
+    assert await detector.adetect_language(ENGLISH, session_id="s1") == SingaporeLanguage.ENGLISH
+    assert cache.metrics["detections"] == 2
+
+
+async def test_sessions_are_independent():
+    cache = SessionLanguageCache()
+    detector = make_detector(cache)
+
+    await detector.adetect_language(CHINESE, session_id="s1")
+    assert await detector.adetect_language(ENGLISH, session_id="s2") == SingaporeLanguage.ENGLISH
+    assert await detector.adetect_language(CHINESE, session_id="s1") == SingaporeLanguage.MANDARIN
+
+
+async def test_primed_session_skips_detection():
+    cache = SessionLanguageCache()
+    detector = make_detector(cache)
+
+    await cache.prime("s1", SingaporeLanguage.MALAY)
+    assert await detector.adetect_language(ENGLISH, session_id="s1") == SingaporeLanguage.MALAY
+    assert cache.metrics["detections"] == 0
+
+
+async def test_language_changes_are_written_back_in_one_update():
+    sessions = FakeSessionFactory()
+    writer = ConversationLanguageWriter(sessions)
+    detector = make_detector(SessionLanguageCache(writer=writer))
+
+    await detector.adetect_language(CHINESE, session_id="s1")
+    await detector.adetect_language(ENGLISH, session_id="s2")
+    await detector.adetect_language(ENGLISH, session_id="s2")  # unchanged, not recorded again
+    await detector.adetect_language(ENGLISH, session_id="s1")
+
+    assert await writer.flush() == 2
+    assert sessions.updates == [{"session_ids": ["s1", "s2"], "langs": ["en", "en"]}]
+    assert await writer.flush() == 0
+
+
+async def test_failed_write_back_is_retried_without_losing_newer_values():
+    sessions = FakeSessionFactory(fail=True)
+    writer = ConversationLanguageWriter(sessions)
+    writer.record("s1", SingaporeLanguage.MANDARIN)
+    writer.record("s2", SingaporeLanguage.MALAY)
+
+    assert await writer.flush() == 0
+    writer.record("s1", SingaporeLanguage.ENGLISH)
+    sessions.fail = False
+
+    assert await writer.flush() == 2
+    assert sessions.updates == [{"session_ids": ["s1", "s2"], "langs": ["en", "ms"]}]
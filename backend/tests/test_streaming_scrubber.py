@@ -0,0 +1,65 @@
+# backend/tests/test_streaming_scrubber.py
+"""Streamed scrubbing must mask exactly what scrubbing the whole reply masks."""
+import pytest
+
+from app.core.compliance import PII_Scrubber
+from app.core.pii_audit import BufferedAuditExporter
+
+REPLIES = [
+    "contact: customer.service.department@singapore-enterprises.com.sg thanks",
+    "email: a.very.long.local.part.for.testing.purposes@subdomain.example-company.com ok",
+    "我的邮箱是customer.service.department@singapore-enterprises.com.sg谢谢",
+    "请联系S1234567D或者+6591234567，邮箱averyveryverylongname.with.dots@example-company.com.sg。",
+    "Call +65 9123 4567 or 91234567, NRIC S1234567D, 12 Orchard street, "
+    "block 5 Ang Mo, singapore 123456, email x@y.co bye",
+]
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def write_batch(self, events):
+        self.events.extend(events)
+
+
+@pytest.fixture
+def scrubber():
+    exporter = BufferedAuditExporter(ListSink())
+    yield PII_Scrubber(None, audit_exporter=exporter)
+    exporter.close()
+
+
+def stream(scrubber, text, size):
+    streaming = scrubber.stream("session")
+    parts = [streaming.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    parts.append(streaming.flush())
+    return "".join(parts), streaming
+
+
+@pytest.mark.parametrize("text", REPLIES)
+def test_every_chunk_size_matches_whole_text_scrub(scrubber, text):
+    expected = scrubber.scrub(text)
+    for size in range(1, len(text) + 1):
+        output, streaming = stream(scrubber, text, size)
+        assert output == expected.text, f"chunk size {size}"
+        assert [(m.start, m.end) for m in streaming.matches] == [
+            (m.start, m.end) for m in expected.matches
+        ]
+
+
+def test_long_email_is_held_back_until_it_ends(scrubber):
+    email = "customer.service.department@singapore-enterprises.com.sg"
+    streaming = scrubber.stream("session")
+    emitted = streaming.feed("邮箱是")
+    for char in email:
+        emitted += streaming.feed(char)
+        assert "customer" not in emitted
+    emitted += streaming.feed("谢谢") + streaming.flush()
+    assert emitted == "邮箱是[EMAIL_MASKED]谢谢"
+
+
+def test_text_without_spaces_is_released_before_the_reply_ends(scrubber):
+    streaming = scrubber.stream("session", max_span=40)
+    emitted = streaming.feed("这是一个很长的中文回答" * 10)
+    assert len(emitted) >= 100 - 40
@@ -0,0 +1,141 @@
+# backend/tests/test_translation_service.py
+"""AsyncTranslationService against a local fake translator with scripted latency."""
+import asyncio
+import time
+
+import pytest
+
+from app.core.translation_service import (
+    AsyncTranslationService,
+    CircuitBreaker,
+    CircuitOpen,
+    TranslationUnavailable,
+)
+from tests.fakes import FakeTranslator
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def translator():
+    return FakeTranslator({"terima kasih": "thank you"})
+
+
+def service(translator, **kwargs):
+    return AsyncTranslationService(translator, **kwargs)
+
+
+async def test_translates_single_texts_and_batches(translator):
+    translation = service(translator)
+    assert await translation.translate("terima kasih", src="ms") == "thank you"
+    assert await translation.translate_batch(["terima kasih", "apa"], src="ms") == [
+        "thank you",
+        "[ms->en] apa",
+    ]
+    assert await translation.detect("hello") == "en"
+    translation.close()
+
+
+async def test_slow_call_times_out_and_counts_as_failure(translator):
+    translator.latency = 0.3
+    translation = service(translator, timeout=0.05, breaker=CircuitBreaker(failure_threshold=1))
+
+    with pytest.raises(TranslationUnavailable):
+        await translation.translate("terima kasih", src="ms")
+    assert translation.metrics() == {
+        "calls": 1, "timeouts": 1, "errors": 0, "short_circuited": 0, "circuit": CircuitBreaker.OPEN,
+    }
+    assert await translation.translate_or_original("terima kasih", src="ms") == "terima kasih"
+    translation.close()
+
+
+async def test_breaker_opens_then_half_opens_then_closes(translator):
+    translator.fail = True
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    translation = service(translator, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(TranslationUnavailable):
+            await translation.translate("terima kasih", src="ms")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Open: refused without calling the translator
+    with pytest.raises(CircuitOpen):
+        await translation.translate("terima kasih", src="ms")
+    assert translator.calls == 2
+    assert await translation.translate_or_original("terima kasih", src="ms") == "terima kasih"
+    assert translation.metrics()["short_circuited"] == 2
+
+    await asyncio.sleep(0.15)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    translator.fail = False
+    assert await translation.translate("terima kasih", src="ms") == "thank you"
+    assert breaker.state == CircuitBreaker.CLOSED
+    translation.close()
+
+
+async def test_failed_half_open_trial_reopens_the_circuit(translator):
+    translator.fail = True
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    translation = service(translator, breaker=breaker)
+
+    with pytest.raises(TranslationUnavailable):
+        await translation.translate("terima kasih", src="ms")
+    await asyncio.sleep(0.15)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    with pytest.raises(TranslationUnavailable):
+        await translation.translate("terima kasih", src="ms")
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen):
+        await translation.translate("terima kasih", src="ms")
+    translation.close()
+
+
+async def test_half_open_admits_a_single_trial(translator):
+    translator.latency = 0.1
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    translation = service(translator, breaker=breaker)
+    await asyncio.sleep(0.1)
+
+    results = await asyncio.gather(
+        translation.translate("terima kasih", src="ms"),
+        translation.translate("terima kasih", src="ms"),
+        return_exceptions=True,
+    )
+    assert results.count("thank you") == 1
+    assert sum(isinstance(result, CircuitOpen) for result in results) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+    translation.close()
+
+
+async def test_blocking_calls_are_limited_to_the_worker_pool(translator):
+    translator.latency = 0.05
+    translation = service(translator, max_workers=2, timeout=2.0)
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(translation.translate("terima kasih", src="ms") for _ in range(6)))
+    assert results == ["thank you"] * 6
+    assert translator.max_active == 2
+    assert time.monotonic() - started >= 0.15
+    translation.close()
+
+
+async def test_blocking_calls_do_not_block_the_event_loop(translator):
+    translator.latency = 0.2
+    translation = service(translator)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    await translation.translate("terima kasih", src="ms")
+    ticker.cancel()
+    assert ticks >= 10
+    translation.close()
@@ -0,0 +1 @@
+"""Agent Package."""
@@ -0,0 +1,252 @@
+"""
+Model Cascade Router
+═══════════════════════════════════════════════════════════════════════════════════
+
+Answers with the fast, cheap primary model and escalates to the secondary
+model only when it is likely to matter:
+
+- the query is classified as complex      → secondary directly
+- the primary answer's confidence is below AgentSettings.confidence_threshold
+
+If the secondary model fails, the primary's answer is used instead (after
+calling it, when a complex query skipped it).
+
+Confidence is the geometric-mean token probability of the answer (from
+logprobs), halved when the answer hedges. Every tier call records latency,
+token usage and cost so the fast-path share and spend can be monitored.
+"""
+
+import math
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+import structlog
+from openai import AsyncOpenAI
+
+from app.agent.llm import get_openai_client
+from app.config import Settings
+from app.models.domain import AgentResponse
+
+logger = structlog.get_logger(__name__)
+
+PRIMARY = "primary"
+SECONDARY = "secondary"
+
+_COMPLEX_MARKERS = re.compile(
+    r"\b(?:compare|comparison|difference between|versus|vs\.?|step[- ]by[- ]step|"
+    r"explain why|troubleshoot|calculate|pros and cons)\b",
+    re.IGNORECASE,
+)
+_HEDGES = re.compile(
+    r"\b(?:i'?m not sure|i am not sure|i don'?t know|i do not know|not certain|"
+    r"can(?:no|')t (?:find|confirm)|unable to (?:find|confirm))\b",
+    re.IGNORECASE,
+)
+
+
+def is_complex_query(message: str, min_words: int) -> bool:
+    """Heuristic: long, multi-question or analytical queries need the stronger model."""
+    questions = message.count("?") + message.count("？")
+    return (
+        len(message.split()) >= min_words
+        or questions >= 3
+        or _COMPLEX_MARKERS.search(message) is not None
+    )
+
+
+@dataclass
+class TierAttempt:
+    """One model call within a cascade."""
+
+    tier: str
+    model: str
+    latency_ms: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    confidence: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class CascadeResult:
+    """Final answer plus the tier calls that produced it."""
+
+    response: AgentResponse
+    attempts: list[TierAttempt] = field(default_factory=list)
+    escalated_by: Optional[str] = None
+
+    @property
+    def tier(self) -> str:
+        return self.attempts[-1].tier if self.attempts else PRIMARY
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(attempt.cost_usd for attempt in self.attempts)
+
+
+class CascadeStats:
+    """Process-wide cascade counters (requests, escalations, latency, cost per tier)."""
+
+    def __init__(self):
+        self.requests = 0
+        self.escalations: dict[str, int] = {}
+        self.calls = {PRIMARY: 0, SECONDARY: 0}
+        self.latency_ms = {PRIMARY: 0, SECONDARY: 0}
+        self.cost_usd = {PRIMARY: 0.0, SECONDARY: 0.0}
+
+    def record(self, result: CascadeResult) -> None:
+        self.requests += 1
+        if result.escalated_by:
+            self.escalations[result.escalated_by] = self.escalations.get(result.escalated_by, 0) + 1
+        for attempt in result.attempts:
+            self.calls[attempt.tier] += 1
+            self.latency_ms[attempt.tier] += attempt.latency_ms
+            self.cost_usd[attempt.tier] += attempt.cost_usd
+
+    def snapshot(self) -> dict[str, Any]:
+        escalated = sum(self.escalations.values())
+        return {
+            "requests": self.requests,
+            "fast_path_rate": 1 - escalated / self.requests if self.requests else 1.0,
+            "escalations": dict(self.escalations),
+            "calls": dict(self.calls),
+            "avg_latency_ms": {
+                tier: self.latency_ms[tier] / calls if calls else 0.0
+                for tier, calls in self.calls.items()
+            },
+            "cost_usd": dict(self.cost_usd),
+        }
+
+
+cascade_stats = CascadeStats()
+
+
+class CascadeRouter:
+    """
+    Confidence-gated routing between the primary and secondary LLMs.
+
+    Usage:
+        router = CascadeRouter(settings)
+        result = await router.complete(messages, message)
+    """
+
+    def __init__(self, settings: Settings, client: Optional[AsyncOpenAI] = None):
+        self.settings = settings
+        self.client = client or get_openai_client(settings)
+
+    async def complete(
+        self,
+        messages: list[dict[str, str]],
+        message: str,
+    ) -> CascadeResult:
+        """
+        Generate an answer, escalating to the secondary model when needed.
+
+        Args:
+            messages: Chat messages for the model
+            message: Current customer message (for complexity routing)
+
+        Returns:
+            CascadeResult with the answer and per-tier attempts
+        """
+        agent = self.settings.agent
+        started = time.perf_counter()
+
+        escalated_by = None
+        if agent.cascade_enabled and is_complex_query(message, agent.complex_query_min_words):
+            escalated_by = "complex_query"
+
+        attempts: list[TierAttempt] = []
+        content = None
+        if escalated_by is None:
+            content, attempt = await self._call(PRIMARY, messages)
+            attempts.append(attempt)
+            if attempt.error is not None:
+                escalated_by = "primary_error"
+            elif agent.cascade_enabled and attempt.confidence < agent.confidence_threshold:
+                escalated_by = "low_confidence"
+
+        if escalated_by is not None:
+            secondary_content, attempt = await self._call(SECONDARY, messages)
+            attempts.append(attempt)
+            if attempt.error is None:
+                content = secondary_content
+            elif escalated_by == "complex_query":
+                # The primary was skipped, so it is still worth a try
+                content, attempt = await self._call(PRIMARY, messages)
+                attempts.append(attempt)
+            if content is None:
+                errors = "; ".join(f"{a.tier}: {a.error}" for a in attempts if a.error)
+                raise RuntimeError(f"Both LLM tiers failed: {errors}")
+
+        final = next(a for a in reversed(attempts) if a.error is None)
+        result = CascadeResult(
+            response=AgentResponse(
+                content=content,
+                confidence=final.confidence,
+                processing_time_ms=int((time.perf_counter() - started) * 1000),
+                model_used=final.model,
+                prompt_tokens=sum(a.prompt_tokens for a in attempts),
+                completion_tokens=sum(a.completion_tokens for a in attempts),
+            ),
+            attempts=attempts,
+            escalated_by=escalated_by,
+        )
+        cascade_stats.record(result)
+        logger.info(
+            "LLM cascade completed",
+            tier=result.tier,
+            escalated_by=escalated_by,
+            cost_usd=round(result.cost_usd, 6),
+            attempts=[asdict(a) for a in attempts],
+        )
+        return result
+
+    async def _call(self, tier: str, messages: list[dict[str, str]]) -> tuple[Optional[str], TierAttempt]:
+        llm = self.settings.llm
+        if tier == PRIMARY:
+            model, temperature, max_tokens = llm.llm_primary_model, llm.llm_primary_temperature, llm.llm_primary_max_tokens
+            input_cost, output_cost = llm.llm_primary_input_cost_per_1m, llm.llm_primary_output_cost_per_1m
+        else:
+            model, temperature, max_tokens = llm.llm_secondary_model, llm.llm_secondary_temperature, llm.llm_secondary_max_tokens
+            input_cost, output_cost = llm.llm_secondary_input_cost_per_1m, llm.llm_secondary_output_cost_per_1m
+
+        started = time.perf_counter()
+        try:
+            completion = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                logprobs=True,
+            )
+        except Exception as e:
+            logger.warning("LLM tier failed", tier=tier, model=model, error=str(e))
+            return None, TierAttempt(tier, model, int((time.perf_counter() - started) * 1000), error=str(e))
+
+        choice = completion.choices[0]
+        content = choice.message.content or ""
+        usage = completion.usage
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+        return content, TierAttempt(
+            tier=tier,
+            model=model,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=(prompt_tokens * input_cost + completion_tokens * output_cost) / 1_000_000,
+            confidence=_answer_confidence(choice, content),
+        )
+
+
+def _answer_confidence(choice: Any, content: str) -> float:
+    """Geometric-mean token probability, halved for hedging answers (1.0 without logprobs)."""
+    tokens = choice.logprobs.content if choice.logprobs and choice.logprobs.content else []
+    confidence = math.exp(sum(t.logprob for t in tokens) / len(tokens)) if tokens else 1.0
+    if _HEDGES.search(content):
+        confidence *= 0.5
+    return round(confidence, 4)
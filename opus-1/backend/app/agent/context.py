@@ -0,0 +1,169 @@
+"""
+Context Packer
+═══════════════════════════════════════════════════════════════════════════════════
+
+Fills the prompt token budget (RAGSettings.max_context_tokens) by priority:
+
+1. System prompt and the current message (always included)
+2. Rolling conversation summary
+3. Recent turns, newest first, up to a share of the budget
+4. Reranked knowledge chunks, best first, in whatever budget remains
+
+Token counts are computed once per text and stored with it (the
+``token_count`` key of a message dict or of a Document's metadata), so
+packing a request is pure arithmetic over cached integers.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
+
+import tiktoken
+
+from app.models.domain import Document, TokenBudget
+
+# Per-message framing tokens in the chat format
+MESSAGE_OVERHEAD = 4
+# "[n] (source) " prefix of a knowledge chunk
+CHUNK_OVERHEAD = 8
+# Share of the remaining budget recent turns may use before chunks
+HISTORY_SHARE = 0.4
+
+KNOWLEDGE_HEADER = "\n\nRelevant knowledge:\n"
+SUMMARY_HEADER = "\n\nConversation summary so far:\n"
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> tiktoken.Encoding:
+    # o200k_base is the gpt-4o family encoding
+    return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Tokenize ``text`` (uncached; prefer ``cached_token_count``)."""
+    return len(_encoding().encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=256)
+def _count_static(text: str) -> int:
+    # System prompts, headers and the rolling summary repeat verbatim across requests
+    return count_tokens(text)
+
+
+def cached_token_count(item: dict[str, Any], text: str) -> int:
+    """
+    Token count stored on ``item``, computed on first use.
+
+    ``item`` is the dict persisted alongside the text (a message dict or a
+    Document's metadata/payload), so the count travels with it.
+    """
+    count = item.get("token_count")
+    if count is None:
+        count = item["token_count"] = count_tokens(text)
+    return count
+
+
+def with_token_count(message: dict[str, Any]) -> dict[str, Any]:
+    """Annotate a role/content message with its token count before storing it."""
+    cached_token_count(message, message["content"])
+    return message
+
+
+def document_tokens(document: Document) -> int:
+    """Cached token count of a knowledge chunk."""
+    return cached_token_count(document.metadata, document.content)
+
+
+@dataclass
+class PackedContext:
+    """Chat messages assembled within the token budget."""
+
+    messages: list[dict[str, str]]
+    budget: TokenBudget
+    documents: list[Document] = field(default_factory=list)
+    summary_included: bool = False
+    dropped_messages: int = 0
+    dropped_documents: int = 0
+
+
+def pack_context(
+    system_prompt: str,
+    message: str,
+    history: Optional[list[dict[str, Any]]] = None,
+    documents: Optional[list[Document]] = None,
+    summary: Optional[str] = None,
+    max_tokens: int = 4000,
+    max_messages: int = 20,
+) -> PackedContext:
+    """
+    Assemble chat messages that fit ``max_tokens``.
+
+    Args:
+        system_prompt: Formatted system prompt
+        message: Current customer message
+        history: Prior turns (role/content dicts, oldest first)
+        documents: Reranked knowledge chunks, best first
+        summary: Rolling summary of older turns
+        max_tokens: Prompt token budget
+        max_messages: Most recent turns to consider
+
+    Returns:
+        PackedContext with messages and the filled TokenBudget
+    """
+    # Completion length is capped separately by the model's max_tokens
+    budget = TokenBudget(max_tokens=max_tokens, reserved_for_response=0)
+    budget.system_prompt_tokens = _count_static(system_prompt) + MESSAGE_OVERHEAD
+    budget.conversation_tokens = count_tokens(message) + MESSAGE_OVERHEAD
+
+    summary_included = False
+    if summary:
+        summary_tokens = _count_static(SUMMARY_HEADER) + _count_static(summary)
+        if budget.can_add(summary_tokens):
+            budget.system_prompt_tokens += summary_tokens
+            summary_included = True
+
+    turns = [t for t in (history or [])[-max_messages:] if t.get("role") in ("user", "assistant")]
+    history_limit = int(budget.available_tokens * HISTORY_SHARE)
+    kept_turns: list[dict[str, Any]] = []
+    history_tokens = 0
+    for turn in reversed(turns):
+        tokens = cached_token_count(turn, turn["content"]) + MESSAGE_OVERHEAD
+        if history_tokens + tokens > history_limit:
+            break
+        history_tokens += tokens
+        kept_turns.append(turn)
+    kept_turns.reverse()
+    budget.conversation_tokens += history_tokens
+
+    kept_documents: list[Document] = []
+    candidates = documents or []
+    if candidates:
+        header_tokens = _count_static(KNOWLEDGE_HEADER)
+        for document in candidates:
+            tokens = document_tokens(document) + CHUNK_OVERHEAD
+            if not kept_documents:
+                tokens += header_tokens
+            if budget.can_add(tokens):
+                budget.retrieved_context_tokens += tokens
+                kept_documents.append(document)
+
+    system = system_prompt
+    if summary_included:
+        system += SUMMARY_HEADER + summary
+    if kept_documents:
+        system += KNOWLEDGE_HEADER + "\n\n".join(
+            f"[{i}] ({doc.source}) {doc.content}" for i, doc in enumerate(kept_documents, 1)
+        )
+
+    messages = [{"role": "system", "content": system}]
+    messages.extend({"role": t["role"], "content": t["content"]} for t in kept_turns)
+    messages.append({"role": "user", "content": message})
+
+    return PackedContext(
+        messages=messages,
+        budget=budget,
+        documents=kept_documents,
+        summary_included=summary_included,
+        dropped_messages=len(turns) - len(kept_turns),
+        dropped_documents=len(candidates) - len(kept_documents),
+    )
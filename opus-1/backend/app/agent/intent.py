@@ -0,0 +1,300 @@
+"""
+Intent Classifier
+═══════════════════════════════════════════════════════════════════════════════════
+
+Local nearest-centroid intent classifier over hashed word and character
+n-grams. It needs no model download or API call and runs in well under a
+millisecond, so it can sit in front of the LLM:
+
+- Deterministic intents (business hours, contact details, greetings,
+  farewells) with a confident, unambiguous prediction are answered from
+  BusinessSettings templates without any LLM call.
+- Every other message still gets its ``detected_intent`` filled in.
+
+Character n-grams make it tolerant of typos and Singlish spellings
+("wat time u open ah").
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.config import Settings
+from app.models.domain import Intent
+from app.services.calendar import get_business_calendar
+
+_WORDS = re.compile(r"[a-z0-9']+")
+
+# Seed utterances per intent. Non-deterministic intents are included so that
+# e.g. pricing questions are not pulled towards the business hours centroid.
+INTENT_EXAMPLES: dict[Intent, tuple[str, ...]] = {
+    Intent.BUSINESS_HOURS: (
+        "what are your business hours",
+        "what time do you open",
+        "what time do you close",
+        "when are you open",
+        "are you open today",
+        "are you open on saturday",
+        "are you open on sunday",
+        "opening hours",
+        "operating hours",
+        "what time u open ah",
+        "wat time close",
+        "open on public holidays",
+    ),
+    Intent.CONTACT_INFO: (
+        "how can i contact you",
+        "what is your phone number",
+        "what is your email address",
+        "can i call you",
+        "customer service number",
+        "how do i reach support",
+        "contact details",
+        "email address for support",
+        "hotline number",
+    ),
+    Intent.GREETING: (
+        "hi",
+        "hello",
+        "hey",
+        "morning",
+        "hey there",
+        "hello there",
+        "good morning",
+        "good afternoon",
+        "good evening",
+        "hi there",
+        "hello anyone there",
+    ),
+    Intent.FAREWELL: (
+        "bye",
+        "bye bye",
+        "goodbye",
+        "thanks bye",
+        "thank you that's all",
+        "see you",
+        "ok thanks",
+        "thanks for your help",
+        "that's all thank you",
+    ),
+    Intent.PRICING: (
+        "how much does it cost",
+        "what is the price",
+        "do you have any discounts",
+        "how much for delivery",
+        "pricing plans",
+        "is there a promotion",
+    ),
+    Intent.ORDER_STATUS: (
+        "where is my order",
+        "track my order",
+        "my order has not arrived",
+        "order status",
+        "when will my delivery come",
+        "has my parcel been shipped",
+    ),
+    Intent.COMPLAINT: (
+        "i want to make a complaint",
+        "this is terrible service",
+        "i am very unhappy",
+        "the product is broken",
+        "i want a refund",
+        "very disappointed with your staff",
+    ),
+    Intent.TECHNICAL_SUPPORT: (
+        "the app is not working",
+        "i cannot log in",
+        "error when i try to pay",
+        "how do i reset my password",
+        "website keeps crashing",
+        "the device won't turn on",
+    ),
+    Intent.PRODUCT_INQUIRY: (
+        "do you sell this product",
+        "tell me about your products",
+        "is this item in stock",
+        "what services do you offer",
+        "do you have this in another size",
+        "product specifications",
+    ),
+}
+
+# On-topic words that may appear in a templated question without being in
+# any seed utterance ("are you open tomorrow", "whatsapp number")
+INTENT_VOCABULARY: dict[Intent, frozenset[str]] = {
+    Intent.BUSINESS_HOURS: frozenset({
+        "hour", "hours", "time", "times", "now", "still", "tomorrow", "tonight",
+        "weekday", "weekdays", "weekend", "weekends", "monday", "tuesday",
+        "wednesday", "thursday", "friday", "holiday", "closed", "closing",
+        "shop", "store", "office",
+    }),
+    Intent.CONTACT_INFO: frozenset({
+        "phone", "telephone", "tel", "call", "number", "email", "mail", "whatsapp",
+        "hotline", "address", "reach", "contact", "talk", "speak",
+    }),
+}
+
+# Function words and Singlish particles that never change what a templated
+# question asks
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "am", "be", "do", "does", "did", "can", "could",
+    "will", "would", "may", "i", "me", "my", "we", "our", "you", "your", "u", "ur",
+    "it", "its", "this", "that", "what", "wat", "when", "how", "which", "where",
+    "to", "on", "in", "at", "for", "of", "and", "or", "please", "pls", "plz",
+    "ok", "okay", "hi", "hello", "hey", "thanks", "thank", "ah", "lah", "leh",
+    "lor", "hor", "meh", "one", "got",
+})
+
+# Longer messages usually carry a second request the template would ignore.
+# Greeting and farewell templates end the turn, so they only answer messages
+# that are nothing more than a greeting or farewell.
+FAST_PATH_MAX_WORDS: dict[Intent, int] = {
+    Intent.BUSINESS_HOURS: 12,
+    Intent.CONTACT_INFO: 12,
+    Intent.GREETING: 4,
+    Intent.FAREWELL: 4,
+}
+DETERMINISTIC_INTENTS = frozenset(FAST_PATH_MAX_WORDS)
+# Below this similarity the message is not labelled at all
+MIN_CONFIDENCE = 0.2
+
+
+def _words(text: str) -> list[str]:
+    return _WORDS.findall(text.lower())
+
+
+def _features(text: str) -> dict[str, float]:
+    """L2-normalized bag of word unigrams, bigrams and in-word char trigrams."""
+    words = _words(text)
+    counts: Counter[str] = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        counts.update(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {key: value / norm for key, value in counts.items()}
+
+
+def _normalize(vector: dict[str, float]) -> dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {key: value / norm for key, value in vector.items()}
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    """Classifier output for one message."""
+
+    intent: Intent
+    confidence: float
+    margin: float
+    word_count: int
+    # Content words the predicted intent's vocabulary does not explain
+    extra_words: int = 0
+
+
+class IntentClassifier:
+    """
+    Nearest-centroid classifier over n-gram vectors.
+
+    A message that is one of the seed utterances (ignoring case and
+    punctuation) is labelled directly: short seeds such as "hi" share too
+    few n-grams with their centroid to clear the fast-path threshold.
+
+    Usage:
+        prediction = get_intent_classifier().classify("what time do you open?")
+    """
+
+    def __init__(self, examples: Optional[dict[Intent, tuple[str, ...]]] = None):
+        self.centroids: dict[Intent, dict[str, float]] = {}
+        self.seeds: dict[str, Intent] = {}
+        self.vocabulary: dict[Intent, frozenset[str]] = {}
+        for intent, utterances in (examples or INTENT_EXAMPLES).items():
+            centroid: Counter[str] = Counter()
+            vocabulary = set(INTENT_VOCABULARY.get(intent, ()))
+            for utterance in utterances:
+                centroid.update(_features(utterance))
+                self.seeds[" ".join(_words(utterance))] = intent
+                vocabulary.update(_words(utterance))
+            self.centroids[intent] = _normalize(centroid)
+            self.vocabulary[intent] = frozenset(vocabulary)
+
+    def classify(self, text: str) -> IntentPrediction:
+        """Most similar intent with its cosine similarity and margin over the runner-up."""
+        words = _words(text)
+        seed = self.seeds.get(" ".join(words))
+        if seed is not None:
+            return IntentPrediction(intent=seed, confidence=1.0, margin=1.0, word_count=len(words))
+
+        features = _features(text)
+        scores = sorted(
+            (
+                (sum(weight * centroid.get(key, 0.0) for key, weight in features.items()), intent)
+                for intent, centroid in self.centroids.items()
+            ),
+            key=lambda pair: pair[0],
+            reverse=True,
+        )
+        best, intent = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        vocabulary = self.vocabulary[intent]
+        return IntentPrediction(
+            intent=intent if best >= MIN_CONFIDENCE else Intent.UNKNOWN,
+            confidence=round(best, 4),
+            margin=round(best - runner_up, 4),
+            word_count=len(words),
+            extra_words=sum(1 for word in words if word not in vocabulary and word not in FILLER_WORDS),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_intent_classifier() -> IntentClassifier:
+    """Shared classifier (centroids are built once per process)."""
+    return IntentClassifier()
+
+
+def template_answer(settings: Settings, prediction: IntentPrediction) -> Optional[str]:
+    """
+    Deterministic answer for a confident, simple prediction.
+
+    Hours and contact templates are only used when every content word of
+    the message belongs to that intent, so "are you open to partnerships?"
+    still reaches the LLM.
+
+    Args:
+        settings: Application settings
+        prediction: Classifier output for the message
+
+    Returns:
+        Answer text, or None when the message should go to the LLM
+    """
+    agent = settings.agent
+    if (
+        not agent.intent_fast_path_enabled
+        or prediction.intent not in DETERMINISTIC_INTENTS
+        or prediction.confidence < agent.intent_fast_path_threshold
+        or prediction.margin < agent.intent_fast_path_margin
+        or prediction.word_count > FAST_PATH_MAX_WORDS[prediction.intent]
+    ):
+        return None
+    if prediction.intent in INTENT_VOCABULARY and prediction.extra_words:
+        return None
+
+    business = settings.business
+    if prediction.intent == Intent.BUSINESS_HOURS:
+        return (
+            f"Our business hours are {business.business_hours_start} to "
+            f"{business.business_hours_end} ({business.business_timezone}), "
+            f"{', '.join(business.working_days)}, except public holidays. "
+            f"{get_business_calendar(settings).status().status_message}"
+        )
+    if prediction.intent == Intent.CONTACT_INFO:
+        return (
+            f"You can reach us at {business.support_email} or call "
+            f"{business.support_phone} during business hours."
+        )
+    if prediction.intent == Intent.GREETING:
+        return f"Hello! Welcome to {business.business_name}. How can I help you today?"
+    return f"Thank you for contacting {business.business_name}. Have a great day!"
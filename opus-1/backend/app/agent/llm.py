@@ -0,0 +1,107 @@
+"""
+LLM Client
+═══════════════════════════════════════════════════════════════════════════════════
+
+Thin streaming wrapper around the OpenAI chat completions API, configured
+from LLMSettings. The client (and its connection pool) is shared per process.
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from openai import AsyncOpenAI
+
+from app.agent.context import pack_context
+from app.config import Settings
+from app.models.domain import Document
+
+SYSTEM_PROMPT = """You are the customer support assistant for {business_name}, a Singapore business.
+Business hours: {hours_start}-{hours_end} ({timezone}), {working_days}.
+Contact: {support_email}, {support_phone}.
+
+Be concise and friendly and reply in the customer's language. If you are
+not sure of an answer, say so and offer to connect the customer with staff."""
+
+_client: AsyncOpenAI | None = None
+
+
+def get_openai_client(settings: Settings) -> AsyncOpenAI:
+    """Shared OpenAI client for this process."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=settings.llm.openai_api_key)
+    return _client
+
+
+def build_messages(
+    settings: Settings,
+    message: str,
+    history: list[dict[str, Any]] | None = None,
+    documents: list[Document] | None = None,
+    summary: str | None = None,
+) -> list[dict[str, str]]:
+    """
+    Assemble chat messages within the RAG context token budget.
+
+    Args:
+        settings: Application settings
+        message: Current customer message
+        history: Previous turns (role/content dicts), oldest first
+        documents: Reranked knowledge chunks, best first
+        summary: Rolling summary of older turns
+
+    Returns:
+        OpenAI chat messages
+    """
+    business = settings.business
+    system_prompt = SYSTEM_PROMPT.format(
+        business_name=business.business_name,
+        hours_start=business.business_hours_start,
+        hours_end=business.business_hours_end,
+        timezone=business.business_timezone,
+        working_days=", ".join(business.working_days),
+        support_email=business.support_email,
+        support_phone=business.support_phone,
+    )
+    return pack_context(
+        system_prompt,
+        message,
+        history=history,
+        documents=documents,
+        summary=summary,
+        max_tokens=settings.rag.max_context_tokens,
+        max_messages=settings.rag.max_conversation_messages,
+    ).messages
+
+
+async def stream_completion(
+    settings: Settings,
+    messages: list[dict[str, str]],
+    model: str | None = None,
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream completion text deltas (primary model unless overridden).
+
+    Args:
+        settings: Application settings
+        messages: Chat messages
+        model: Model name, defaults to ``llm_primary_model``
+        temperature: Sampling temperature, defaults to the primary model's
+        max_tokens: Completion limit, defaults to the primary model's
+
+    Yields:
+        Non-empty content deltas
+    """
+    llm = settings.llm
+    stream = await get_openai_client(settings).chat.completions.create(
+        model=model or llm.llm_primary_model,
+        messages=messages,
+        temperature=llm.llm_primary_temperature if temperature is None else temperature,
+        max_tokens=max_tokens or llm.llm_primary_max_tokens,
+        stream=True,
+    )
+    async for event in stream:
+        if event.choices and event.choices[0].delta.content:
+            yield event.choices[0].delta.content
@@ -17,17 +17,25 @@ from typing import Optional
 from uuid import uuid4
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Request, status, WebSocket, WebSocketDisconnect
 
+from app.agent.cascade import CascadeRouter
+from app.agent.intent import get_intent_classifier, template_answer
+from app.agent.llm import build_messages, stream_completion
 from app.config import Settings, get_settings
+from app.models.domain import AgentResponse
 from app.models.schemas import (
     ChatMessageRequest,
     ChatMessageResponse,
     ConversationHistory,
     FeedbackRequest,
     FeedbackResponse,
-    SourceCitation,
+    SuggestedAction,
 )
+from app.services.calendar import get_business_calendar
+from app.services.rate_limit import RouteClass, enforce_rate_limit, get_rate_limiter, request_identities
+from app.services.session_history import get_session_history
+from app.services.streaming import SlowConsumerError, stream_coalesced
 
 logger = structlog.get_logger(__name__)
 
@@ -48,20 +56,28 @@ router = APIRouter()
 )
 async def send_message(
     request: ChatMessageRequest,
+    http_request: Request,
     settings: Settings = Depends(get_settings),
 ) -> ChatMessageResponse:
     """
     Process a user message and return AI response.
     
     This endpoint:
-    1. Loads/creates conversation context
-    2. Retrieves relevant knowledge (RAG)
-    3. Generates AI response
-    4. Stores message in memory
-    5. Returns response with sources and suggestions
+    1. Loads the session's recent turns from short-term memory
+    2. Generates AI response (template or model cascade)
+    3. Stores the exchange in short-term memory
+    4. Returns response with suggestions
     """
     start_time = time.perf_counter()
     
+    await enforce_rate_limit(
+        http_request,
+        settings,
+        RouteClass.CHAT,
+        customer_id=request.customer_id,
+        session_id=str(request.session_id),
+    )
+    
     logger.info(
         "Processing chat message",
         session_id=request.session_id,
@@ -70,38 +86,49 @@ async def send_message(
     )
     
     try:
-        # TODO: Implement full agent pipeline
-        # For now, return a placeholder response
+        session_history = get_session_history(settings)
+        prediction = get_intent_classifier().classify(request.message)
+        template = template_answer(settings, prediction)
+        
+        result = None
+        if template is not None:
+            # Deterministic intent: answer from business settings, no LLM call
+            answer = AgentResponse(content=template, confidence=1.0, model_used="template")
+        else:
+            history = await session_history.load(request.session_id)
+            result = await CascadeRouter(settings).complete(
+                build_messages(settings, request.message, history),
+                request.message,
+            )
+            answer = result.response
+        
+        await session_history.append(
+            request.session_id,
+            {"role": "user", "content": request.message},
+            {"role": "assistant", "content": answer.content},
+        )
+        
+        requires_followup = answer.confidence < settings.agent.confidence_threshold
+        suggested_actions = [_handoff_action(settings)] if requires_followup else []
         
         processing_time = int((time.perf_counter() - start_time) * 1000)
         
-        # Placeholder response
         response = ChatMessageResponse(
             message_id=uuid4(),
             session_id=request.session_id,
-            content="Thank you for your message! I'm currently being set up. "
-                    "In the full implementation, I'll be able to help you with "
-                    "product information, business hours, pricing, and more.",
-            confidence=0.95,
-            sources=[
-                SourceCitation(
-                    source_id="placeholder-1",
-                    title="Getting Started Guide",
-                    category="documentation",
-                    relevance_score=0.9,
-                    snippet="This is a placeholder response.",
-                )
-            ],
-            suggested_actions=[],
+            content=answer.content,
+            confidence=answer.confidence,
+            sources=[],
+            suggested_actions=suggested_actions,
             quick_replies=[
                 "What are your business hours?",
                 "Tell me about your products",
                 "I need help with an order",
             ],
-            requires_followup=False,
+            requires_followup=requires_followup,
             escalated=False,
             detected_language="en",
-            detected_intent="general_inquiry",
+            detected_intent=prediction.intent.value,
             processing_time_ms=processing_time,
             timestamp=datetime.utcnow(),
         )
@@ -111,6 +138,11 @@ async def send_message(
             session_id=request.session_id,
             processing_time_ms=processing_time,
             confidence=response.confidence,
+            intent=prediction.intent.value,
+            intent_confidence=prediction.confidence,
+            model_used=answer.model_used,
+            escalated_by=result.escalated_by if result else None,
+            cost_usd=round(result.cost_usd, 6) if result else 0.0,
         )
         
         return response
@@ -127,6 +159,27 @@ async def send_message(
         )
 
 
+def _handoff_action(settings: Settings) -> SuggestedAction:
+    """Route a low-confidence answer to live staff while open, else to a message."""
+    hours = get_business_calendar(settings).status()
+    if hours.is_open:
+        return SuggestedAction(
+            action_type="button",
+            label="Chat with our staff",
+            value="escalate",
+            metadata={"closes_at": hours.closes_at.isoformat()},
+        )
+    return SuggestedAction(
+        action_type="button",
+        label="Leave a message",
+        value="leave_message",
+        metadata={
+            "status": hours.status_message,
+            "next_opening": hours.next_opening.isoformat() if hours.next_opening else None,
+        },
+    )
+
+
 @router.get(
     "/history/{session_id}",
     response_model=ConversationHistory,
@@ -204,18 +257,26 @@ async def submit_feedback(
 async def websocket_chat(
     websocket: WebSocket,
     session_id: str,
+    settings: Settings = Depends(get_settings),
 ):
     """
     WebSocket endpoint for real-time chat.
     
     Supports:
-    - Real-time message streaming
+    - Real-time message streaming ("chunk" frames, then a final "chat" frame)
     - Typing indicators
     - Connection status updates
+    
+    Model tokens are coalesced into frames by size or time window, and a
+    slow client pauses generation (bounded buffering) rather than queueing
+    frames without limit; a client that stops reading is disconnected.
     """
     await websocket.accept()
     
     logger.info("WebSocket connection established", session_id=session_id)
+    streaming = settings.streaming
+    session_history = get_session_history(settings)
+    identities = request_identities(websocket, settings, session_id=session_id)
     
     try:
         # Send connection confirmation
@@ -241,9 +302,24 @@ async def websocket_chat(
                 })
             
             elif message_type == "chat":
-                # TODO: Process chat message through agent
                 payload = data.get("payload", {})
                 message = payload.get("message", "")
+                message_id = str(uuid4())
+                start_time = time.perf_counter()
+                
+                if settings.security.rate_limit_enabled:
+                    decision = await get_rate_limiter(settings).check(RouteClass.CHAT, identities)
+                    if not decision.allowed:
+                        await websocket.send_json({
+                            "type": "error",
+                            "payload": {
+                                "code": "rate_limited",
+                                "message": "Rate limit exceeded. Please slow down.",
+                                "retry_after": decision.retry_after_seconds,
+                            },
+                            "timestamp": datetime.utcnow().isoformat(),
+                        })
+                        continue
                 
                 # Send typing indicator
                 await websocket.send_json({
@@ -252,18 +328,40 @@ async def websocket_chat(
                     "timestamp": datetime.utcnow().isoformat(),
                 })
                 
-                # Simulate processing (replace with actual agent call)
-                import asyncio
-                await asyncio.sleep(1)
+                async def send_chunk(text: str) -> None:
+                    await websocket.send_json({
+                        "type": "chunk",
+                        "payload": {"message_id": message_id, "content": text},
+                    })
                 
-                # Send response
+                prediction = get_intent_classifier().classify(message)
+                reply = template_answer(settings, prediction)
+                result = None
+                if reply is None:
+                    history = await session_history.load(session_id)
+                    result = await stream_coalesced(
+                        stream_completion(settings, build_messages(settings, message, history)),
+                        send_chunk,
+                        max_chars=streaming.ws_coalesce_max_chars,
+                        window_ms=streaming.ws_coalesce_window_ms,
+                        max_pending=streaming.ws_max_pending_deltas,
+                        send_timeout=streaming.ws_send_timeout_seconds,
+                    )
+                    reply = result.text
+                await session_history.append(
+                    session_id,
+                    {"role": "user", "content": message},
+                    {"role": "assistant", "content": reply},
+                )
+                
+                # Send the complete response
                 await websocket.send_json({
                     "type": "chat",
                     "payload": {
-                        "message_id": str(uuid4()),
-                        "content": f"I received your message: '{message}'. "
-                                   "Full implementation coming soon!",
-                        "confidence": 0.95,
+                        "message_id": message_id,
+                        "content": reply,
+                        "detected_intent": prediction.intent.value,
+                        "processing_time_ms": int((time.perf_counter() - start_time) * 1000),
                     },
                     "timestamp": datetime.utcnow().isoformat(),
                 })
@@ -274,10 +372,23 @@ async def websocket_chat(
                     "payload": {"is_typing": False},
                     "timestamp": datetime.utcnow().isoformat(),
                 })
+                
+                logger.info(
+                    "WebSocket reply sent",
+                    session_id=session_id,
+                    intent=prediction.intent.value,
+                    templated=result is None,
+                    deltas=result.deltas if result else 0,
+                    frames=result.frames if result else 0,
+                )
     
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected", session_id=session_id)
     
+    except SlowConsumerError:
+        logger.warning("Closing slow WebSocket client", session_id=session_id)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Client too slow")
+    
     except Exception as e:
         logger.exception("WebSocket error", session_id=session_id, error=str(e))
         await websocket.close(code=1011, reason="Internal server error")
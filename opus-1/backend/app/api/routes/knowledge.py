@@ -14,7 +14,7 @@ from typing import Optional
 from uuid import uuid4
 
 import structlog
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
 
 from app.config import Settings, get_settings
 from app.models.schemas import (
@@ -24,6 +24,7 @@ from app.models.schemas import (
     KnowledgeSearchResponse,
     KnowledgeSearchResult,
 )
+from app.services.rate_limit import RouteClass, enforce_rate_limit
 
 logger = structlog.get_logger(__name__)
 
@@ -38,6 +39,7 @@ router = APIRouter()
 )
 async def search_knowledge(
     request: KnowledgeSearchRequest,
+    http_request: Request,
     settings: Settings = Depends(get_settings),
 ) -> KnowledgeSearchResponse:
     """
@@ -47,6 +49,8 @@ async def search_knowledge(
     """
     start_time = time.perf_counter()
     
+    await enforce_rate_limit(http_request, settings, RouteClass.SEARCH)
+    
     logger.info(
         "Knowledge search request",
         query=request.query[:100],
@@ -85,6 +89,7 @@ async def search_knowledge(
     description="Upload a document to the knowledge base",
 )
 async def upload_document(
+    http_request: Request,
     file: UploadFile = File(...),
     source_type: str = "general",
     settings: Settings = Depends(get_settings),
@@ -101,6 +106,8 @@ async def upload_document(
     - CSV (.csv)
     - JSON (.json)
     """
+    await enforce_rate_limit(http_request, settings, RouteClass.KNOWLEDGE_UPLOAD)
+    
     logger.info(
         "Document upload request",
         filename=file.filename,
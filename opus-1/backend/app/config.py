@@ -69,6 +69,12 @@ class LLMSettings(BaseSettings):
     llm_secondary_temperature: float = Field(default=0.2, ge=0.0, le=2.0)
     llm_secondary_max_tokens: int = Field(default=2048, ge=100, le=8192)
     
+    # Pricing (USD per 1M tokens, for cascade cost tracking)
+    llm_primary_input_cost_per_1m: float = Field(default=0.15, ge=0.0)
+    llm_primary_output_cost_per_1m: float = Field(default=0.60, ge=0.0)
+    llm_secondary_input_cost_per_1m: float = Field(default=2.50, ge=0.0)
+    llm_secondary_output_cost_per_1m: float = Field(default=10.00, ge=0.0)
+    
     # Embedding
     embedding_model: str = Field(default="text-embedding-3-small")
     embedding_dimensions: int = Field(default=1536)
@@ -187,6 +193,15 @@ class AgentSettings(BaseSettings):
     escalation_sentiment_threshold: float = Field(default=-0.5, ge=-1.0, le=0.0)
     max_response_length: int = Field(default=1500, ge=100, le=5000)
     include_sources: bool = Field(default=True)
+    
+    # Model cascade (escalate primary → secondary model)
+    cascade_enabled: bool = Field(default=True)
+    complex_query_min_words: int = Field(default=60, ge=5)
+    
+    # Intent fast path (template answers without an LLM call)
+    intent_fast_path_enabled: bool = Field(default=True)
+    intent_fast_path_threshold: float = Field(default=0.4, ge=0.0, le=1.0)
+    intent_fast_path_margin: float = Field(default=0.15, ge=0.0, le=1.0)
 
 
 class BusinessSettings(BaseSettings):
@@ -202,9 +217,17 @@ class BusinessSettings(BaseSettings):
     support_email: str = Field(default="support@yourcompany.com")
     support_phone: str = Field(default="+65-6123-4567")
     
+    # Calendar (public holidays are bundled; add company closures here)
+    business_extra_holidays: str = Field(default="")  # comma-separated YYYY-MM-DD
+    calendar_horizon_months: int = Field(default=12, ge=1, le=36)
+    
     @property
     def working_days(self) -> list[str]:
         return [day.strip() for day in self.business_days.split(",")]
+    
+    @property
+    def extra_holidays(self) -> list[str]:
+        return [day.strip() for day in self.business_extra_holidays.split(",") if day.strip()]
 
 
 class SecuritySettings(BaseSettings):
@@ -215,7 +238,14 @@ class SecuritySettings(BaseSettings):
     api_key_header: str = Field(default="X-API-Key")
     api_keys: str = Field(default="")
     cors_origins: str = Field(default="http://localhost:3000")
-    rate_limit_per_minute: int = Field(default=60, ge=1, le=1000)
+    rate_limit_enabled: bool = Field(default=True)
+    rate_limit_per_minute: int = Field(default=60, ge=1, le=1000)  # chat
+    rate_limit_upload_per_minute: int = Field(default=10, ge=1, le=1000)
+    rate_limit_search_per_minute: int = Field(default=120, ge=1, le=1000)
+    rate_limit_api_key_multiplier: int = Field(default=10, ge=1, le=1000)
+    rate_limit_ip_multiplier: int = Field(default=5, ge=1, le=1000)
+    rate_limit_local_cache_ms: int = Field(default=250, ge=0, le=5000)
+    rate_limit_lease_size: int = Field(default=5, ge=1, le=100)
     jwt_secret_key: str = Field(default="change-me-in-production")
     jwt_algorithm: str = Field(default="HS256")
     jwt_expiration_hours: int = Field(default=24, ge=1, le=168)
@@ -229,6 +259,20 @@ class SecuritySettings(BaseSettings):
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
 
+class StreamingSettings(BaseSettings):
+    """Streamed reply (WebSocket) configuration."""
+    
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    
+    # Tokens are coalesced into frames by size or by time window
+    ws_coalesce_max_chars: int = Field(default=64, ge=1, le=4096)
+    ws_coalesce_window_ms: float = Field(default=50.0, ge=0.0, le=1000.0)
+    
+    # Backpressure: tokens buffered per slow connection, and how long one send may take
+    ws_max_pending_deltas: int = Field(default=256, ge=1, le=10000)
+    ws_send_timeout_seconds: float = Field(default=10.0, gt=0.0, le=120.0)
+
+
 class Settings(BaseSettings):
     """
     Master Settings Container
@@ -249,6 +293,7 @@ class Settings(BaseSettings):
     agent: AgentSettings = Field(default_factory=AgentSettings)
     business: BusinessSettings = Field(default_factory=BusinessSettings)
     security: SecuritySettings = Field(default_factory=SecuritySettings)
+    streaming: StreamingSettings = Field(default_factory=StreamingSettings)
 
 
 @lru_cache
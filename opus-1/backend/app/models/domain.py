@@ -19,6 +19,7 @@ class Intent(str, Enum):
     PRODUCT_INQUIRY = "product_inquiry"
     PRICING = "pricing"
     BUSINESS_HOURS = "business_hours"
+    CONTACT_INFO = "contact_info"
     ORDER_STATUS = "order_status"
     COMPLAINT = "complaint"
     TECHNICAL_SUPPORT = "technical_support"
@@ -161,9 +162,12 @@ class EscalationRequest:
 class BusinessHoursStatus:
     """
     Current business hours status.
+    
+    is_open is None when it cannot be told (the holiday calendar does not
+    cover the date yet).
     """
     
-    is_open: bool
+    is_open: Optional[bool]
     current_time: datetime
     opens_at: Optional[datetime] = None
     closes_at: Optional[datetime] = None
@@ -172,6 +176,8 @@ class BusinessHoursStatus:
     
     @property
     def status_message(self) -> str:
+        if self.is_open is None:
+            return "We can't confirm our opening hours for this date yet."
         if self.is_open:
             return f"We're currently open until {self.closes_at.strftime('%I:%M %p') if self.closes_at else 'later today'}."
         elif self.next_opening:
@@ -0,0 +1,182 @@
+"""
+Business Calendar
+═══════════════════════════════════════════════════════════════════════════════════
+
+Precomputed opening intervals for the next N months, built once from
+BusinessSettings and a bundled Singapore public-holiday table. Questions
+such as "are you open?", "when do you next open?" and "how long until
+close?" are answered with a bisect over the interval start times (O(log n))
+instead of re-parsing the hour and day strings on every request. Dates the
+holiday table does not fully cover yet get an unknown (None) is_open.
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.config import BusinessSettings, Settings
+from app.models.domain import BusinessHoursStatus
+
+# Singapore gazetted public holidays (Ministry of Manpower). A holiday that
+# falls on a Sunday is observed on the following Monday; those Mondays are
+# listed explicitly. BUSINESS_EXTRA_HOLIDAYS covers company closures.
+SINGAPORE_PUBLIC_HOLIDAYS: dict[date, str] = {
+    # 2025
+    date(2025, 1, 1): "New Year's Day",
+    date(2025, 1, 29): "Chinese New Year",
+    date(2025, 1, 30): "Chinese New Year",
+    date(2025, 3, 31): "Hari Raya Puasa",
+    date(2025, 4, 18): "Good Friday",
+    date(2025, 5, 1): "Labour Day",
+    date(2025, 5, 3): "Polling Day",
+    date(2025, 5, 12): "Vesak Day",
+    date(2025, 6, 7): "Hari Raya Haji",
+    date(2025, 8, 9): "National Day",
+    date(2025, 10, 20): "Deepavali",
+    date(2025, 12, 25): "Christmas Day",
+    # 2026
+    date(2026, 1, 1): "New Year's Day",
+    date(2026, 2, 17): "Chinese New Year",
+    date(2026, 2, 18): "Chinese New Year",
+    date(2026, 3, 21): "Hari Raya Puasa",
+    date(2026, 4, 3): "Good Friday",
+    date(2026, 5, 1): "Labour Day",
+    date(2026, 5, 27): "Hari Raya Haji",
+    date(2026, 5, 31): "Vesak Day",
+    date(2026, 6, 1): "Vesak Day (observed)",
+    date(2026, 8, 9): "National Day",
+    date(2026, 8, 10): "National Day (observed)",
+    date(2026, 11, 8): "Deepavali",
+    date(2026, 11, 9): "Deepavali (observed)",
+    date(2026, 12, 25): "Christmas Day",
+    # 2027 (fixed-date holidays)
+    date(2027, 1, 1): "New Year's Day",
+    date(2027, 3, 26): "Good Friday",
+    date(2027, 5, 1): "Labour Day",
+    date(2027, 8, 9): "National Day",
+    date(2027, 12, 25): "Christmas Day",
+}
+
+# Last day for which every gazetted holiday is listed above. 2027 still lacks
+# its lunar, Islamic and Hindu dates, so hours after this day are reported as
+# unknown rather than open; move it forward when a year is completed.
+HOLIDAYS_LISTED_THROUGH = date(2026, 12, 31)
+
+
+def _parse_time(value: str) -> time:
+    hours, minutes = value.split(":")
+    return time(int(hours), int(minutes))
+
+
+class BusinessCalendar:
+    """
+    Opening intervals as parallel sorted lists of UTC timestamps.
+
+    Usage:
+        calendar = get_business_calendar(settings)
+        calendar.status().status_message
+    """
+
+    def __init__(
+        self,
+        business: BusinessSettings,
+        months: int = 12,
+        holidays: Optional[dict[date, str]] = None,
+        start: Optional[date] = None,
+        holidays_listed_through: date = HOLIDAYS_LISTED_THROUGH,
+    ):
+        self.tz = ZoneInfo(business.business_timezone)
+        self.months = months
+        self.holidays = dict(SINGAPORE_PUBLIC_HOLIDAYS if holidays is None else holidays)
+        self.holidays_listed_through = holidays_listed_through
+        for value in business.extra_holidays:
+            self.holidays.setdefault(date.fromisoformat(value), "Company holiday")
+        self._opens = _parse_time(business.business_hours_start)
+        self._closes = _parse_time(business.business_hours_end)
+        self._working_days = {day.lower() for day in business.working_days}
+        self._build(start or datetime.now(self.tz).date())
+
+    def _build(self, start: date) -> None:
+        self.first_day = start
+        self.last_day = start + timedelta(days=round(self.months * 30.44))
+        self._starts: list[float] = []
+        self._ends: list[float] = []
+        day = start
+        while day <= min(self.last_day, self.holidays_listed_through):
+            if day.strftime("%A").lower() in self._working_days and day not in self.holidays:
+                opens = datetime.combine(day, self._opens, self.tz)
+                closes = datetime.combine(day, self._closes, self.tz)
+                if closes <= opens:  # overnight hours close the next day
+                    closes += timedelta(days=1)
+                self._starts.append(opens.timestamp())
+                self._ends.append(closes.timestamp())
+            day += timedelta(days=1)
+
+    def _timestamp(self, at: Optional[datetime]) -> float:
+        at = at or datetime.now(timezone.utc)
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=self.tz)
+        local_day = at.astimezone(self.tz).date()
+        if local_day < self.first_day or local_day > self.last_day - timedelta(days=7):
+            # Outside the precomputed window: roll it forward (or back)
+            self._build(local_day - timedelta(days=1))
+        return at.timestamp()
+
+    def _local(self, ts: float) -> datetime:
+        return datetime.fromtimestamp(ts, self.tz)
+
+    def status(self, at: Optional[datetime] = None) -> BusinessHoursStatus:
+        """Open/closed status with the current interval or the next opening.
+
+        ``is_open`` is None past ``holidays_listed_through``, where an
+        unlisted public holiday could make "open" wrong.
+        """
+        ts = self._timestamp(at)
+        i = bisect_right(self._starts, ts) - 1
+        now = self._local(ts)
+        if now.date() > self.holidays_listed_through:
+            return BusinessHoursStatus(is_open=None, current_time=now, timezone=self.tz.key)
+        if i >= 0 and ts < self._ends[i]:
+            return BusinessHoursStatus(
+                is_open=True,
+                current_time=now,
+                opens_at=self._local(self._starts[i]),
+                closes_at=self._local(self._ends[i]),
+                timezone=self.tz.key,
+            )
+        following = i + 1
+        return BusinessHoursStatus(
+            is_open=False,
+            current_time=now,
+            next_opening=self._local(self._starts[following]) if following < len(self._starts) else None,
+            timezone=self.tz.key,
+        )
+
+    def is_open(self, at: Optional[datetime] = None) -> Optional[bool]:
+        """Whether the business is open (None when the holidays are not known)."""
+        return self.status(at).is_open
+
+    def next_open(self, at: Optional[datetime] = None) -> Optional[datetime]:
+        """Start of the next opening interval (None while open)."""
+        return self.status(at).next_opening
+
+    def time_until_close(self, at: Optional[datetime] = None) -> Optional[timedelta]:
+        """Time left in the current opening interval (None while closed)."""
+        status = self.status(at)
+        return status.closes_at - status.current_time if status.is_open else None
+
+    def holiday(self, day: date) -> Optional[str]:
+        """Public or company holiday name for a date."""
+        return self.holidays.get(day)
+
+
+_calendar: Optional[BusinessCalendar] = None
+
+
+def get_business_calendar(settings: Settings) -> BusinessCalendar:
+    """Shared calendar for the configured business (built once per process)."""
+    global _calendar
+    if _calendar is None:
+        _calendar = BusinessCalendar(settings.business, settings.business.calendar_horizon_months)
+    return _calendar
@@ -0,0 +1,264 @@
+"""
+Rate Limiter
+═══════════════════════════════════════════════════════════════════════════════════
+
+Token-bucket rate limiting per customer, session, API key and client
+address, with separate limits per route class (chat, knowledge upload,
+search).
+
+- Buckets live in Redis and are checked and debited by one Lua script, so
+  all workers share a limit and a request's buckets update atomically.
+- Redis TIME is the clock, so worker clock skew does not matter.
+- Each worker caches decisions for a short time. A denial is cached until
+  the bucket could refill. A client that keeps coming back leases a few
+  tokens at once and spends them locally; whatever is left when the lease
+  expires goes back to the buckets with the client's next check. Hot and
+  abusive clients therefore do not cost a Redis round-trip per request,
+  and the shared limit is never exceeded.
+- If Redis is unavailable the limiter fails open (and logs), so an outage
+  of the cache does not take chat down with it.
+"""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+import redis.asyncio as redis
+import structlog
+from fastapi import HTTPException, Request, status
+from fastapi.requests import HTTPConnection
+
+from app.config import SecuritySettings, Settings
+
+logger = structlog.get_logger(__name__)
+
+# KEYS: one bucket per identity. ARGV[1]: tokens wanted; ARGV[2]: unspent
+# leased tokens handed back; ARGV[i + 2]: the per-minute capacity of KEYS[i]
+# (buckets refill linearly over a minute). Grants min(wanted, tokens in the
+# emptiest bucket) from every bucket, or nothing plus the wait (ms) until
+# each bucket holds a whole token.
+TOKEN_BUCKET_LUA = """
+local grant = tonumber(ARGV[1])
+local refund = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i + 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * capacity / 60000 + refund)
+    levels[i] = tokens
+    grant = math.min(grant, math.floor(tokens))
+end
+local wait = 0
+if grant < 1 then
+    grant = 0
+    for i = 1, #KEYS do
+        if levels[i] < 1 then
+            wait = math.max(wait, math.ceil((1 - levels[i]) * 60000 / tonumber(ARGV[i + 2])))
+        end
+    end
+end
+if grant > 0 or refund > 0 then
+    for i, key in ipairs(KEYS) do
+        redis.call('HSET', key, 'tokens', tostring(levels[i] - grant), 'ts', now)
+        redis.call('PEXPIRE', key, 60000)
+    end
+end
+return {grant, wait}
+"""
+
+# Local decision cache bound (distinct client identities per worker)
+LOCAL_CACHE_SIZE = 10_000
+
+
+class RouteClass(str, Enum):
+    """Route groups with their own limits."""
+
+    CHAT = "chat"
+    KNOWLEDGE_UPLOAD = "knowledge_upload"
+    SEARCH = "search"
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate-limit check."""
+
+    allowed: bool
+    retry_after_seconds: float = 0.0
+    cached: bool = False
+
+
+@dataclass
+class _LocalEntry:
+    tokens: int = 0
+    expires_at: float = 0.0
+    denied_until: float = 0.0
+
+
+class RateLimiter:
+    """
+    Redis token buckets with a per-worker decision cache.
+
+    Usage:
+        decision = await limiter.check(RouteClass.CHAT, ["session:abc", "key:1f2e"])
+    """
+
+    def __init__(self, client: redis.Redis, security: SecuritySettings):
+        self.client = client
+        self.security = security
+        self._script = client.register_script(TOKEN_BUCKET_LUA)
+        self._local: OrderedDict[tuple, _LocalEntry] = OrderedDict()
+
+    def limit_per_minute(self, route_class: RouteClass) -> int:
+        security = self.security
+        return {
+            RouteClass.CHAT: security.rate_limit_per_minute,
+            RouteClass.KNOWLEDGE_UPLOAD: security.rate_limit_upload_per_minute,
+            RouteClass.SEARCH: security.rate_limit_search_per_minute,
+        }[route_class]
+
+    async def check(self, route_class: RouteClass, identities: list[str]) -> RateLimitDecision:
+        """
+        Take one token from every identity's bucket for this route class.
+
+        Args:
+            route_class: Route group being called
+            identities: Bucket identities (e.g. "customer:42", "session:abc")
+
+        Returns:
+            RateLimitDecision
+        """
+        now = time.monotonic()
+        cache_key = (route_class, *identities)
+        entry = self._local.get(cache_key)
+        refund = 0
+        if entry is not None:
+            self._local.move_to_end(cache_key)
+            if entry.denied_until > now:
+                return RateLimitDecision(False, entry.denied_until - now, cached=True)
+            if entry.tokens > 0 and entry.expires_at > now:
+                entry.tokens -= 1
+                return RateLimitDecision(True, cached=True)
+            # Expired lease: hand the unspent tokens back with this call
+            # (an entry evicted from the cache loses them to the next refill)
+            refund = entry.tokens
+
+        capacity = self.limit_per_minute(route_class)
+        local_ttl = self.security.rate_limit_local_cache_ms / 1000
+        # Only clients seen within the cache window lease more than one token
+        hot = entry is not None and now - entry.expires_at < local_ttl
+        wanted = max(1, min(self.security.rate_limit_lease_size, capacity // 10)) if hot else 1
+
+        # API keys and client addresses are shared by many users, so their buckets are larger
+        multipliers = {
+            "key": self.security.rate_limit_api_key_multiplier,
+            "ip": self.security.rate_limit_ip_multiplier,
+        }
+        capacities = [
+            capacity * multipliers.get(identity.split(":", 1)[0], 1) for identity in identities
+        ]
+        try:
+            granted, wait_ms = await self._script(
+                keys=[f"ratelimit:{route_class.value}:{identity}" for identity in identities],
+                args=[wanted, refund, *capacities],
+            )
+        except redis.RedisError as e:
+            logger.warning("Rate limiter unavailable, allowing request", error=str(e))
+            return RateLimitDecision(True)
+
+        entry = entry or _LocalEntry()
+        if granted:
+            entry.tokens = int(granted) - 1
+            entry.expires_at = now + local_ttl
+            entry.denied_until = 0.0
+        else:
+            entry.tokens = 0
+            entry.denied_until = now + int(wait_ms) / 1000
+        self._local[cache_key] = entry
+        self._local.move_to_end(cache_key)
+        if len(self._local) > LOCAL_CACHE_SIZE:
+            self._local.popitem(last=False)
+
+        if granted:
+            return RateLimitDecision(True)
+        return RateLimitDecision(False, int(wait_ms) / 1000)
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter(settings: Settings) -> RateLimiter:
+    """Shared limiter (and Redis connection pool) for this process."""
+    global _limiter
+    if _limiter is None:
+        client = redis.from_url(settings.redis.url, decode_responses=True)
+        _limiter = RateLimiter(client, settings.security)
+    return _limiter
+
+
+def request_identities(
+    request: HTTPConnection,
+    settings: Settings,
+    customer_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> list[str]:
+    """
+    Bucket identities for a request or WebSocket: customer, session, and
+    either API key or client address.
+
+    Customer and session ids are chosen by the client, so on their own a
+    client could rotate them to dodge every limit. Requests without a
+    configured API key are therefore always charged to their client
+    address as well. API keys are hashed so they never appear in Redis key
+    names.
+    """
+    identities = []
+    if customer_id:
+        identities.append(f"customer:{customer_id}")
+    if session_id:
+        identities.append(f"session:{session_id}")
+    api_key = request.headers.get(settings.security.api_key_header)
+    if api_key and api_key in settings.security.api_keys_list:
+        identities.append(f"key:{hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()}")
+    else:
+        identities.append(f"ip:{request.client.host if request.client else 'unknown'}")
+    return identities
+
+
+async def enforce_rate_limit(
+    request: Request,
+    settings: Settings,
+    route_class: RouteClass,
+    customer_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> None:
+    """
+    Raise 429 Too Many Requests when any of the request's buckets is empty.
+
+    Raises:
+        HTTPException: 429 with a Retry-After header
+    """
+    if not settings.security.rate_limit_enabled:
+        return
+    identities = request_identities(request, settings, customer_id, session_id)
+    decision = await get_rate_limiter(settings).check(route_class, identities)
+    if not decision.allowed:
+        logger.warning(
+            "Rate limit exceeded",
+            route_class=route_class.value,
+            identities=identities,
+            retry_after=decision.retry_after_seconds,
+            cached=decision.cached,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded. Please slow down.",
+            headers={"Retry-After": str(max(1, math.ceil(decision.retry_after_seconds)))},
+        )
@@ -0,0 +1,76 @@
+"""
+Session History
+═══════════════════════════════════════════════════════════════════════════════════
+
+Short-term conversation memory: the recent turns of each session, kept in
+Redis so every worker sees the same conversation.
+
+- One Redis list per session, trimmed to RAGSettings.max_conversation_messages
+  and expiring after RedisSettings.redis_session_ttl without activity.
+- Entries are stored with their token count (see app.agent.context), so the
+  context packer never re-tokenizes history.
+- If Redis is unavailable, history reads come back empty and writes are
+  dropped (and logged); chat keeps answering, just without earlier turns.
+"""
+
+import json
+from typing import Any, Optional
+
+import redis.asyncio as redis
+import structlog
+
+from app.agent.context import with_token_count
+from app.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+
+class SessionHistory:
+    """
+    Recent role/content turns per session, oldest first.
+
+    Usage:
+        history = await store.load("sess_abc123")
+        await store.append("sess_abc123", {"role": "user", "content": "Hi"})
+    """
+
+    KEY_PREFIX = "session:history:"
+
+    def __init__(self, client: redis.Redis, settings: Settings):
+        self.client = client
+        self.max_messages = settings.rag.max_conversation_messages
+        self.ttl_seconds = settings.redis.redis_session_ttl
+
+    async def load(self, session_id: str) -> list[dict[str, Any]]:
+        """Stored turns of a session (empty when unknown or Redis is down)."""
+        try:
+            raw = await self.client.lrange(f"{self.KEY_PREFIX}{session_id}", 0, -1)
+        except redis.RedisError as e:
+            logger.warning("Session history unavailable", session_id=session_id, error=str(e))
+            return []
+        return [json.loads(entry) for entry in raw]
+
+    async def append(self, session_id: str, *messages: dict[str, Any]) -> None:
+        """Store turns with their token counts, keeping only the most recent ones."""
+        key = f"{self.KEY_PREFIX}{session_id}"
+        entries = [json.dumps(with_token_count(message), ensure_ascii=False) for message in messages]
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(key, *entries)
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.expire(key, self.ttl_seconds)
+        try:
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Session history write failed", session_id=session_id, error=str(e))
+
+
+_history: Optional[SessionHistory] = None
+
+
+def get_session_history(settings: Settings) -> SessionHistory:
+    """Shared history store (and Redis connection pool) for this process."""
+    global _history
+    if _history is None:
+        client = redis.from_url(settings.redis.url, decode_responses=True)
+        _history = SessionHistory(client, settings)
+    return _history
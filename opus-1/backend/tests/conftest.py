@@ -0,0 +1,10 @@
+"""
+Shared test configuration.
+
+app.config validates settings at import time, so required values get
+test defaults before any app module is imported.
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -0,0 +1,110 @@
+"""
+Rate limiter integration tests: TOKEN_BUCKET_LUA runs in a real Redis.
+
+Point REDIS_URL at a disposable Redis (default redis://localhost:6379/15);
+the tests are skipped when it is not reachable.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+
+from app.config import SecuritySettings
+from app.services.rate_limit import TOKEN_BUCKET_LUA, RateLimiter, RouteClass
+
+pytestmark = pytest.mark.asyncio
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await client.ping()
+    except (redis.RedisError, OSError):
+        pytest.skip(f"Redis is not reachable at {REDIS_URL}")
+    yield client
+    await client.aclose()
+
+
+def bucket_keys(count: int = 1) -> list[str]:
+    prefix = f"test:ratelimit:{uuid.uuid4().hex}"
+    return [f"{prefix}:{i}" for i in range(count)]
+
+
+async def take(
+    client: redis.Redis, keys: list[str], wanted: int, capacities: list[int], refund: int = 0
+) -> tuple[int, int]:
+    granted, wait_ms = await client.eval(TOKEN_BUCKET_LUA, len(keys), *keys, wanted, refund, *capacities)
+    return int(granted), int(wait_ms)
+
+
+async def level(client: redis.Redis, key: str) -> float:
+    return float(await client.hget(key, "tokens"))
+
+
+def limiter(client: redis.Redis, per_minute: int, local_cache_ms: int = 250) -> RateLimiter:
+    security = SecuritySettings(
+        rate_limit_per_minute=per_minute,
+        rate_limit_local_cache_ms=local_cache_ms,
+        rate_limit_lease_size=5,
+    )
+    return RateLimiter(client, security)
+
+
+async def test_bucket_grants_until_empty_then_reports_wait(client):
+    keys = bucket_keys()
+    for _ in range(3):
+        assert (await take(client, keys, 1, [3]))[0] == 1
+
+    granted, wait_ms = await take(client, keys, 1, [3])
+    assert granted == 0
+    # One token refills every 60000 / 3 ms
+    assert 0 < wait_ms <= 20_000
+    assert 0 < await client.pttl(keys[0]) <= 60_000
+
+
+async def test_grant_is_bounded_by_emptiest_bucket_and_denial_debits_nothing(client):
+    keys = bucket_keys(2)
+    assert await take(client, keys, 5, [10, 2]) == (2, 0)
+    assert await level(client, keys[0]) == pytest.approx(8, abs=0.1)
+
+    granted, wait_ms = await take(client, keys, 1, [10, 2])
+    assert granted == 0 and wait_ms > 0
+    assert await level(client, keys[0]) == pytest.approx(8, abs=0.1)
+
+
+async def test_refund_returns_unspent_tokens_up_to_capacity(client):
+    keys = bucket_keys()
+    assert (await take(client, keys, 5, [10]))[0] == 5
+    assert (await take(client, keys, 1, [10], refund=4))[0] == 1
+    assert await level(client, keys[0]) == pytest.approx(8, abs=0.1)
+
+    assert (await take(client, keys, 1, [10], refund=100))[0] == 1
+    assert await level(client, keys[0]) == pytest.approx(9, abs=0.1)
+
+
+async def test_expired_leases_do_not_shrink_the_allowance(client):
+    # Requests just past the local cache window lease 5 tokens each time;
+    # the unspent 4 must go back instead of being lost
+    rate_limiter = limiter(client, per_minute=60, local_cache_ms=10)
+    identities = [f"session:{uuid.uuid4().hex}"]
+    allowed = 0
+    for _ in range(60):
+        allowed += (await rate_limiter.check(RouteClass.CHAT, identities)).allowed
+        await asyncio.sleep(0.015)
+    assert allowed == 60
+
+
+async def test_workers_share_one_limit(client):
+    workers = [limiter(client, per_minute=20), limiter(client, per_minute=20)]
+    identities = [f"session:{uuid.uuid4().hex}", f"ip:{uuid.uuid4().hex}"]
+    decisions = [await workers[i % 2].check(RouteClass.CHAT, identities) for i in range(100)]
+    allowed = sum(decision.allowed for decision in decisions)
+    # The capacity, plus at most one token refilled while the test runs
+    assert 20 <= allowed <= 21
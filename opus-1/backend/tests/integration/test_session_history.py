@@ -0,0 +1,60 @@
+"""
+Session history integration tests: turns are stored in a real Redis.
+
+Point REDIS_URL at a disposable Redis (default redis://localhost:6379/15);
+the tests are skipped when it is not reachable.
+"""
+
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+
+from app.agent.context import count_tokens
+from app.config import get_settings
+from app.services.session_history import SessionHistory
+
+pytestmark = pytest.mark.asyncio
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await client.ping()
+    except (redis.RedisError, OSError):
+        pytest.skip(f"Redis is not reachable at {REDIS_URL}")
+    yield client
+    await client.aclose()
+
+
+async def test_turns_are_stored_with_their_token_counts(client):
+    history = SessionHistory(client, get_settings())
+    session_id = uuid.uuid4().hex
+
+    await history.append(
+        session_id,
+        {"role": "user", "content": "What are your opening hours?"},
+        {"role": "assistant", "content": "We are open 9am to 6pm, Monday to Friday."},
+    )
+
+    turns = await history.load(session_id)
+    assert [turn["role"] for turn in turns] == ["user", "assistant"]
+    assert all(turn["token_count"] == count_tokens(turn["content"]) for turn in turns)
+    assert 0 < await client.ttl(f"{SessionHistory.KEY_PREFIX}{session_id}") <= history.ttl_seconds
+
+
+async def test_only_the_most_recent_turns_are_kept(client):
+    history = SessionHistory(client, get_settings())
+    session_id = uuid.uuid4().hex
+
+    for i in range(history.max_messages + 3):
+        await history.append(session_id, {"role": "user", "content": f"message {i}"})
+
+    turns = await history.load(session_id)
+    assert len(turns) == history.max_messages
+    assert turns[-1]["content"] == f"message {history.max_messages + 2}"
@@ -0,0 +1,137 @@
+"""
+Cascade routing tests: which tier answers, and what happens when one fails.
+"""
+
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent.cascade import PRIMARY, SECONDARY, CascadeRouter, is_complex_query
+from app.config import get_settings
+
+pytestmark = pytest.mark.asyncio
+
+MESSAGES = [{"role": "user", "content": "What are your opening hours?"}]
+
+
+def completion(content: str, token_probability: float = 0.95):
+    logprob = SimpleNamespace(logprob=math.log(token_probability))
+    return SimpleNamespace(
+        choices=[SimpleNamespace(
+            message=SimpleNamespace(content=content),
+            logprobs=SimpleNamespace(content=[logprob] * 5),
+        )],
+        usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20),
+    )
+
+
+class FakeClient:
+    """Scripted chat completions per model; an Exception is raised instead of returned."""
+
+    def __init__(self, replies: dict):
+        self.replies = replies
+        self.models: list[str] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model: str, **kwargs):
+        self.models.append(model)
+        reply = self.replies[model]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def settings():
+    return get_settings()
+
+
+def router(settings, primary, secondary) -> tuple[CascadeRouter, FakeClient]:
+    client = FakeClient({settings.llm.llm_primary_model: primary, settings.llm.llm_secondary_model: secondary})
+    return CascadeRouter(settings, client=client), client
+
+
+async def test_confident_primary_answer_stays_on_the_fast_path(settings):
+    cascade, client = router(settings, completion("We open at 9am."), completion("unused"))
+
+    result = await cascade.complete(MESSAGES, "What are your opening hours?")
+
+    assert result.response.content == "We open at 9am."
+    assert result.tier == PRIMARY
+    assert result.escalated_by is None
+    assert client.models == [settings.llm.llm_primary_model]
+
+
+async def test_low_confidence_escalates_to_the_secondary(settings):
+    cascade, client = router(settings, completion("Maybe 9am?", 0.3), completion("We open at 9am."))
+
+    result = await cascade.complete(MESSAGES, "What are your opening hours?")
+
+    assert result.response.content == "We open at 9am."
+    assert result.escalated_by == "low_confidence"
+    assert [a.tier for a in result.attempts] == [PRIMARY, SECONDARY]
+    assert result.cost_usd > 0
+
+
+async def test_hedging_answer_counts_as_low_confidence(settings):
+    cascade, _ = router(settings, completion("I'm not sure, maybe 9am."), completion("We open at 9am."))
+
+    result = await cascade.complete(MESSAGES, "What are your opening hours?")
+
+    assert result.escalated_by == "low_confidence"
+    assert result.attempts[0].confidence < settings.agent.confidence_threshold
+
+
+async def test_low_confidence_keeps_the_primary_answer_when_the_secondary_fails(settings):
+    cascade, _ = router(settings, completion("Maybe 9am?", 0.3), RuntimeError("secondary down"))
+
+    result = await cascade.complete(MESSAGES, "What are your opening hours?")
+
+    assert result.response.content == "Maybe 9am?"
+    assert result.response.model_used == settings.llm.llm_primary_model
+
+
+async def test_complex_query_goes_straight_to_the_secondary(settings):
+    cascade, client = router(settings, completion("unused"), completion("Plan A is cheaper."))
+
+    result = await cascade.complete(MESSAGES, "Can you compare plan A versus plan B for me?")
+
+    assert result.response.content == "Plan A is cheaper."
+    assert result.escalated_by == "complex_query"
+    assert client.models == [settings.llm.llm_secondary_model]
+
+
+async def test_complex_query_falls_back_to_the_primary_when_the_secondary_fails(settings):
+    cascade, client = router(settings, completion("Plan A is cheaper."), RuntimeError("secondary down"))
+
+    result = await cascade.complete(MESSAGES, "Can you compare plan A versus plan B for me?")
+
+    assert result.response.content == "Plan A is cheaper."
+    assert result.response.model_used == settings.llm.llm_primary_model
+    assert client.models == [settings.llm.llm_secondary_model, settings.llm.llm_primary_model]
+
+
+async def test_primary_error_escalates_and_both_failing_raises(settings):
+    cascade, _ = router(settings, RuntimeError("primary down"), completion("We open at 9am."))
+    result = await cascade.complete(MESSAGES, "What are your opening hours?")
+    assert result.escalated_by == "primary_error"
+    assert result.response.content == "We open at 9am."
+
+    cascade, _ = router(settings, RuntimeError("primary down"), RuntimeError("secondary down"))
+    with pytest.raises(RuntimeError, match="Both LLM tiers failed"):
+        await cascade.complete(MESSAGES, "Can you compare plan A versus plan B for me?")
+
+
+@pytest.mark.parametrize(
+    ("message", "complex_"),
+    [
+        ("What are your opening hours?", False),
+        ("Can you compare plan A versus plan B?", True),
+        ("What is the difference between the two plans?", True),
+        ("Price? Delivery? Warranty?", True),
+        ("word " * 60, True),
+    ],
+)
+async def test_complexity_heuristic(settings, message, complex_):
+    assert is_complex_query(message, settings.agent.complex_query_min_words) is complex_
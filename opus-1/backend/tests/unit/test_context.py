@@ -0,0 +1,84 @@
+"""
+Context packer tests: budget priorities and the per-request packing cost.
+
+Chunks and turns carry the token_count stored with them, so packing only
+tokenizes the new message.
+"""
+
+import time
+
+import pytest
+
+from app.agent import context
+from app.agent.context import count_tokens, pack_context, with_token_count
+from app.models.domain import Document
+
+SYSTEM_PROMPT = "You are the support assistant for a Singapore SMB. Answer from the knowledge below."
+
+
+def stored_chunks(count: int) -> list[Document]:
+    chunks = []
+    for i in range(count):
+        text = f"Policy {i}: refunds for order type {i} are processed within {i % 7 + 3} working days."
+        metadata = {"source": f"faq-{i}.md", "token_count": count_tokens(text)}
+        chunks.append(Document(id=str(i), content=text, metadata=metadata, score=1 - i / count))
+    return chunks
+
+
+def stored_history(turns: int) -> list[dict]:
+    return [
+        with_token_count({"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn {i} about my order status"})
+        for i in range(turns)
+    ]
+
+
+@pytest.fixture
+def tokenized(monkeypatch):
+    calls = []
+    original = context.count_tokens
+
+    def counting(text: str) -> int:
+        calls.append(text)
+        return original(text)
+
+    monkeypatch.setattr(context, "count_tokens", counting)
+    return calls
+
+
+def test_stored_counts_are_not_retokenized(tokenized):
+    chunks, history = stored_chunks(50), stored_history(20)
+    pack_context(SYSTEM_PROMPT, "Warm up", history=history, documents=chunks, summary="Asked about refunds")
+    tokenized.clear()
+
+    packed = pack_context(
+        SYSTEM_PROMPT, "How long do refunds take?", history=history, documents=chunks, summary="Asked about refunds"
+    )
+
+    assert tokenized == ["How long do refunds take?"]
+    assert packed.documents and packed.budget.used_tokens <= packed.budget.max_tokens
+
+
+def test_budget_keeps_best_chunks_and_newest_turns():
+    chunks, history = stored_chunks(50), stored_history(20)
+    packed = pack_context(SYSTEM_PROMPT, "Refund status?", history=history, documents=chunks, max_tokens=1000)
+
+    assert packed.dropped_documents > 0
+    assert [doc.id for doc in packed.documents] == [str(i) for i in range(len(packed.documents))]
+    assert packed.messages[-1] == {"role": "user", "content": "Refund status?"}
+    assert packed.messages[-2]["content"] == history[-1]["content"]
+
+
+def test_fifty_chunks_pack_in_under_a_millisecond():
+    chunks, history = stored_chunks(50), stored_history(20)
+    pack_context(SYSTEM_PROMPT, "Warm up", history=history, documents=chunks, summary="Asked about refunds")
+
+    durations = []
+    for i in range(200):
+        started = time.perf_counter()
+        pack_context(
+            SYSTEM_PROMPT, f"Where is order {i}?", history=history, documents=chunks, summary="Asked about refunds"
+        )
+        durations.append(time.perf_counter() - started)
+
+    durations.sort()
+    assert durations[len(durations) // 2] < 0.001
@@ -0,0 +1,42 @@
+"""
+Intent fast path tests: templates answer only messages they fully cover.
+"""
+
+import pytest
+
+from app.agent.intent import get_intent_classifier, template_answer
+from app.config import get_settings
+from app.models.domain import Intent
+
+
+def answer(message: str):
+    return template_answer(get_settings(), get_intent_classifier().classify(message))
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "hello, is anyone there? I need help urgently",
+        "are you open to partnerships?",
+        "can i call you about my refund",
+    ],
+)
+def test_requests_beyond_the_template_go_to_the_llm(message):
+    assert answer(message) is None
+
+
+@pytest.mark.parametrize(
+    ("message", "intent"),
+    [
+        ("hi", Intent.GREETING),
+        ("hello there!", Intent.GREETING),
+        ("thanks bye", Intent.FAREWELL),
+        ("what time do you open?", Intent.BUSINESS_HOURS),
+        ("are you open tomorrow?", Intent.BUSINESS_HOURS),
+        ("wat time u open ah", Intent.BUSINESS_HOURS),
+        ("what is your phone number?", Intent.CONTACT_INFO),
+    ],
+)
+def test_simple_deterministic_questions_are_templated(message, intent):
+    assert get_intent_classifier().classify(message).intent == intent
+    assert answer(message) is not None
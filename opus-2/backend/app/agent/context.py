@@ -0,0 +1,158 @@
+"""
+Context Packer
+
+Fills the prompt token budget (max_context_tokens) by priority: system
+prompt and current message, rolling summary, recent turns (newest first,
+up to a share of the budget), then reranked knowledge chunks.
+
+Token counts are computed once per text and stored with it under the
+``token_count`` key of the message or chunk dict, so packing a request
+is arithmetic over cached integers rather than re-tokenizing.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import tiktoken
+
+# Per-message framing tokens in the chat format
+MESSAGE_OVERHEAD = 4
+# "[n] (source) " prefix of a knowledge chunk
+CHUNK_OVERHEAD = 8
+# Share of the remaining budget recent turns may use before chunks
+HISTORY_SHARE = 0.4
+
+KNOWLEDGE_HEADER = "\n\nRelevant knowledge:\n"
+SUMMARY_HEADER = "\n\nConversation summary so far:\n"
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> tiktoken.Encoding:
+    # o200k_base is the gpt-4o family encoding
+    return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Tokenize text (uncached; prefer cached_token_count)."""
+    return len(_encoding().encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=256)
+def _count_static(text: str) -> int:
+    # System prompts, headers and the rolling summary repeat verbatim across requests
+    return count_tokens(text)
+
+
+def cached_token_count(item: dict[str, Any], text_key: str = "content") -> int:
+    """Token count stored on a message or chunk dict, computed on first use."""
+    count = item.get("token_count")
+    if count is None:
+        count = item["token_count"] = count_tokens(item[text_key])
+    return count
+
+
+def with_token_count(item: dict[str, Any]) -> dict[str, Any]:
+    """Annotate a message or chunk dict with its token count before storing it."""
+    cached_token_count(item)
+    return item
+
+
+@dataclass
+class PackedContext:
+    """Chat messages assembled within the token budget."""
+    messages: list[dict[str, str]]
+    max_tokens: int
+    system_tokens: int = 0
+    history_tokens: int = 0
+    knowledge_tokens: int = 0
+    chunks: list[dict[str, Any]] = field(default_factory=list)
+    summary_included: bool = False
+    dropped_messages: int = 0
+    dropped_chunks: int = 0
+
+    @property
+    def used_tokens(self) -> int:
+        return self.system_tokens + self.history_tokens + self.knowledge_tokens
+
+
+def pack_context(
+    system_prompt: str,
+    message: str,
+    history: list[dict[str, Any]] | None = None,
+    chunks: list[dict[str, Any]] | None = None,
+    summary: str | None = None,
+    max_tokens: int = 4000,
+    max_messages: int = 20,
+) -> PackedContext:
+    """
+    Assemble chat messages that fit max_tokens.
+
+    Args:
+        system_prompt: Formatted system prompt
+        message: Current customer message
+        history: Prior turns as role/content dicts, oldest first
+        chunks: Reranked chunks (content/source dicts), best first
+        summary: Rolling summary of older turns
+        max_tokens: Prompt token budget
+        max_messages: Most recent turns to consider
+
+    Returns:
+        PackedContext with the messages and token accounting
+    """
+    system_tokens = _count_static(system_prompt) + MESSAGE_OVERHEAD
+    history_tokens = count_tokens(message) + MESSAGE_OVERHEAD
+
+    summary_included = False
+    if summary:
+        summary_tokens = _count_static(SUMMARY_HEADER) + _count_static(summary)
+        if system_tokens + history_tokens + summary_tokens <= max_tokens:
+            system_tokens += summary_tokens
+            summary_included = True
+
+    turns = [t for t in (history or [])[-max_messages:] if t.get("role") in ("user", "assistant")]
+    history_limit = history_tokens + int((max_tokens - system_tokens - history_tokens) * HISTORY_SHARE)
+    kept_turns: list[dict[str, Any]] = []
+    for turn in reversed(turns):
+        tokens = cached_token_count(turn) + MESSAGE_OVERHEAD
+        if history_tokens + tokens > history_limit:
+            break
+        history_tokens += tokens
+        kept_turns.append(turn)
+    kept_turns.reverse()
+
+    kept_chunks: list[dict[str, Any]] = []
+    knowledge_tokens = 0
+    available = max_tokens - system_tokens - history_tokens
+    for chunk in chunks or []:
+        tokens = cached_token_count(chunk) + CHUNK_OVERHEAD
+        if not kept_chunks:
+            tokens += _count_static(KNOWLEDGE_HEADER)
+        if knowledge_tokens + tokens <= available:
+            knowledge_tokens += tokens
+            kept_chunks.append(chunk)
+
+    system = system_prompt
+    if summary_included:
+        system += SUMMARY_HEADER + summary
+    if kept_chunks:
+        system += KNOWLEDGE_HEADER + "\n\n".join(
+            f"[{i}] ({chunk.get('source', 'unknown')}) {chunk['content']}"
+            for i, chunk in enumerate(kept_chunks, 1)
+        )
+
+    messages = [{"role": "system", "content": system}]
+    messages.extend({"role": t["role"], "content": t["content"]} for t in kept_turns)
+    messages.append({"role": "user", "content": message})
+
+    return PackedContext(
+        messages=messages,
+        max_tokens=max_tokens,
+        system_tokens=system_tokens,
+        history_tokens=history_tokens,
+        knowledge_tokens=knowledge_tokens,
+        chunks=kept_chunks,
+        summary_included=summary_included,
+        dropped_messages=len(turns) - len(kept_turns),
+        dropped_chunks=len(chunks or []) - len(kept_chunks),
+    )
@@ -0,0 +1,238 @@
+"""
+Hedged LLM Requests
+
+Tail latency of the primary model hurts more than its errors. Each request
+starts on the primary provider; if no first token arrives within the
+rolling percentile (p95 by default) of the primary's own time-to-first-token,
+the same request is fired at the fallback provider and whichever streams
+first wins. The loser is cancelled. Outright primary errors, including a
+stream that ends without any text, fall back immediately.
+"""
+
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from collections import deque
+from collections.abc import AsyncIterator
+from functools import lru_cache
+
+from app.agent.providers import (
+    AnthropicProvider,
+    LLMProvider,
+    LLMUnavailableError,
+    OpenAIProvider,
+)
+from app.config import Settings, settings
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+BUCKET_BOUNDS_MS = (
+    25, 50, 75, 100, 150, 200, 300, 400, 500, 750, 1000,
+    1500, 2000, 3000, 4000, 5000, 7500, 10000, 15000, 30000, math.inf,
+)
+
+
+# =============================================================================
+# LATENCY HISTOGRAM
+# =============================================================================
+
+class LatencyHistogram:
+    """
+    Bucketed histogram over the most recent ``window_size`` samples.
+
+    Percentiles interpolate linearly inside a bucket, so they are cheap
+    (one pass over ~20 buckets) and stable for a hedging threshold.
+    """
+
+    def __init__(self, window_size: int = 500):
+        self.window_size = window_size
+        self.counts = [0] * len(BUCKET_BOUNDS_MS)
+        self.total = 0
+        self._window: deque[int] = deque()
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def record(self, latency_ms: float) -> None:
+        """Add one sample, evicting the oldest once the window is full."""
+        if len(self._window) >= self.window_size:
+            self.counts[self._window.popleft()] -= 1
+        bucket = bisect_left(BUCKET_BOUNDS_MS, latency_ms)
+        self._window.append(bucket)
+        self.counts[bucket] += 1
+        self.total += 1
+
+    def percentile(self, q: float) -> float | None:
+        """Estimated latency (ms) at quantile ``q``, or None without samples."""
+        if not self._window:
+            return None
+        rank = q * len(self._window)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKET_BOUNDS_MS[bucket - 1] if bucket else 0.0
+                upper = BUCKET_BOUNDS_MS[bucket]
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return BUCKET_BOUNDS_MS[-2]
+
+    def snapshot(self) -> dict:
+        """Bucket counts for metrics export."""
+        return {
+            "samples": len(self._window),
+            "total": self.total,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {
+                ("+Inf" if math.isinf(bound) else str(bound)): count
+                for bound, count in zip(BUCKET_BOUNDS_MS, self.counts)
+            },
+        }
+
+
+# =============================================================================
+# HEDGED CLIENT
+# =============================================================================
+
+class HedgedLLM:
+    """
+    Streams from the primary provider, hedging to the fallback when the
+    first token is late.
+
+    Example:
+        async for delta in get_llm().stream(messages):
+            ...
+    """
+
+    def __init__(
+        self,
+        primary: LLMProvider,
+        fallback: LLMProvider | None,
+        config: Settings,
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self.config = config
+        self.histograms = {
+            provider.name: LatencyHistogram(config.llm_hedge_window_size)
+            for provider in (primary, fallback)
+            if provider is not None
+        }
+        self.stats = {"requests": 0, "hedged": 0, "fallbacks": 0, "wins": {}}
+
+    def hedge_delay_ms(self) -> float | None:
+        """How long to wait for the primary's first token before hedging."""
+        config = self.config
+        if not config.llm_hedge_enabled or self.fallback is None:
+            return None
+        histogram = self.histograms[self.primary.name]
+        if len(histogram) < config.llm_hedge_min_samples:
+            return float(config.llm_hedge_default_delay_ms)
+        delay = histogram.percentile(config.llm_hedge_percentile)
+        return min(max(delay, config.llm_hedge_min_delay_ms), config.llm_hedge_max_delay_ms)
+
+    async def stream(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Stream response deltas from whichever provider answers first.
+
+        Args:
+            messages: Chat messages (OpenAI format)
+
+        Yields:
+            Content deltas
+
+        Raises:
+            LLMUnavailableError: Every provider failed before its first token
+        """
+        self.stats["requests"] += 1
+        racers: dict[asyncio.Task, tuple[LLMProvider, AsyncIterator[str], float]] = {}
+
+        def launch(provider: LLMProvider) -> asyncio.Task:
+            deltas = provider.stream(messages)
+            launched = time.monotonic()
+            task = asyncio.create_task(self._first_token(provider, deltas, launched))
+            racers[task] = (provider, deltas, launched)
+            return task
+
+        delay = self.hedge_delay_ms()
+        pending = {launch(self.primary)}
+        hedged = False
+        winner: asyncio.Task | None = None
+        errors: list[str] = []
+
+        try:
+            while winner is None:
+                timeout = None if hedged or delay is None else delay / 1000
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        winner = winner or task
+                    else:
+                        provider = racers[task][0]
+                        errors.append(f"{provider.name}: {task.exception()}")
+                        logger.warning("llm_provider_failed", provider=provider.name, error=str(task.exception()))
+                if winner is not None:
+                    break
+                if not hedged and self.fallback is not None:
+                    hedged = True
+                    reason = "error" if done else "slow_first_token"
+                    self.stats["hedged" if reason == "slow_first_token" else "fallbacks"] += 1
+                    logger.info("llm_hedge_fired", reason=reason, delay_ms=delay, fallback=self.fallback.name)
+                    pending.add(launch(self.fallback))
+                elif not pending:
+                    raise LLMUnavailableError("; ".join(errors) or "no provider available")
+
+            provider, deltas, _ = racers[winner]
+            wins = self.stats["wins"]
+            wins[provider.name] = wins.get(provider.name, 0) + 1
+            logger.info("llm_stream_started", provider=provider.name, hedged=hedged)
+
+            yield winner.result()
+            async for delta in deltas:
+                yield delta
+        finally:
+            await self._cancel_losers(racers, winner)
+
+    async def _first_token(self, provider: LLMProvider, deltas: AsyncIterator[str], launched: float) -> str:
+        """Wait for the first delta and record the provider's time-to-first-token."""
+        try:
+            first = await anext(deltas)
+        except StopAsyncIteration:
+            raise LLMUnavailableError("stream ended without any content") from None
+        self.histograms[provider.name].record((time.monotonic() - launched) * 1000)
+        return first
+
+    async def _cancel_losers(
+        self,
+        racers: dict[asyncio.Task, tuple[LLMProvider, AsyncIterator[str], float]],
+        winner: asyncio.Task | None,
+    ) -> None:
+        for task, (provider, deltas, launched) in racers.items():
+            if not task.done():
+                task.cancel()
+                # The loser took at least this long; keep the tail visible
+                self.histograms[provider.name].record((time.monotonic() - launched) * 1000)
+            await asyncio.gather(task, return_exceptions=True)
+            await deltas.aclose()
+
+    def snapshot(self) -> dict:
+        """Hedging counters and per-provider latency histograms."""
+        return {
+            **self.stats,
+            "hedge_delay_ms": self.hedge_delay_ms(),
+            "ttft_ms": {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+        }
+
+
+@lru_cache
+def get_llm() -> HedgedLLM:
+    """Process-wide hedged client (latency histograms persist across requests)."""
+    fallback = AnthropicProvider(settings) if settings.anthropic_api_key.get_secret_value() else None
+    return HedgedLLM(OpenAIProvider(settings), fallback, settings)
@@ -0,0 +1,57 @@
+"""
+Agent Prompts
+
+System prompt and token-budgeted chat message assembly for the support agent.
+"""
+
+from typing import Any
+
+from app.agent.context import pack_context
+from app.config import Settings
+from app.services.calendar import get_business_calendar
+
+SYSTEM_PROMPT = """You are the customer support assistant for {business_name}, a Singapore business.
+Business hours: {hours_start}-{hours_end} ({timezone}), {working_days}, except public holidays.
+Right now: {hours_status}
+
+Be concise and friendly and reply in the customer's language. If you are
+not sure of an answer, say so and offer to connect the customer with staff."""
+
+
+def build_messages(
+    settings: Settings,
+    message: str,
+    history: list[dict[str, Any]] | None = None,
+    chunks: list[dict[str, Any]] | None = None,
+    summary: str | None = None,
+) -> list[dict[str, str]]:
+    """
+    Build chat messages within the max_context_tokens budget.
+
+    Args:
+        settings: Application settings
+        message: Current customer message
+        history: Prior turns as role/content dicts, oldest first
+        chunks: Reranked knowledge chunks, best first
+        summary: Rolling summary of older turns
+
+    Returns:
+        Chat messages in OpenAI format
+    """
+    system_prompt = SYSTEM_PROMPT.format(
+        business_name=settings.business_name,
+        hours_start=settings.business_hours_start,
+        hours_end=settings.business_hours_end,
+        timezone=settings.business_timezone,
+        working_days=", ".join(settings.business_working_days),
+        hours_status=get_business_calendar().status().status_message,
+    )
+    return pack_context(
+        system_prompt,
+        message,
+        history=history,
+        chunks=chunks,
+        summary=summary,
+        max_tokens=settings.max_context_tokens,
+        max_messages=settings.max_messages_before_summary,
+    ).messages
@@ -0,0 +1,125 @@
+"""
+LLM Providers
+
+Streaming chat completion providers behind a common interface, so the
+primary (OpenAI) and fallback (Anthropic) models can be raced against each
+other. ScriptedProvider replays fixed latencies for local testing.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from typing import Protocol
+
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from app.config import Settings
+
+
+class LLMUnavailableError(Exception):
+    """No provider could produce a response."""
+
+
+class LLMProvider(Protocol):
+    """A chat model that streams text deltas."""
+
+    name: str
+
+    def stream(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        """Stream non-empty content deltas for the given chat messages."""
+        ...
+
+
+# =============================================================================
+# HOSTED PROVIDERS
+# =============================================================================
+
+class OpenAIProvider:
+    """OpenAI chat completions (primary model)."""
+
+    name = "openai"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.client = AsyncOpenAI(api_key=settings.openai_api_key.get_secret_value())
+
+    async def stream(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.settings.openai_model,
+            messages=messages,
+            temperature=self.settings.openai_temperature,
+            max_tokens=self.settings.openai_max_tokens,
+            stream=True,
+        )
+        async for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+
+class AnthropicProvider:
+    """Anthropic messages API (fallback model)."""
+
+    name = "anthropic"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.client = AsyncAnthropic(api_key=settings.anthropic_api_key.get_secret_value())
+
+    async def stream(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        # Anthropic takes the system prompt separately from the turns
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        turns = [m for m in messages if m["role"] != "system"]
+        async with self.client.messages.stream(
+            model=self.settings.anthropic_model,
+            system=system,
+            messages=turns,
+            temperature=self.settings.openai_temperature,
+            max_tokens=self.settings.openai_max_tokens,
+        ) as stream:
+            async for text in stream.text_stream:
+                if text:
+                    yield text
+
+
+# =============================================================================
+# LOCAL FAKE
+# =============================================================================
+
+class ScriptedProvider:
+    """
+    Fake provider with scripted latency, for tests and local load runs.
+
+    Each call takes the next first-token latency from ``first_token_ms``
+    (cycling), then emits ``chunks`` spaced ``inter_token_ms`` apart.
+    A latency of ``None`` makes that call fail instead. ``cancelled``
+    counts streams closed before they finished.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        first_token_ms: Sequence[float | None],
+        chunks: Sequence[str] = ("Hello", " from", " the", " fake", " model."),
+        inter_token_ms: float = 0.0,
+    ):
+        self.name = name
+        self.first_token_ms = list(first_token_ms)
+        self.chunks = list(chunks)
+        self.inter_token_ms = inter_token_ms
+        self.calls = 0
+        self.cancelled = 0
+
+    async def stream(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        latency = self.first_token_ms[self.calls % len(self.first_token_ms)]
+        self.calls += 1
+        if latency is None:
+            raise LLMUnavailableError("scripted failure")
+        try:
+            await asyncio.sleep(latency / 1000)
+            for i, chunk in enumerate(self.chunks):
+                if i and self.inter_token_ms:
+                    await asyncio.sleep(self.inter_token_ms / 1000)
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled += 1
+            raise
@@ -12,9 +12,14 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
 from pydantic import BaseModel, Field
 
+from app.agent.hedging import get_llm
+from app.agent.prompts import build_messages
+from app.agent.providers import LLMUnavailableError
 from app.config import settings
 from app.dependencies import SessionDep, RedisDep, ApiKeyDep
 from app.logging_config import get_logger
+from app.services.calendar import get_business_calendar
+from app.services.conversation_store import ConversationStore
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/chat")
@@ -135,7 +140,7 @@ async def send_message(
         message=f"Thank you for your message. Our AI agent is being set up and will be fully operational soon. You asked: '{request.message[:100]}...'",
         confidence=0.0,
         sources=[],
-        suggested_actions=["Contact support for immediate assistance"],
+        suggested_actions=[_handoff_action()],
         requires_escalation=True,
     )
     
@@ -149,6 +154,14 @@ async def send_message(
     return response
 
 
+def _handoff_action() -> str:
+    """Escalation route: live staff while open, otherwise leave a message."""
+    hours = get_business_calendar().status()
+    if hours.is_open:
+        return "Chat with our support staff"
+    return f"Leave a message. {hours.status_message}"
+
+
 @router.get(
     "/history/{session_id}",
     response_model=ConversationHistory,
@@ -204,15 +217,20 @@ async def delete_conversation_history(
 async def websocket_chat(
     websocket: WebSocket,
     session_id: str,
+    redis: RedisDep,
 ) -> None:
     """
     WebSocket endpoint for real-time chat.
     
-    Enables streaming responses for better UX.
+    Enables streaming responses for better UX. Replies are streamed as
+    "chunk" frames followed by a final "response" frame. The session's
+    recent turns come from short-term memory, so a reconnecting client
+    keeps its context.
     """
     await websocket.accept()
     
     logger.info("websocket_connected", session_id=session_id)
+    store = ConversationStore(redis)
     
     try:
         while True:
@@ -226,13 +244,41 @@ async def websocket_chat(
                 message_length=len(message),
             )
             
-            # TODO: Implement streaming response in Phase 6
-            # For now, send placeholder response
+            # Stream from the hedged LLM (fallback raced in on a late first token)
+            history = await store.recent(session_id)
+            parts: list[str] = []
+            try:
+                async for delta in get_llm().stream(
+                    build_messages(settings, message, history)
+                ):
+                    parts.append(delta)
+                    await websocket.send_json({
+                        "type": "chunk",
+                        "session_id": session_id,
+                        "content": delta,
+                        "done": False,
+                    })
+            except LLMUnavailableError as e:
+                logger.error("websocket_llm_unavailable", session_id=session_id, error=str(e))
+                await websocket.send_json({
+                    "type": "error",
+                    "session_id": session_id,
+                    "message": "The assistant is temporarily unavailable. Please try again.",
+                    "done": True,
+                })
+                continue
+            
+            reply = "".join(parts)
+            await store.append(
+                session_id,
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": reply},
+            )
             
             await websocket.send_json({
                 "type": "response",
                 "session_id": session_id,
-                "message": f"Received: {message}",
+                "message": reply,
                 "confidence": 0.0,
                 "done": True,
             })
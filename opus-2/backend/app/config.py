@@ -114,6 +114,16 @@ class Settings(BaseSettings):
     anthropic_api_key: SecretStr = Field(default=SecretStr(""))
     anthropic_model: str = Field(default="claude-3-haiku-20240307")
     
+    # Hedging: fire the fallback when the primary's first token is slower
+    # than the rolling percentile of its own time-to-first-token
+    llm_hedge_enabled: bool = Field(default=True)
+    llm_hedge_percentile: float = Field(default=0.95, gt=0.0, lt=1.0)
+    llm_hedge_window_size: int = Field(default=500)
+    llm_hedge_min_samples: int = Field(default=20)
+    llm_hedge_default_delay_ms: int = Field(default=2000)
+    llm_hedge_min_delay_ms: int = Field(default=250)
+    llm_hedge_max_delay_ms: int = Field(default=8000)
+    
     # =========================================================================
     # RAG SETTINGS
     # =========================================================================
@@ -151,6 +161,9 @@ class Settings(BaseSettings):
     business_working_days: list[str] = Field(
         default=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
     )
+    # Company closures on top of the bundled Singapore public holidays (YYYY-MM-DD)
+    business_extra_holidays: list[str] = Field(default=[])
+    business_calendar_horizon_months: int = Field(default=12)
     
     # =========================================================================
     # PDPA COMPLIANCE SETTINGS
@@ -181,16 +194,16 @@ class Settings(BaseSettings):
                 return [origin.strip() for origin in v.split(",")]
         return v
     
-    @field_validator("business_working_days", mode="before")
+    @field_validator("business_working_days", "business_extra_holidays", mode="before")
     @classmethod
     def parse_working_days(cls, v: str | list[str]) -> list[str]:
-        """Parse working days from string or list."""
+        """Parse working days or holiday dates from string or list."""
         if isinstance(v, str):
             import json
             try:
                 return json.loads(v)
             except json.JSONDecodeError:
-                return [day.strip() for day in v.split(",")]
+                return [day.strip() for day in v.split(",") if day.strip()]
         return v
     
     # =========================================================================
@@ -4,6 +4,8 @@ Domain Models and Enums
 Core domain types used throughout the application.
 """
 
+from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
 
 
@@ -54,3 +56,23 @@ class ConsentStatus(str, Enum):
     PENDING = "pending"
     GRANTED = "granted"
     REVOKED = "revoked"
+
+
+@dataclass
+class BusinessHoursStatus:
+    """Open/closed status at a point in time (is_open None when unknown)."""
+    is_open: bool | None
+    current_time: datetime
+    opens_at: datetime | None = None
+    closes_at: datetime | None = None
+    next_opening: datetime | None = None
+
+    @property
+    def status_message(self) -> str:
+        if self.is_open is None:
+            return "We can't confirm our opening hours for this date yet."
+        if self.is_open and self.closes_at:
+            return f"We're currently open until {self.closes_at.strftime('%I:%M %p')}."
+        if self.next_opening:
+            return f"We're currently closed. We'll be open again on {self.next_opening.strftime('%A at %I:%M %p')}."
+        return "We're currently closed."
@@ -0,0 +1,175 @@
+"""
+Business Calendar
+
+Precomputed opening intervals for the next N months, built once from the
+business hours settings and a bundled Singapore public-holiday table.
+Is-open, next-open and time-until-close are answered with a bisect over
+the interval start times instead of re-parsing settings strings. Dates
+the holiday table does not fully cover yet get an unknown (None) is_open.
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.config import Settings, settings
+from app.models.domain import BusinessHoursStatus
+
+# Singapore gazetted public holidays (Ministry of Manpower). A holiday that
+# falls on a Sunday is observed on the following Monday; those Mondays are
+# listed explicitly. business_extra_holidays covers company closures.
+SINGAPORE_PUBLIC_HOLIDAYS: dict[date, str] = {
+    # 2025
+    date(2025, 1, 1): "New Year's Day",
+    date(2025, 1, 29): "Chinese New Year",
+    date(2025, 1, 30): "Chinese New Year",
+    date(2025, 3, 31): "Hari Raya Puasa",
+    date(2025, 4, 18): "Good Friday",
+    date(2025, 5, 1): "Labour Day",
+    date(2025, 5, 3): "Polling Day",
+    date(2025, 5, 12): "Vesak Day",
+    date(2025, 6, 7): "Hari Raya Haji",
+    date(2025, 8, 9): "National Day",
+    date(2025, 10, 20): "Deepavali",
+    date(2025, 12, 25): "Christmas Day",
+    # 2026
+    date(2026, 1, 1): "New Year's Day",
+    date(2026, 2, 17): "Chinese New Year",
+    date(2026, 2, 18): "Chinese New Year",
+    date(2026, 3, 21): "Hari Raya Puasa",
+    date(2026, 4, 3): "Good Friday",
+    date(2026, 5, 1): "Labour Day",
+    date(2026, 5, 27): "Hari Raya Haji",
+    date(2026, 5, 31): "Vesak Day",
+    date(2026, 6, 1): "Vesak Day (observed)",
+    date(2026, 8, 9): "National Day",
+    date(2026, 8, 10): "National Day (observed)",
+    date(2026, 11, 8): "Deepavali",
+    date(2026, 11, 9): "Deepavali (observed)",
+    date(2026, 12, 25): "Christmas Day",
+    # 2027 (fixed-date holidays)
+    date(2027, 1, 1): "New Year's Day",
+    date(2027, 3, 26): "Good Friday",
+    date(2027, 5, 1): "Labour Day",
+    date(2027, 8, 9): "National Day",
+    date(2027, 12, 25): "Christmas Day",
+}
+
+# Last day for which every gazetted holiday is listed above. 2027 still lacks
+# its lunar, Islamic and Hindu dates, so hours after this day are reported as
+# unknown rather than open; move it forward when a year is completed.
+HOLIDAYS_LISTED_THROUGH = date(2026, 12, 31)
+
+
+def _parse_time(value: str) -> time:
+    hours, minutes = value.split(":")
+    return time(int(hours), int(minutes))
+
+
+class BusinessCalendar:
+    """
+    Opening intervals as parallel sorted lists of UTC timestamps.
+    
+    Example:
+        get_business_calendar().status().status_message
+    """
+
+    def __init__(
+        self,
+        config: Settings,
+        holidays: dict[date, str] | None = None,
+        start: date | None = None,
+        holidays_listed_through: date = HOLIDAYS_LISTED_THROUGH,
+    ):
+        self.tz = ZoneInfo(config.business_timezone)
+        self.months = config.business_calendar_horizon_months
+        self.holidays = dict(SINGAPORE_PUBLIC_HOLIDAYS if holidays is None else holidays)
+        self.holidays_listed_through = holidays_listed_through
+        for value in config.business_extra_holidays:
+            self.holidays.setdefault(date.fromisoformat(value), "Company holiday")
+        self._opens = _parse_time(config.business_hours_start)
+        self._closes = _parse_time(config.business_hours_end)
+        self._working_days = {day.lower() for day in config.business_working_days}
+        self._build(start or datetime.now(self.tz).date())
+
+    def _build(self, start: date) -> None:
+        self.first_day = start
+        self.last_day = start + timedelta(days=round(self.months * 30.44))
+        self._starts: list[float] = []
+        self._ends: list[float] = []
+        day = start
+        while day <= min(self.last_day, self.holidays_listed_through):
+            if day.strftime("%A").lower() in self._working_days and day not in self.holidays:
+                opens = datetime.combine(day, self._opens, self.tz)
+                closes = datetime.combine(day, self._closes, self.tz)
+                if closes <= opens:  # overnight hours close the next day
+                    closes += timedelta(days=1)
+                self._starts.append(opens.timestamp())
+                self._ends.append(closes.timestamp())
+            day += timedelta(days=1)
+
+    def _timestamp(self, at: datetime | None) -> float:
+        at = at or datetime.now(timezone.utc)
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=self.tz)
+        local_day = at.astimezone(self.tz).date()
+        if local_day < self.first_day or local_day > self.last_day - timedelta(days=7):
+            # Outside the precomputed window: roll it forward (or back)
+            self._build(local_day - timedelta(days=1))
+        return at.timestamp()
+
+    def status(self, at: datetime | None = None) -> BusinessHoursStatus:
+        """Open/closed status with the current interval or the next opening.
+
+        is_open is None past holidays_listed_through, where an unlisted
+        public holiday could make "open" wrong.
+        """
+        ts = self._timestamp(at)
+        i = bisect_right(self._starts, ts) - 1
+        now = datetime.fromtimestamp(ts, self.tz)
+        if now.date() > self.holidays_listed_through:
+            return BusinessHoursStatus(is_open=None, current_time=now)
+        if i >= 0 and ts < self._ends[i]:
+            return BusinessHoursStatus(
+                is_open=True,
+                current_time=now,
+                opens_at=datetime.fromtimestamp(self._starts[i], self.tz),
+                closes_at=datetime.fromtimestamp(self._ends[i], self.tz),
+            )
+        following = i + 1
+        return BusinessHoursStatus(
+            is_open=False,
+            current_time=now,
+            next_opening=(
+                datetime.fromtimestamp(self._starts[following], self.tz)
+                if following < len(self._starts) else None
+            ),
+        )
+
+    def is_open(self, at: datetime | None = None) -> bool | None:
+        """Whether the business is open (None when the holidays are not known)."""
+        return self.status(at).is_open
+
+    def next_open(self, at: datetime | None = None) -> datetime | None:
+        """Start of the next opening interval (None while open)."""
+        return self.status(at).next_opening
+
+    def time_until_close(self, at: datetime | None = None) -> timedelta | None:
+        """Time left in the current opening interval (None while closed)."""
+        status = self.status(at)
+        return status.closes_at - status.current_time if status.is_open else None
+
+    def holiday(self, day: date) -> str | None:
+        """Public or company holiday name for a date."""
+        return self.holidays.get(day)
+
+
+_calendar: BusinessCalendar | None = None
+
+
+def get_business_calendar() -> BusinessCalendar:
+    """Shared calendar for the configured business (built once per process)."""
+    global _calendar
+    if _calendar is None:
+        _calendar = BusinessCalendar(settings)
+    return _calendar
@@ -0,0 +1,99 @@
+"""
+Conversation Store
+
+Saves chat exchanges in both memory tiers:
+
+- Redis keeps each session's recent turns (short-term memory), trimmed to
+  max_messages_before_summary and expiring after session_ttl_seconds.
+- PostgreSQL keeps every message as a ConversationMessage row.
+
+Both copies carry the message's token count, computed once when it is
+saved, so prompts built from stored history never re-tokenize it. Storage
+failures are logged and never fail the chat reply.
+"""
+
+import json
+from typing import Any
+
+import redis.asyncio as redis
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.agent.context import with_token_count
+from app.config import settings
+from app.database import async_session_factory
+from app.logging_config import get_logger
+from app.models.database import Conversation, ConversationMessage
+from app.models.domain import MessageRole
+
+logger = get_logger(__name__)
+
+
+class ConversationStore:
+    """Recent turns in Redis plus the full transcript in PostgreSQL."""
+
+    KEY_PREFIX = "session:history:"
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        session_factory: async_sessionmaker[AsyncSession] | None = async_session_factory,
+    ):
+        self.redis = redis_client
+        self.session_factory = session_factory
+
+    async def recent(self, session_id: str) -> list[dict[str, Any]]:
+        """Recent role/content/token_count turns of a session, oldest first."""
+        try:
+            raw = await self.redis.lrange(f"{self.KEY_PREFIX}{session_id}", 0, -1)
+        except redis.RedisError as e:
+            logger.warning("session_history_read_failed", session_id=session_id, error=str(e))
+            return []
+        return [json.loads(entry) for entry in raw]
+
+    async def append(self, session_id: str, *messages: dict[str, Any]) -> None:
+        """Store turns, with their token counts, in Redis and PostgreSQL."""
+        turns = [with_token_count(dict(message)) for message in messages]
+        await self._append_recent(session_id, turns)
+        if self.session_factory is not None:
+            await self._persist(session_id, turns)
+
+    async def _append_recent(self, session_id: str, turns: list[dict[str, Any]]) -> None:
+        key = f"{self.KEY_PREFIX}{session_id}"
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(key, *(json.dumps(turn, ensure_ascii=False) for turn in turns))
+        pipe.ltrim(key, -settings.max_messages_before_summary, -1)
+        pipe.expire(key, settings.session_ttl_seconds)
+        try:
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("session_history_write_failed", session_id=session_id, error=str(e))
+
+    async def _persist(self, session_id: str, turns: list[dict[str, Any]]) -> None:
+        try:
+            async with self.session_factory() as session:
+                conversation_id = await session.scalar(
+                    select(Conversation.id).where(Conversation.session_id == session_id)
+                )
+                if conversation_id is None:
+                    conversation = Conversation(session_id=session_id)
+                    session.add(conversation)
+                    await session.flush()
+                    conversation_id = conversation.id
+                session.add_all(
+                    ConversationMessage(
+                        conversation_id=conversation_id,
+                        role=MessageRole(turn["role"]),
+                        content=turn["content"],
+                        token_count=turn["token_count"],
+                    )
+                    for turn in turns
+                )
+                await session.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .values(message_count=Conversation.message_count + len(turns))
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning("conversation_persist_failed", session_id=session_id, error=str(e))
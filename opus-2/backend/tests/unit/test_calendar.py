@@ -0,0 +1,43 @@
+"""
+Business calendar tests: open hours, public holidays, and dates past the
+holiday table.
+"""
+
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.services.calendar import HOLIDAYS_LISTED_THROUGH, BusinessCalendar
+
+SGT = ZoneInfo("Asia/Singapore")
+
+
+def make_calendar() -> BusinessCalendar:
+    return BusinessCalendar(settings, start=date(2026, 1, 1))
+
+
+def test_open_during_business_hours():
+    status = make_calendar().status(datetime(2026, 3, 3, 10, 0, tzinfo=SGT))
+
+    assert status.is_open is True
+    assert status.closes_at == datetime(2026, 3, 3, 18, 0, tzinfo=SGT)
+
+
+def test_closed_on_public_holiday_with_next_opening():
+    # Labour Day 2026 is a Friday; the next working day is Monday 4 May.
+    status = make_calendar().status(datetime(2026, 5, 1, 10, 0, tzinfo=SGT))
+
+    assert status.is_open is False
+    assert status.next_opening == datetime(2026, 5, 4, 9, 0, tzinfo=SGT)
+
+
+def test_unknown_past_last_fully_listed_year():
+    calendar = make_calendar()
+    # A weekday in February 2027, when Chinese New Year dates are not listed yet.
+    at = datetime(2027, 2, 8, 10, 0, tzinfo=SGT)
+    status = calendar.status(at)
+
+    assert HOLIDAYS_LISTED_THROUGH < at.date()
+    assert status.is_open is None
+    assert calendar.time_until_close(at) is None
+    assert "can't confirm" in status.status_message
@@ -0,0 +1,55 @@
+"""
+Context packer tests: chunks and turns carry their stored token_count, so
+packing tokenizes only the new message and stays sub-millisecond.
+"""
+
+import time
+
+from app.agent import context
+from app.agent.context import pack_context, with_token_count
+
+SYSTEM_PROMPT = "You are the support assistant for a Singapore SMB. Answer from the knowledge below."
+
+
+def stored_chunks(count: int) -> list[dict]:
+    return [
+        with_token_count({
+            "content": f"Policy {i}: refunds for order type {i} are processed within {i % 7 + 3} working days.",
+            "source": f"faq-{i}.md",
+        })
+        for i in range(count)
+    ]
+
+
+def stored_history(turns: int) -> list[dict]:
+    return [
+        with_token_count({"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn {i} about my order"})
+        for i in range(turns)
+    ]
+
+
+def test_stored_counts_are_not_retokenized(monkeypatch):
+    chunks, history = stored_chunks(50), stored_history(20)
+    pack_context(SYSTEM_PROMPT, "Warm up", history=history, chunks=chunks, summary="Asked about refunds")
+
+    calls = []
+    original = context.count_tokens
+    monkeypatch.setattr(context, "count_tokens", lambda text: calls.append(text) or original(text))
+    packed = pack_context(SYSTEM_PROMPT, "Refund time?", history=history, chunks=chunks, summary="Asked about refunds")
+
+    assert calls == ["Refund time?"]
+    assert packed.chunks and packed.used_tokens <= packed.max_tokens
+
+
+def test_fifty_chunks_pack_in_under_a_millisecond():
+    chunks, history = stored_chunks(50), stored_history(20)
+    pack_context(SYSTEM_PROMPT, "Warm up", history=history, chunks=chunks, summary="Asked about refunds")
+
+    durations = []
+    for i in range(200):
+        started = time.perf_counter()
+        pack_context(SYSTEM_PROMPT, f"Where is order {i}?", history=history, chunks=chunks, summary="Asked about refunds")
+        durations.append(time.perf_counter() - started)
+
+    durations.sort()
+    assert durations[len(durations) // 2] < 0.001
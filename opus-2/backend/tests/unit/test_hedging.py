@@ -0,0 +1,129 @@
+"""
+Hedging tests: scripted fake providers race under controlled latency.
+"""
+
+import time
+
+import pytest
+
+from app.agent.hedging import BUCKET_BOUNDS_MS, HedgedLLM, LatencyHistogram
+from app.agent.providers import LLMUnavailableError, ScriptedProvider
+from app.config import settings
+
+MESSAGES = [{"role": "user", "content": "What are your opening hours?"}]
+PRIMARY_TEXT = ("Primary", " answer.")
+FALLBACK_TEXT = ("Fallback", " answer.")
+
+
+def hedged(primary: ScriptedProvider, fallback: ScriptedProvider, **overrides) -> HedgedLLM:
+    config = settings.model_copy(update={"llm_hedge_enabled": True, **overrides})
+    return HedgedLLM(primary, fallback, config)
+
+
+async def collect(llm: HedgedLLM) -> str:
+    return "".join([delta async for delta in llm.stream(MESSAGES)])
+
+
+async def test_slow_primary_is_hedged_and_cancelled():
+    primary = ScriptedProvider("primary", [2000], PRIMARY_TEXT)
+    fallback = ScriptedProvider("fallback", [10], FALLBACK_TEXT)
+    llm = hedged(primary, fallback, llm_hedge_default_delay_ms=50)
+
+    started = time.monotonic()
+    assert await collect(llm) == "Fallback answer."
+    assert time.monotonic() - started < 1.0
+    assert primary.cancelled == 1
+    assert llm.stats["hedged"] == 1
+    assert llm.stats["wins"] == {"fallback": 1}
+
+
+async def test_fast_primary_is_not_hedged():
+    primary = ScriptedProvider("primary", [10], PRIMARY_TEXT)
+    fallback = ScriptedProvider("fallback", [10], FALLBACK_TEXT)
+    llm = hedged(primary, fallback, llm_hedge_default_delay_ms=500)
+
+    assert await collect(llm) == "Primary answer."
+    assert fallback.calls == 0
+
+
+async def test_primary_error_falls_back_without_waiting():
+    primary = ScriptedProvider("primary", [None], PRIMARY_TEXT)
+    fallback = ScriptedProvider("fallback", [10], FALLBACK_TEXT)
+    llm = hedged(primary, fallback, llm_hedge_default_delay_ms=5000)
+
+    started = time.monotonic()
+    assert await collect(llm) == "Fallback answer."
+    assert time.monotonic() - started < 1.0
+    assert llm.stats["fallbacks"] == 1
+    assert llm.stats["hedged"] == 0
+
+
+async def test_empty_primary_stream_lets_the_fallback_win():
+    primary = ScriptedProvider("primary", [10], ())
+    fallback = ScriptedProvider("fallback", [50], FALLBACK_TEXT)
+    llm = hedged(primary, fallback, llm_hedge_default_delay_ms=5000)
+
+    assert await collect(llm) == "Fallback answer."
+    assert llm.stats["wins"] == {"fallback": 1}
+
+
+async def test_both_providers_failing_raises():
+    primary = ScriptedProvider("primary", [None])
+    fallback = ScriptedProvider("fallback", [10], ())
+    llm = hedged(primary, fallback, llm_hedge_default_delay_ms=50)
+
+    with pytest.raises(LLMUnavailableError):
+        await collect(llm)
+
+
+def test_hedge_delay_uses_default_until_enough_samples():
+    llm = hedged(
+        ScriptedProvider("primary", [10]),
+        ScriptedProvider("fallback", [10]),
+        llm_hedge_min_samples=20,
+        llm_hedge_default_delay_ms=2000,
+        llm_hedge_min_delay_ms=250,
+        llm_hedge_max_delay_ms=8000,
+    )
+    histogram = llm.histograms["primary"]
+
+    for _ in range(19):
+        histogram.record(10)
+    assert llm.hedge_delay_ms() == 2000
+
+    histogram.record(10)
+    assert llm.hedge_delay_ms() == 250
+
+    for _ in range(500):
+        histogram.record(20000)
+    assert llm.hedge_delay_ms() == 8000
+
+    for _ in range(500):
+        histogram.record(900)
+    assert 750 <= llm.hedge_delay_ms() <= 1000
+
+
+def test_hedge_delay_is_none_without_a_fallback():
+    config = settings.model_copy(update={"llm_hedge_enabled": True})
+    assert HedgedLLM(ScriptedProvider("primary", [10]), None, config).hedge_delay_ms() is None
+
+
+def test_histogram_percentile_interpolates_within_a_bucket():
+    histogram = LatencyHistogram(window_size=100)
+    assert histogram.percentile(0.5) is None
+
+    for _ in range(100):
+        histogram.record(120)  # bucket (100, 150]
+    assert histogram.percentile(0.5) == pytest.approx(125.0)
+    assert histogram.percentile(1.0) == pytest.approx(150.0)
+
+
+def test_histogram_window_evicts_oldest_samples():
+    histogram = LatencyHistogram(window_size=4)
+    for latency in (10, 10, 10, 10, 5000, 5000, 5000, 5000):
+        histogram.record(latency)
+
+    assert len(histogram) == 4
+    assert histogram.total == 8
+    assert histogram.counts[BUCKET_BOUNDS_MS.index(25)] == 0
+    assert 4000 <= histogram.percentile(0.5) <= 5000
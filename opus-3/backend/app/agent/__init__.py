@@ -0,0 +1,5 @@
+"""
+Agent Package
+
+Response generation for the customer support agent.
+"""
@@ -0,0 +1,103 @@
+"""
+Response Generator
+
+Streams grounded answers from the configured OpenAI chat model. The prompt
+combines the business persona, retrieved knowledge and recent history.
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.config import Settings
+from app.rag.retriever import RetrievedChunk, get_openai_client
+
+SYSTEM_PROMPT = """You are the customer support assistant for {business_name}, a Singapore business.
+Business hours: {hours_start}-{hours_end} ({timezone}), {working_days}.
+
+Answer using only the knowledge below. If the answer is not there, say so
+and offer to connect the customer with a staff member. Be concise and
+friendly, and reply in the customer's language ({language}).
+
+Knowledge:
+{knowledge}"""
+
+
+class ResponseGenerator:
+    """Builds the prompt and streams completion deltas."""
+
+    MAX_HISTORY_MESSAGES = 10
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def build_messages(
+        self,
+        message: str,
+        chunks: list[RetrievedChunk],
+        history: list[dict[str, Any]],
+        language: str,
+    ) -> list[dict[str, str]]:
+        """
+        Assemble chat messages for the model.
+
+        Args:
+            message: Current user message.
+            chunks: Retrieved knowledge, best first.
+            history: Recent conversation turns, oldest first.
+            language: Detected language code.
+
+        Returns:
+            list: OpenAI chat messages.
+        """
+        settings = self.settings
+        knowledge = "\n\n".join(
+            f"[{i}] ({chunk.source}) {chunk.text}" for i, chunk in enumerate(chunks, 1)
+        ) or "(no relevant knowledge found)"
+        messages = [{
+            "role": "system",
+            "content": SYSTEM_PROMPT.format(
+                business_name=settings.business_name,
+                hours_start=settings.business_hours_start,
+                hours_end=settings.business_hours_end,
+                timezone=settings.business_timezone,
+                working_days=", ".join(settings.working_days_list),
+                language=language,
+                knowledge=knowledge,
+            ),
+        }]
+        messages.extend(
+            {"role": turn["role"], "content": turn["content"]}
+            for turn in history[-self.MAX_HISTORY_MESSAGES:]
+            if turn.get("role") in ("user", "assistant")
+        )
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    async def stream(
+        self,
+        message: str,
+        chunks: list[RetrievedChunk],
+        history: list[dict[str, Any]],
+        language: str,
+    ) -> AsyncIterator[str]:
+        """
+        Stream answer text deltas as the model produces them.
+
+        Args:
+            message: Current user message.
+            chunks: Retrieved knowledge, best first.
+            history: Recent conversation turns, oldest first.
+            language: Detected language code.
+
+        Yields:
+            str: Non-empty content deltas.
+        """
+        stream = await get_openai_client(self.settings).chat.completions.create(
+            model=self.settings.openai_model,
+            messages=self.build_messages(message, chunks, history, language),
+            temperature=0.2,
+            stream=True,
+        )
+        async for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
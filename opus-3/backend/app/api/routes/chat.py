@@ -4,15 +4,21 @@ Chat Routes
 Handles customer chat interactions with the AI agent.
 """
 
+import json
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID, uuid4
 
 import structlog
-from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.dependencies import DbSessionDep, QdrantDep, RedisDep, SettingsDep
+from app.services.chat_pipeline import ChatAnswer, ChatPipeline, GenerationTimeout
+from app.services.streaming import SlowConsumerError, stream_coalesced
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -99,6 +105,7 @@ class ConversationHistory(BaseModel):
 )
 async def send_message(
     request: ChatRequest,
+    response: Response,
     settings: SettingsDep,
     db: DbSessionDep,
     redis: RedisDep,
@@ -114,8 +121,17 @@ async def send_message(
     4. Generates a response using the AI agent
     5. Stores the conversation in memory
     
+    Steps 1-3 run concurrently under ``chat_latency_budget_ms``; slow stages
+    degrade (cached history, no rerank) instead of failing the request.
+    Repeated questions are served from the semantic response cache, scoped
+    by language and ``metadata["category"]``, and identical questions in
+    flight at the same time share one computation when their sessions have
+    no history yet. Stage timings are
+    returned in the ``Server-Timing`` header.
+    
     Args:
         request: Chat request containing the user message.
+        response: Outgoing response (for timing headers).
         settings: Application settings.
         db: Database session.
         redis: Redis client for short-term memory.
@@ -124,10 +140,6 @@ async def send_message(
     Returns:
         ChatResponse: AI agent response with sources and metadata.
     """
-    import time
-    
-    start_time = time.perf_counter()
-    
     # Generate or use provided session ID
     session_id = request.session_id or uuid4()
     
@@ -138,22 +150,123 @@ async def send_message(
         has_customer_id=request.customer_id is not None,
     )
     
-    # TODO: Implement full agent processing in Phase 5
-    # For now, return a placeholder response
+    pipeline = ChatPipeline(settings, redis, qdrant)
+    category = str(request.metadata.get("category", "general"))
+    answer, shared = await pipeline.answer(session_id, request.message, category)
+    
+    session_fields = {"customer_id": request.customer_id} if request.customer_id else {}
+    await pipeline.remember(session_id, answer.language, request.message, answer.content, **session_fields)
+    
+    executor = pipeline.executor
+    response.headers["Server-Timing"] = executor.server_timing()
+    logger.info(
+        "Chat message processed",
+        session_id=str(session_id),
+        stage_timings_ms=executor.timings_ms(),
+        degraded_stages=executor.degraded,
+        cache_hit=answer.cache_hit,
+        coalesced=shared,
+    )
+    
+    return _to_chat_response(session_id, answer, pipeline.deadline.elapsed_ms)
+
+
+@router.post(
+    "/chat/stream",
+    summary="Stream Chat Message",
+    description="Send a message to the AI support agent and stream the response as Server-Sent Events.",
+    responses={
+        200: {"description": "Event stream of answer deltas, sources and metadata"},
+        429: {"description": "Rate limit exceeded"},
+    },
+)
+async def stream_message(
+    request: ChatRequest,
+    settings: SettingsDep,
+    redis: RedisDep,
+    qdrant: QdrantDep,
+) -> StreamingResponse:
+    """
+    Process a chat message and stream the answer as it is generated.
+    
+    Uses the same pipeline as ``send_message`` (budgeted retrieval, response
+    cache, memory). Events, in order:
+    - ``delta``: ``{"content": "..."}`` for each piece of answer text
+    - ``sources``: ``{"sources": [...]}`` citations for the answer
+    - ``done``: session/message ids, confidence, suggested_actions,
+      requires_followup, processing_time_ms and stage timings
+    - ``error``: ``{"error": "..."}`` if any step fails after the response
+      has started, including generation running past
+      ``response_timeout_seconds`` (always the last event)
+    
+    Streams are not coalesced with identical requests; each one generates.
+    
+    Args:
+        request: Chat request containing the user message.
+        settings: Application settings.
+        redis: Redis client for short-term memory.
+        qdrant: Qdrant client for vector search.
+    
+    Returns:
+        StreamingResponse: ``text/event-stream`` response.
+    """
+    session_id = request.session_id or uuid4()
+    category = str(request.metadata.get("category", "general"))
+    pipeline = ChatPipeline(settings, redis, qdrant)
     
-    processing_time = (time.perf_counter() - start_time) * 1000
+    logger.info(
+        "Streaming chat message",
+        session_id=str(session_id),
+        message_length=len(request.message),
+    )
     
-    # Placeholder response (will be replaced with actual agent logic)
+    async def events() -> AsyncIterator[str]:
+        # Headers are already sent once the first event is yielded, so every
+        # failure has to reach the client as an ``error`` event
+        try:
+            context = await pipeline.prepare(session_id, request.message, category)
+            parts: list[str] = []
+            async for delta in pipeline.stream(context, request.message):
+                parts.append(delta)
+                yield _sse("delta", {"content": delta})
+            
+            answer = await pipeline.finish(context, request.message, "".join(parts))
+            yield _sse("sources", {"sources": answer.sources})
+            
+            session_fields = {"customer_id": request.customer_id} if request.customer_id else {}
+            await pipeline.remember(session_id, answer.language, request.message, answer.content, **session_fields)
+            
+            response = _to_chat_response(session_id, answer, pipeline.deadline.elapsed_ms)
+            yield _sse("done", {
+                **response.model_dump(mode="json", exclude={"content", "sources"}),
+                "stage_timings_ms": pipeline.executor.timings_ms(),
+            })
+        except GenerationTimeout as e:
+            logger.warning("Chat stream timed out", session_id=str(session_id), error=str(e))
+            yield _sse("error", {"error": "The response took too long to generate."})
+        except Exception as e:
+            logger.error("Chat stream failed", session_id=str(session_id), error=str(e))
+            yield _sse("error", {"error": "An error occurred generating the response."})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _to_chat_response(session_id: UUID, answer: ChatAnswer, processing_time_ms: float) -> ChatResponse:
+    """Personalize a (possibly shared) answer into this request's response."""
     return ChatResponse(
         session_id=session_id,
-        content=(
-            f"Thank you for your message. I'm {settings.business_name}'s AI assistant. "
-            "This is a placeholder response - the full agent implementation is coming in Phase 5. "
-            f"You said: '{request.message[:100]}...'" if len(request.message) > 100 
-            else f"You said: '{request.message}'"
-        ),
-        confidence=0.95,
-        sources=[],
+        content=answer.content,
+        confidence=answer.confidence,
+        sources=[SourceCitation(**source) for source in answer.sources],
         suggested_actions=[
             SuggestedAction(
                 type="quick_reply",
@@ -166,8 +279,8 @@ async def send_message(
                 payload={"message": "What are your business hours?"},
             ),
         ],
-        requires_followup=False,
-        processing_time_ms=round(processing_time, 2),
+        requires_followup=answer.requires_followup,
+        processing_time_ms=round(processing_time_ms, 2),
     )
 
 
@@ -246,6 +359,9 @@ manager = ConnectionManager()
 async def websocket_chat(
     websocket: WebSocket,
     session_id: str,
+    settings: SettingsDep,
+    redis: RedisDep,
+    qdrant: QdrantDep,
 ) -> None:
     """
     WebSocket endpoint for real-time chat.
@@ -255,9 +371,21 @@ async def websocket_chat(
     Protocol:
     - Client sends: {"type": "message", "content": "..."}
     - Server sends: {"type": "chunk", "content": "..."} for streaming
+      (model tokens coalesced into frames by size or time window;
+      identical in-flight questions share one generation and its tokens)
     - Server sends: {"type": "complete", "response": {...}} when done
     - Server sends: {"type": "error", "error": "..."} on error
+    
+    ``session_id`` must be a UUID; otherwise the connection is closed with
+    code 1008 (policy violation) right after it is accepted.
     """
+    try:
+        session_uuid = UUID(session_id)
+    except ValueError:
+        await websocket.accept()
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="session_id must be a UUID")
+        return
+    
     await manager.connect(websocket, session_id)
     
     try:
@@ -273,34 +401,49 @@ async def websocket_chat(
             
             if data.get("type") == "message":
                 content = data.get("content", "")
+                category = str(data.get("category", "general"))
                 
-                # TODO: Implement streaming response in Phase 5
-                # For now, send a simple response
+                pipeline = ChatPipeline(settings, redis, qdrant)
+                flight = await pipeline.answer_stream(session_uuid, content, category)
                 
-                await manager.send_message(session_id, {
-                    "type": "chunk",
-                    "content": "Thank you for your message. ",
-                })
+                async def send_chunk(text: str) -> None:
+                    await websocket.send_json({"type": "chunk", "content": text})
                 
-                await manager.send_message(session_id, {
-                    "type": "chunk",
-                    "content": "I'm processing your request...",
-                })
+                # Model deltas (possibly another request's) are batched into frames
+                async with aclosing(flight):
+                    result = await stream_coalesced(
+                        flight,
+                        send_chunk,
+                        max_chars=settings.ws_coalesce_max_chars,
+                        window_ms=settings.ws_coalesce_window_ms,
+                        max_pending=settings.ws_max_pending_deltas,
+                        send_timeout=settings.ws_send_timeout_seconds,
+                    )
+                answer = ChatAnswer.from_dict(flight.result)
+                await pipeline.remember(session_uuid, answer.language, content, answer.content)
+                response = _to_chat_response(session_uuid, answer, pipeline.deadline.elapsed_ms)
                 
                 await manager.send_message(session_id, {
                     "type": "complete",
-                    "response": {
-                        "content": f"This is a placeholder response to: {content}",
-                        "confidence": 0.95,
-                        "sources": [],
-                    },
+                    "response": response.model_dump(mode="json"),
                 })
+                logger.info(
+                    "WebSocket reply streamed",
+                    session_id=session_id,
+                    deltas=result.deltas,
+                    frames=result.frames,
+                    coalesced=flight.shared,
+                )
             
             elif data.get("type") == "ping":
                 await manager.send_message(session_id, {"type": "pong"})
     
     except WebSocketDisconnect:
         manager.disconnect(session_id)
+    except SlowConsumerError:
+        logger.warning("Closing slow WebSocket client", session_id=session_id)
+        manager.disconnect(session_id)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Client too slow")
     except Exception as e:
         logger.error("WebSocket error", session_id=session_id, error=str(e))
         await manager.send_message(session_id, {
@@ -13,7 +13,8 @@ import structlog
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile, status
 from pydantic import BaseModel, Field
 
-from app.dependencies import QdrantDep, SettingsDep
+from app.dependencies import QdrantDep, RedisDep, SettingsDep
+from app.rag.semantic_cache import SemanticCache
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -107,6 +108,7 @@ async def upload_document(
     category: str = Query(..., description="Document category"),
     settings: SettingsDep = None,
     qdrant: QdrantDep = None,
+    redis: RedisDep = None,
 ) -> DocumentUploadResponse:
     """
     Upload a document to the knowledge base.
@@ -123,6 +125,8 @@ async def upload_document(
     3. Embedded using the configured model
     4. Stored in the vector database
     
+    Cached chat answers are invalidated, since they may now be outdated.
+    
     Args:
         file: Document file to upload.
         source: Source type (faq, product, policy, website).
@@ -158,6 +162,7 @@ async def upload_document(
     # For now, return a placeholder response
     
     document_id = uuid4()
+    await SemanticCache(qdrant, redis, settings).invalidate()
     
     return DocumentUploadResponse(
         document_id=document_id,
@@ -260,14 +265,18 @@ async def get_collection_stats(
 async def delete_document(
     document_id: UUID,
     qdrant: QdrantDep = None,
+    redis: RedisDep = None,
+    settings: SettingsDep = None,
 ) -> None:
     """
     Delete a document and all its chunks from the knowledge base.
     
+    Cached chat answers are invalidated, since they may cite the document.
+    
     Args:
         document_id: Document UUID to delete.
     """
     logger.info("Document deletion requested", document_id=str(document_id))
     
     # TODO: Implement deletion in Phase 2
-    pass
+    await SemanticCache(qdrant, redis, settings).invalidate()
@@ -210,6 +210,91 @@ class Settings(BaseSettings):
         description="Response timeout in seconds"
     )
     
+    # ─────────────────────────────────────────────────────────────────────────
+    # Latency Budget
+    # ─────────────────────────────────────────────────────────────────────────
+    chat_latency_budget_ms: int = Field(
+        default=10000,
+        ge=500,
+        description="Latency budget for the pre-generation chat stages (ms); generation is bounded by response_timeout_seconds"
+    )
+    generation_reserve_ms: int = Field(
+        default=6000,
+        ge=0,
+        description="Share of the latency budget pre-generation stages leave unused, e.g. by skipping reranking (ms)"
+    )
+    memory_timeout_ms: int = Field(
+        default=150,
+        ge=10,
+        description="Timeout for session and history reads before using cached history (ms)"
+    )
+    retrieval_timeout_ms: int = Field(
+        default=1500,
+        ge=50,
+        description="Timeout for query embedding plus vector search (ms)"
+    )
+    rerank_timeout_ms: int = Field(
+        default=800,
+        ge=50,
+        description="Timeout for reranking; skipped when the budget cannot cover it (ms)"
+    )
+    
+    # ─────────────────────────────────────────────────────────────────────────
+    # Semantic Response Cache
+    # ─────────────────────────────────────────────────────────────────────────
+    semantic_cache_enabled: bool = Field(
+        default=True,
+        description="Serve repeated questions from the semantic response cache"
+    )
+    semantic_cache_collection: str = Field(
+        default="response_cache",
+        description="Qdrant collection holding cached answers"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.92,
+        ge=0.0,
+        le=1.0,
+        description="Minimum cosine similarity to serve a cached answer (semantic tier; needs a query embedding call)"
+    )
+    semantic_cache_ttl_seconds: int = Field(
+        default=86400,
+        ge=60,
+        description="Lifetime of cached answers in seconds"
+    )
+    semantic_cache_version_refresh_seconds: float = Field(
+        default=2.0,
+        ge=0.0,
+        description="How long a worker trusts its copy of the KB version"
+    )
+    single_flight_enabled: bool = Field(
+        default=True,
+        description="Share one computation between identical concurrent chat requests"
+    )
+    
+    # ─────────────────────────────────────────────────────────────────────────
+    # Streaming
+    # ─────────────────────────────────────────────────────────────────────────
+    ws_coalesce_max_chars: int = Field(
+        default=64,
+        ge=1,
+        description="Characters that trigger sending a streamed frame"
+    )
+    ws_coalesce_window_ms: float = Field(
+        default=50.0,
+        ge=0.0,
+        description="Longest time a token waits before its frame is sent (ms)"
+    )
+    ws_max_pending_deltas: int = Field(
+        default=256,
+        ge=1,
+        description="Tokens buffered per connection while the client is slow"
+    )
+    ws_send_timeout_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        description="Close a WebSocket whose client does not accept a frame in time"
+    )
+    
     # ─────────────────────────────────────────────────────────────────────────
     # Business Configuration (Singapore SMB)
     # ─────────────────────────────────────────────────────────────────────────
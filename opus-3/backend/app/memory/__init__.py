@@ -0,0 +1,5 @@
+"""
+Memory Package
+
+Hierarchical conversation memory (short-term session state in Redis).
+"""
@@ -0,0 +1,98 @@
+"""
+Short-Term Memory
+
+Session state and recent conversation turns kept in Redis with a sliding
+TTL. The last history read per session is also kept in-process so a slow
+Redis can be answered from the cached copy instead of blocking a request.
+"""
+
+import json
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any
+
+import redis.asyncio as redis
+
+# Last successfully loaded history per session (process-local, bounded)
+_RECENT_HISTORY: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+_RECENT_HISTORY_MAX_SESSIONS = 10_000
+
+
+class ShortTermMemory:
+    """Redis-backed session state and conversation history."""
+
+    SESSION_PREFIX = "session:"
+    HISTORY_PREFIX = "chat:history:"
+
+    def __init__(self, client: redis.Redis, ttl_seconds: int, max_messages: int = 20):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+
+    async def load_session(self, session_id: str) -> dict[str, str]:
+        """
+        Load session metadata, or an empty dict for a new session.
+
+        Args:
+            session_id: Session identifier.
+
+        Returns:
+            dict: Stored session fields.
+        """
+        return await self.client.hgetall(f"{self.SESSION_PREFIX}{session_id}")
+
+    async def load_history(self, session_id: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """
+        Load the most recent conversation turns, oldest first.
+
+        Args:
+            session_id: Session identifier.
+            limit: Maximum number of messages (defaults to ``max_messages``).
+
+        Returns:
+            list: Messages as dicts with ``role``, ``content`` and ``timestamp``.
+        """
+        limit = limit or self.max_messages
+        raw = await self.client.lrange(f"{self.HISTORY_PREFIX}{session_id}", -limit, -1)
+        history = [json.loads(item) for item in raw]
+        _remember_history(session_id, history)
+        return history
+
+    @staticmethod
+    def cached_history(session_id: str) -> list[dict[str, Any]]:
+        """Last history this process loaded for the session (may be stale)."""
+        return list(_RECENT_HISTORY.get(session_id, ()))
+
+    async def append(self, session_id: str, *messages: dict[str, Any], **session_fields: str) -> None:
+        """
+        Append messages to the history and refresh the session TTL.
+
+        Args:
+            session_id: Session identifier.
+            *messages: Messages with ``role`` and ``content``.
+            **session_fields: Extra fields to store on the session hash.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        history_key = f"{self.HISTORY_PREFIX}{session_id}"
+        session_key = f"{self.SESSION_PREFIX}{session_id}"
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(history_key, *(json.dumps({"timestamp": now, **message}) for message in messages))
+        pipe.ltrim(history_key, -self.max_messages, -1)
+        pipe.expire(history_key, self.ttl_seconds)
+        pipe.hsetnx(session_key, "created_at", now)
+        pipe.hset(session_key, mapping={"last_activity": now, **session_fields})
+        pipe.expire(session_key, self.ttl_seconds)
+        await pipe.execute()
+
+        cached = _RECENT_HISTORY.get(session_id)
+        if cached is not None:
+            cached.extend({"timestamp": now, **message} for message in messages)
+            del cached[:-self.max_messages]
+
+
+def _remember_history(session_id: str, history: list[dict[str, Any]]) -> None:
+    _RECENT_HISTORY[session_id] = history
+    _RECENT_HISTORY.move_to_end(session_id)
+    while len(_RECENT_HISTORY) > _RECENT_HISTORY_MAX_SESSIONS:
+        _RECENT_HISTORY.popitem(last=False)
@@ -0,0 +1,6 @@
+"""
+RAG Package
+
+Retrieval-augmented generation components: embedding, vector search
+and reranking.
+"""
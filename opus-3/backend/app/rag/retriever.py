@@ -0,0 +1,136 @@
+"""
+Knowledge Retriever
+
+Dense retrieval from the Qdrant knowledge base with optional Cohere
+reranking. Embedding and search are separate steps so callers can budget
+them independently.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from openai import AsyncOpenAI
+from qdrant_client import AsyncQdrantClient, models
+
+from app.config import Settings
+
+_openai_client: AsyncOpenAI | None = None
+_cohere_client = None
+
+
+@dataclass(frozen=True, slots=True)
+class RetrievedChunk:
+    """A knowledge base chunk returned by retrieval."""
+
+    chunk_id: str
+    source: str
+    text: str
+    score: float
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+def get_openai_client(settings: Settings) -> AsyncOpenAI:
+    """Shared OpenAI client (one connection pool per process)."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=settings.openai_api_key.get_secret_value())
+    return _openai_client
+
+
+def _get_cohere_client(settings: Settings):
+    global _cohere_client
+    if _cohere_client is None and settings.cohere_api_key:
+        import cohere
+
+        _cohere_client = cohere.AsyncClient(api_key=settings.cohere_api_key.get_secret_value())
+    return _cohere_client
+
+
+class Retriever:
+    """Embeds queries, searches the knowledge base and reranks hits."""
+
+    RERANK_MODEL = "rerank-multilingual-v3.0"
+
+    def __init__(self, qdrant: AsyncQdrantClient, settings: Settings):
+        self.qdrant = qdrant
+        self.settings = settings
+
+    async def embed(self, text: str) -> list[float]:
+        """Embed a query with the configured embedding model."""
+        response = await get_openai_client(self.settings).embeddings.create(
+            model=self.settings.openai_embedding_model,
+            input=text,
+        )
+        return response.data[0].embedding
+
+    async def search(
+        self,
+        vector: list[float],
+        top_k: int | None = None,
+        query_filter: models.Filter | None = None,
+    ) -> list[RetrievedChunk]:
+        """
+        Nearest-neighbour search in the knowledge base collection.
+
+        Args:
+            vector: Query embedding.
+            top_k: Number of candidates (defaults to ``rag_top_k_retrieval``).
+            query_filter: Optional Qdrant payload filter.
+
+        Returns:
+            list[RetrievedChunk]: Hits above the similarity threshold, best first.
+        """
+        response = await self.qdrant.query_points(
+            collection_name=self.settings.qdrant_collection_name,
+            query=vector,
+            limit=top_k or self.settings.rag_top_k_retrieval,
+            query_filter=query_filter,
+            score_threshold=self.settings.rag_similarity_threshold,
+            with_payload=True,
+        )
+        return [_to_chunk(point) for point in response.points]
+
+    async def rerank(self, query: str, chunks: list[RetrievedChunk], top_n: int | None = None) -> list[RetrievedChunk]:
+        """
+        Rerank candidates with Cohere, or keep vector order when not configured.
+
+        Args:
+            query: Original user query.
+            chunks: Candidates from ``search``.
+            top_n: Number of chunks to keep (defaults to ``rag_top_k_rerank``).
+
+        Returns:
+            list[RetrievedChunk]: The best ``top_n`` chunks.
+        """
+        top_n = top_n or self.settings.rag_top_k_rerank
+        client = _get_cohere_client(self.settings)
+        if client is None or len(chunks) <= 1:
+            return chunks[:top_n]
+
+        response = await client.rerank(
+            model=self.RERANK_MODEL,
+            query=query,
+            documents=[chunk.text for chunk in chunks],
+            top_n=top_n,
+        )
+        return [
+            RetrievedChunk(
+                chunk_id=chunks[result.index].chunk_id,
+                source=chunks[result.index].source,
+                text=chunks[result.index].text,
+                score=result.relevance_score,
+                metadata=chunks[result.index].metadata,
+            )
+            for result in response.results
+        ]
+
+
+def _to_chunk(point: Any) -> RetrievedChunk:
+    payload = dict(point.payload or {})
+    return RetrievedChunk(
+        chunk_id=str(point.id),
+        source=payload.pop("source", "unknown"),
+        text=payload.pop("text", None) or payload.pop("content", ""),
+        score=float(point.score),
+        metadata=payload,
+    )
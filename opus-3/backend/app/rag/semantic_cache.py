@@ -0,0 +1,271 @@
+"""
+Semantic Response Cache
+
+Caches grounded answers to repeated customer questions. Lookups are scoped
+by language, category and knowledge base version:
+
+1. Exact match on the normalized question (a single Redis GET, no
+   embedding) for the common verbatim repeats.
+2. Nearest-neighbour match on the query embedding in a dedicated Qdrant
+   collection, above a configurable similarity threshold.
+
+Only the exact tier is fast enough for single-digit-millisecond answers.
+The semantic tier needs the query embedding, which is a remote OpenAI call.
+The chat pipeline computes that embedding once and reuses it for retrieval,
+so on a miss the semantic tier adds only one Qdrant query. A semantic hit
+still pays for the embedding round trip.
+
+Changing the knowledge base bumps the KB version, which makes every
+existing entry unreachable; stale points are then deleted in the background.
+"""
+
+import hashlib
+import json
+import re
+import time
+import unicodedata
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+import redis.asyncio as redis
+import structlog
+from qdrant_client import AsyncQdrantClient, models
+
+from app.config import Settings
+
+logger = structlog.get_logger()
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.。？！]+$")
+
+# Process-local copy of the KB version, refreshed at most every few seconds
+_kb_version: tuple[int, float] | None = None
+_collections_ready: set[str] = set()
+
+
+def normalize_question(text: str) -> str:
+    """Collapse differences that never change the answer."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _TRAILING_PUNCTUATION.sub("", _WHITESPACE.sub(" ", text).strip())
+
+
+async def current_kb_version(client: redis.Redis, settings: Settings) -> int:
+    """
+    Current knowledge base version, bumped on every document change.
+
+    Cached in-process for ``semantic_cache_version_refresh_seconds``.
+    """
+    global _kb_version
+    now = time.monotonic()
+    if _kb_version is not None and _kb_version[1] > now:
+        return _kb_version[0]
+    version = int(await client.get(SemanticCache.VERSION_KEY) or 0)
+    _kb_version = (version, now + settings.semantic_cache_version_refresh_seconds)
+    return version
+
+
+@dataclass(frozen=True, slots=True)
+class CachedAnswer:
+    """A cached response and how it was matched."""
+
+    answer: str
+    sources: list[dict[str, Any]] = field(default_factory=list)
+    confidence: float = 0.0
+    similarity: float = 1.0
+    match: str = "exact"  # "exact" or "semantic"
+
+
+class SemanticCache:
+    """Two-tier (exact + semantic) answer cache backed by Redis and Qdrant."""
+
+    VERSION_KEY = "kb:version"
+    EXACT_PREFIX = "semcache:"
+
+    def __init__(self, qdrant: AsyncQdrantClient, client: redis.Redis, settings: Settings):
+        self.qdrant = qdrant
+        self.redis = client
+        self.settings = settings
+        self.collection = settings.semantic_cache_collection
+
+    async def kb_version(self) -> int:
+        """Current knowledge base version (cached in-process briefly)."""
+        return await current_kb_version(self.redis, self.settings)
+
+    async def get_exact(self, question: str, language: str, category: str) -> CachedAnswer | None:
+        """
+        Look up a verbatim (normalized) repeat of a question.
+
+        Args:
+            question: Customer question.
+            language: Detected language code.
+            category: Enquiry category.
+
+        Returns:
+            CachedAnswer | None: Cached answer, or None on a miss.
+        """
+        key = self._exact_key(await self.kb_version(), question, language, category)
+        raw = await self.redis.get(key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return CachedAnswer(data["answer"], data["sources"], data["confidence"])
+
+    async def get_similar(
+        self,
+        vector: list[float],
+        language: str,
+        category: str,
+    ) -> CachedAnswer | None:
+        """
+        Look up the closest previously answered question.
+
+        Args:
+            vector: Query embedding.
+            language: Detected language code.
+            category: Enquiry category.
+
+        Returns:
+            CachedAnswer | None: Best match above the threshold, or None.
+        """
+        version = await self.kb_version()
+        response = await self.qdrant.query_points(
+            collection_name=self.collection,
+            query=vector,
+            limit=1,
+            query_filter=self._scope(version, language, category),
+            score_threshold=self.settings.semantic_cache_threshold,
+            with_payload=["answer", "sources", "confidence"],
+        )
+        if not response.points:
+            return None
+        point = response.points[0]
+        return CachedAnswer(
+            answer=point.payload["answer"],
+            sources=point.payload.get("sources", []),
+            confidence=point.payload.get("confidence", 0.0),
+            similarity=point.score,
+            match="semantic",
+        )
+
+    async def store(
+        self,
+        question: str,
+        vector: list[float] | None,
+        answer: str,
+        sources: list[dict[str, Any]],
+        confidence: float,
+        language: str,
+        category: str,
+    ) -> None:
+        """
+        Cache an answer under both the exact and the semantic tier.
+
+        Entries are keyed on the question alone, so only answers that do not
+        depend on a conversation's history may be stored.
+
+        Args:
+            question: Customer question.
+            vector: Query embedding (semantic tier skipped when None).
+            answer: Response content.
+            sources: Citations as plain dicts.
+            confidence: Response confidence.
+            language: Detected language code.
+            category: Enquiry category.
+        """
+        version = await self.kb_version()
+        entry = {"answer": answer, "sources": sources, "confidence": confidence}
+        await self.redis.set(
+            self._exact_key(version, question, language, category),
+            json.dumps(entry, ensure_ascii=False),
+            ex=self.settings.semantic_cache_ttl_seconds,
+        )
+        if vector is None:
+            return
+
+        await self._ensure_collection(len(vector))
+        await self.qdrant.upsert(
+            collection_name=self.collection,
+            points=[
+                models.PointStruct(
+                    id=str(uuid.uuid5(uuid.NAMESPACE_URL, self._exact_key(version, question, language, category))),
+                    vector=vector,
+                    payload={
+                        **entry,
+                        "question": normalize_question(question),
+                        "language": language,
+                        "category": category,
+                        "kb_version": version,
+                        "created_at": time.time(),
+                    },
+                )
+            ],
+            wait=False,
+        )
+
+    async def invalidate(self) -> int:
+        """
+        Invalidate every cached answer after a knowledge base change.
+
+        Returns:
+            int: The new KB version.
+        """
+        global _kb_version
+        version = int(await self.redis.incr(self.VERSION_KEY))
+        _kb_version = (version, time.monotonic() + self.settings.semantic_cache_version_refresh_seconds)
+        logger.info("Semantic cache invalidated", kb_version=version)
+
+        try:
+            await self.qdrant.delete(
+                collection_name=self.collection,
+                points_selector=models.FilterSelector(
+                    filter=models.Filter(
+                        must=[models.FieldCondition(key="kb_version", range=models.Range(lt=version))]
+                    )
+                ),
+                wait=False,
+            )
+        except Exception as e:
+            # Entries of older versions are unreachable anyway; only space is wasted
+            logger.warning("Semantic cache cleanup failed", error=str(e))
+        return version
+
+    def _scope(self, version: int, language: str, category: str) -> models.Filter:
+        min_created_at = time.time() - self.settings.semantic_cache_ttl_seconds
+        return models.Filter(
+            must=[
+                models.FieldCondition(key="kb_version", match=models.MatchValue(value=version)),
+                models.FieldCondition(key="language", match=models.MatchValue(value=language)),
+                models.FieldCondition(key="category", match=models.MatchValue(value=category)),
+                models.FieldCondition(key="created_at", range=models.Range(gte=min_created_at)),
+            ]
+        )
+
+    def _exact_key(self, version: int, question: str, language: str, category: str) -> str:
+        digest = hashlib.blake2b(
+            f"{language}\x00{category}\x00{normalize_question(question)}".encode(),
+            digest_size=16,
+        ).hexdigest()
+        return f"{self.EXACT_PREFIX}{version}:{digest}"
+
+    async def _ensure_collection(self, vector_size: int) -> None:
+        if self.collection in _collections_ready:
+            return
+        if not await self.qdrant.collection_exists(self.collection):
+            try:
+                await self.qdrant.create_collection(
+                    collection_name=self.collection,
+                    vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                )
+            except Exception:
+                # Another worker may have created it first
+                if not await self.qdrant.collection_exists(self.collection):
+                    raise
+            for key, schema in (
+                ("language", models.PayloadSchemaType.KEYWORD),
+                ("category", models.PayloadSchemaType.KEYWORD),
+                ("kb_version", models.PayloadSchemaType.INTEGER),
+                ("created_at", models.PayloadSchemaType.FLOAT),
+            ):
+                await self.qdrant.create_payload_index(self.collection, field_name=key, field_schema=schema)
+        _collections_ready.add(self.collection)
@@ -0,0 +1,5 @@
+"""
+Services Package
+
+Business logic services shared by the API routes.
+"""
@@ -0,0 +1,491 @@
+"""
+Chat Pipeline
+
+Prepares everything the agent needs to answer a chat message. Session
+lookup, history load, language detection and retrieval are independent, so
+they run concurrently under the request's latency budget; reranking only
+runs when enough of it is left to keep the generation reserve. Generation
+itself is bounded by the response timeout, not the budget. Repeated
+questions are answered from the semantic response cache before any of that,
+and identical questions arriving together from sessions without history yet
+share a single computation.
+"""
+
+import asyncio
+import hashlib
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+from dataclasses import asdict, dataclass, field
+from typing import Any
+from uuid import UUID
+
+import redis.asyncio as redis
+from qdrant_client import AsyncQdrantClient
+
+from app.agent.generator import ResponseGenerator
+from app.config import Settings
+from app.memory.short_term import ShortTermMemory
+from app.rag.retriever import RetrievedChunk, Retriever
+from app.rag.semantic_cache import CachedAnswer, SemanticCache, current_kb_version, normalize_question
+from app.services.pipeline import Deadline, PipelineExecutor
+from app.services.single_flight import SharedStream, SingleFlight
+
+FALLBACK_ANSWER = (
+    "Sorry, I'm having trouble answering right now. "
+    "A member of the {business_name} team will follow up with you shortly."
+)
+
+class GenerationTimeout(Exception):
+    """The model did not finish its answer within ``response_timeout_seconds``."""
+
+
+_HAN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")
+_TAMIL = re.compile(r"[\u0b80-\u0bff]")
+_MALAY_MARKERS = re.compile(
+    r"\b(?:saya|boleh|berapa|terima kasih|selamat|tidak|ada|mahu|harga|bila)\b",
+    re.IGNORECASE,
+)
+
+
+def detect_language(text: str) -> str:
+    """Cheap script-based language guess (en, zh, ms or ta)."""
+    if _HAN.search(text):
+        return "zh"
+    if _TAMIL.search(text):
+        return "ta"
+    if len(_MALAY_MARKERS.findall(text)) >= 2:
+        return "ms"
+    return "en"
+
+
+@dataclass
+class ChatContext:
+    """Inputs gathered for answering one chat message."""
+
+    session_id: UUID
+    session: dict[str, str]
+    history: list[dict[str, Any]]
+    language: str
+    chunks: list[RetrievedChunk]
+    executor: PipelineExecutor
+    category: str = "general"
+    vector: list[float] | None = None
+    cached: CachedAnswer | None = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ChatAnswer:
+    """Session-independent part of a chat response (shareable between requests)."""
+
+    content: str
+    confidence: float
+    language: str
+    sources: list[dict[str, Any]] = field(default_factory=list)
+    requires_followup: bool = False
+    cache_hit: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ChatAnswer":
+        return cls(**data)
+
+
+class ChatPipeline:
+    """
+    Pre-generation stages of the chat agent, executed under a deadline.
+
+    Degradation rules when the budget runs low:
+    - history falls back to the copy this process last loaded
+    - retrieval returns no chunks
+    - reranking is skipped and vector order is kept
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis_client: redis.Redis,
+        qdrant: AsyncQdrantClient,
+        deadline: Deadline | None = None,
+    ):
+        self.settings = settings
+        self.memory = ShortTermMemory(
+            redis_client,
+            ttl_seconds=settings.session_ttl_seconds,
+            max_messages=settings.max_messages_before_summary,
+        )
+        self.retriever = Retriever(qdrant, settings)
+        self.generator = ResponseGenerator(settings)
+        self.cache = SemanticCache(qdrant, redis_client, settings) if settings.semantic_cache_enabled else None
+        self.deadline = deadline or Deadline(settings.chat_latency_budget_ms)
+        self.executor = PipelineExecutor(self.deadline)
+        self.redis = redis_client
+        # A leader may spend the whole budget preparing, then generate until the response timeout
+        self.single_flight = SingleFlight(
+            redis_client,
+            lock_ttl_ms=settings.chat_latency_budget_ms + settings.response_timeout_seconds * 1000,
+        )
+
+    async def answer(self, session_id: UUID, message: str, category: str = "general") -> tuple[ChatAnswer, bool]:
+        """
+        Answer a message, sharing the work with identical in-flight requests.
+
+        Concurrent requests with the same normalized message, language,
+        category and KB version (in any worker) await one computation. Only
+        context-free requests (no conversation history yet) are coalesced,
+        so an answer built from one customer's conversation is never handed
+        to another.
+
+        Args:
+            session_id: Session identifier.
+            message: User message.
+            category: Enquiry category.
+
+        Returns:
+            tuple: (answer, whether it was shared from another request).
+        """
+        history, key = await self._flight(session_id, message, category)
+
+        async def compute() -> dict[str, Any]:
+            context = await self.prepare(session_id, message, category, history=history)
+            return (await self.generate(context, message)).to_dict()
+
+        if key is None:
+            return ChatAnswer.from_dict(await compute()), False
+        result, shared = await self.single_flight.do(key, compute, wait_timeout=self._flight_wait_seconds)
+        return ChatAnswer.from_dict(result), shared
+
+    async def answer_stream(self, session_id: UUID, message: str, category: str = "general") -> SharedStream:
+        """
+        Stream an answer, sharing the stream with identical in-flight requests.
+
+        Coalesces like ``answer``. Followers receive the leader's deltas
+        (including any sent before they joined) as they are generated.
+
+        Args:
+            session_id: Session identifier.
+            message: User message.
+            category: Enquiry category.
+
+        Returns:
+            SharedStream: Text deltas; afterwards ``result`` is the
+            ``ChatAnswer`` dict and ``shared`` whether it came from another request.
+        """
+        history, key = await self._flight(session_id, message, category)
+
+        async def compute(emit: Callable[[str], Awaitable[None]]) -> dict[str, Any]:
+            context = await self.prepare(session_id, message, category, history=history)
+            parts: list[str] = []
+            async for delta in self.stream(context, message):
+                parts.append(delta)
+                await emit(delta)
+            return (await self.finish(context, message, "".join(parts))).to_dict()
+
+        return self.single_flight.stream(key, compute, wait_timeout=self._flight_wait_seconds)
+
+    @property
+    def _flight_wait_seconds(self) -> float:
+        """How long followers wait for a leader: as long as it may hold the lock."""
+        return self.single_flight.lock_ttl_ms / 1000
+
+    async def _flight(
+        self, session_id: UUID, message: str, category: str
+    ) -> tuple[list[dict[str, Any]] | None, str | None]:
+        """Preloaded history and the flight key (None when the request must not be shared)."""
+        if not self.settings.single_flight_enabled:
+            return None, None
+        history, key = await asyncio.gather(
+            self.load_history(session_id),
+            self.executor.run(
+                "flight_key",
+                lambda: self.flight_key(message, category),
+                timeout_ms=self.settings.memory_timeout_ms,
+            ),
+        )
+        return history, None if history else key
+
+    async def flight_key(self, message: str, category: str) -> str:
+        """Coalescing key for context-free requests: normalized message, language, category and KB version."""
+        version = await current_kb_version(self.redis, self.settings)
+        digest = hashlib.blake2b(
+            f"{detect_language(message)}\x00{category}\x00{normalize_question(message)}".encode(),
+            digest_size=16,
+        ).hexdigest()
+        return f"chat:{version}:{digest}"
+
+    async def load_history(self, session_id: UUID) -> list[dict[str, Any]]:
+        """Recent turns of a session (this process's last copy when Redis is slow)."""
+        sid = str(session_id)
+        return await self.executor.run(
+            "history",
+            lambda: self.memory.load_history(sid),
+            fallback=lambda: self.memory.cached_history(sid),
+            timeout_ms=self.settings.memory_timeout_ms,
+        )
+
+    async def prepare(
+        self,
+        session_id: UUID,
+        message: str,
+        category: str = "general",
+        history: list[dict[str, Any]] | None = None,
+    ) -> ChatContext:
+        """
+        Gather session, history, language and knowledge for a message.
+
+        When the response cache holds an answer, the returned context has
+        ``cached`` set and the remaining stages are skipped. Cached answers
+        are context-free, so they are only served to sessions without
+        history. Session, history, exact cache lookup, embedding and
+        retrieval all start at once; an exact cache hit cancels the rest.
+
+        Args:
+            session_id: Session identifier.
+            message: User message.
+            category: Enquiry category scoping the response cache.
+            history: Recent turns already loaded by the caller (loaded here when None).
+
+        Returns:
+            ChatContext: Gathered inputs plus the executor holding stage timings.
+        """
+        settings = self.settings
+        executor = self.executor
+        sid = str(session_id)
+
+        async def language() -> str:
+            return detect_language(message)
+
+        lang = await executor.run("language", language, fallback=lambda: "en")
+        context = ChatContext(
+            session_id=session_id,
+            session={},
+            history=[],
+            language=lang,
+            chunks=[],
+            executor=executor,
+            category=category,
+        )
+
+        async def recent_history() -> list[dict[str, Any]]:
+            return history if history is not None else await self.load_history(session_id)
+
+        async def exact_match() -> CachedAnswer | None:
+            if self.cache is None or history:
+                return None
+            return await executor.run(
+                "cache_exact",
+                lambda: self.cache.get_exact(message, lang, category),
+                timeout_ms=settings.memory_timeout_ms,
+            )
+
+        semantic: CachedAnswer | None = None
+
+        async def retrieve() -> list[RetrievedChunk]:
+            nonlocal semantic
+            context.vector = await self.retriever.embed(message)
+            # Shielded: a retrieval timeout must not cancel the shared history load
+            if self.cache is not None and not await asyncio.shield(history_task):
+                semantic = await executor.run(
+                    "cache_semantic",
+                    lambda: self.cache.get_similar(context.vector, lang, category),
+                    timeout_ms=settings.memory_timeout_ms,
+                )
+                if semantic is not None:
+                    return []
+            return await self.retriever.search(context.vector)
+
+        retrieval_budget_ms = min(
+            settings.retrieval_timeout_ms,
+            self.deadline.remaining_ms - settings.generation_reserve_ms,
+        )
+        # Everything starts now; embedding and retrieval only wait for the
+        # history when the semantic cache needs it
+        history_task = asyncio.create_task(recent_history())
+        session_task = asyncio.create_task(executor.run(
+            "session",
+            lambda: self.memory.load_session(sid),
+            fallback=dict,
+            timeout_ms=settings.memory_timeout_ms,
+        ))
+        retrieval_task = asyncio.create_task(
+            executor.run("retrieval", retrieve, fallback=list, timeout_ms=max(0.0, retrieval_budget_ms))
+        )
+        tasks = (history_task, session_task, retrieval_task)
+        try:
+            context.history, cached = await asyncio.gather(history_task, exact_match())
+            if cached is not None and not context.history:
+                context.cached = cached
+                return context
+            session, candidates = await asyncio.gather(session_task, retrieval_task)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        context.cached = semantic
+
+        top_k = settings.rag_top_k_rerank
+        if context.cached is not None:
+            chunks = []
+        elif candidates and self.deadline.allows(settings.generation_reserve_ms + settings.rerank_timeout_ms):
+            chunks = await executor.run(
+                "rerank",
+                lambda: self.retriever.rerank(message, candidates, top_k),
+                fallback=lambda: candidates[:top_k],
+                timeout_ms=settings.rerank_timeout_ms,
+            )
+        else:
+            executor.skip("rerank")
+            chunks = candidates[:top_k]
+
+        context.session = session
+        context.chunks = chunks
+        return context
+
+    async def stream(self, context: ChatContext, message: str) -> AsyncIterator[str]:
+        """
+        Stream answer text deltas for a prepared context.
+
+        Cached answers are yielded whole; otherwise deltas come straight
+        from the model. The whole generation must finish within
+        ``response_timeout_seconds``, or ``GenerationTimeout`` is raised.
+        """
+        if context.cached is not None:
+            yield context.cached.answer
+            return
+        timeout = self.settings.response_timeout_seconds
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + timeout
+        deltas = self.generator.stream(message, context.chunks, context.history, context.language)
+        async with aclosing(deltas):
+            while True:
+                try:
+                    delta = await asyncio.wait_for(anext(deltas), max(0.0, expires_at - loop.time()))
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise GenerationTimeout(f"generation did not finish within {timeout}s") from None
+                yield delta
+
+    async def finish(self, context: ChatContext, message: str, content: str) -> ChatAnswer:
+        """
+        Wrap generated text into an answer and cache it when it qualifies.
+
+        Confidence is the best retrieval score; answers below
+        ``confidence_threshold`` are flagged for human follow-up.
+        """
+        if context.cached is not None:
+            return ChatAnswer(
+                content=context.cached.answer,
+                confidence=context.cached.confidence,
+                language=context.language,
+                sources=context.cached.sources,
+                cache_hit=context.cached.match,
+            )
+
+        sources = [_to_source(chunk) for chunk in context.chunks]
+        confidence = max((source["relevance_score"] for source in sources), default=0.0)
+        answer = ChatAnswer(
+            content=content,
+            confidence=confidence,
+            language=context.language,
+            sources=sources,
+            requires_followup=confidence < self.settings.confidence_threshold,
+        )
+        await self.store_answer(context, message, answer.content, answer.sources, answer.confidence)
+        return answer
+
+    async def generate(self, context: ChatContext, message: str) -> ChatAnswer:
+        """
+        Produce the complete answer for a prepared context.
+
+        Generation has its own deadline (``response_timeout_seconds``) rather
+        than whatever is left of the request budget, so a slow but valid
+        completion is kept. If it fails or times out, the customer is
+        offered a human follow-up instead.
+        """
+        async def collect() -> str:
+            return "".join([delta async for delta in self.stream(context, message)])
+
+        content = await self.executor.run(
+            "generation",
+            collect,
+            timeout_ms=self.settings.response_timeout_seconds * 1000,
+            ignore_deadline=True,
+        )
+        if content is None:
+            return ChatAnswer(
+                content=FALLBACK_ANSWER.format(business_name=self.settings.business_name),
+                confidence=0.0,
+                language=context.language,
+                requires_followup=True,
+            )
+        return await self.finish(context, message, content)
+
+    async def remember(
+        self,
+        session_id: UUID,
+        language: str,
+        message: str,
+        reply: str,
+        **session_fields: str,
+    ) -> None:
+        """Store the exchange in short-term memory (even when the budget is spent)."""
+        await self.executor.run(
+            "memory_write",
+            lambda: self.memory.append(
+                str(session_id),
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": reply},
+                language=language,
+                **session_fields,
+            ),
+            timeout_ms=self.settings.memory_timeout_ms * 4,
+            ignore_deadline=True,
+        )
+
+    async def store_answer(
+        self,
+        context: ChatContext,
+        message: str,
+        answer: str,
+        sources: list[dict[str, Any]],
+        confidence: float,
+    ) -> None:
+        """
+        Cache a freshly generated answer for repeats of the question.
+
+        Only grounded answers (with sources) at or above the escalation
+        confidence threshold are cached. Answers generated with conversation
+        history are never cached: entries are keyed on the question alone,
+        and such an answer may depend on (and repeat) another customer's
+        conversation.
+        """
+        if (
+            self.cache is None
+            or context.cached is not None
+            or context.history
+            or not sources
+            or confidence < self.settings.confidence_threshold
+        ):
+            return
+        await self.executor.run(
+            "cache_store",
+            lambda: self.cache.store(
+                message, context.vector, answer, sources, confidence, context.language, context.category
+            ),
+            timeout_ms=self.settings.memory_timeout_ms * 4,
+            ignore_deadline=True,
+        )
+
+
+def _to_source(chunk: RetrievedChunk) -> dict[str, Any]:
+    """Citation fields for a retrieved chunk (see ``SourceCitation``)."""
+    return {
+        "source": chunk.source,
+        "chunk_id": chunk.chunk_id,
+        "relevance_score": min(1.0, max(0.0, chunk.score)),
+        "text_preview": chunk.text[:200],
+    }
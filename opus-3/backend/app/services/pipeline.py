@@ -0,0 +1,145 @@
+"""
+Request Pipeline Executor
+
+Runs request stages concurrently under a shared per-request latency budget,
+records real stage timings, and falls back to degraded results when a stage
+is slow or fails instead of failing the whole request.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+import structlog
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """Monotonic latency budget for a single request."""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self._started_at = time.perf_counter()
+        self._expires_at = self._started_at + budget_ms / 1000
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the request started."""
+        return (time.perf_counter() - self._started_at) * 1000
+
+    @property
+    def remaining_ms(self) -> float:
+        """Milliseconds left in the budget (never negative)."""
+        return max(0.0, (self._expires_at - time.perf_counter()) * 1000)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining_ms <= 0
+
+    def allows(self, needed_ms: float) -> bool:
+        """Whether at least ``needed_ms`` of budget remains."""
+        return self.remaining_ms >= needed_ms
+
+
+@dataclass(frozen=True, slots=True)
+class StageTiming:
+    """Outcome of one pipeline stage."""
+
+    name: str
+    duration_ms: float
+    status: str  # "ok", "timeout", "error" or "skipped"
+
+    @property
+    def degraded(self) -> bool:
+        return self.status != "ok"
+
+
+class PipelineExecutor:
+    """
+    Executes pipeline stages against a request deadline.
+
+    Each stage is bounded by the remaining budget (and an optional per-stage
+    cap). A stage that times out or raises returns its fallback instead, so
+    independent stages can be gathered with ``asyncio.gather`` without one
+    slow dependency failing the request.
+    """
+
+    def __init__(self, deadline: Deadline):
+        self.deadline = deadline
+        self.timings: list[StageTiming] = []
+
+    async def run(
+        self,
+        name: str,
+        stage: Callable[[], Awaitable[T]],
+        fallback: Callable[[], T] | None = None,
+        timeout_ms: float | None = None,
+        ignore_deadline: bool = False,
+    ) -> T | None:
+        """
+        Run a stage within the remaining budget.
+
+        Args:
+            name: Stage name used in timings and logs.
+            stage: Zero-argument coroutine function performing the stage.
+            fallback: Produces the degraded result on timeout or error.
+            timeout_ms: Optional cap tighter than the remaining budget.
+            ignore_deadline: Bound the stage by ``timeout_ms`` only (for work
+                that must happen even after the budget is spent).
+
+        Returns:
+            The stage result, or the fallback result when degraded.
+        """
+        budget_ms = float("inf") if ignore_deadline else self.deadline.remaining_ms
+        if timeout_ms is not None:
+            budget_ms = min(budget_ms, timeout_ms)
+        if budget_ms <= 0:
+            self.skip(name)
+            return fallback() if fallback else None
+
+        started_at = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(stage(), budget_ms / 1000)
+        except asyncio.TimeoutError:
+            self._record(name, started_at, "timeout")
+            logger.warning("Pipeline stage timed out", stage=name, budget_ms=round(budget_ms, 1))
+        except Exception as e:
+            self._record(name, started_at, "error")
+            logger.warning("Pipeline stage failed", stage=name, error=str(e))
+        else:
+            self._record(name, started_at, "ok")
+            return result
+        return fallback() if fallback else None
+
+    def skip(self, name: str) -> None:
+        """Record a stage that was deliberately not run."""
+        self.timings.append(StageTiming(name, 0.0, "skipped"))
+
+    @property
+    def degraded(self) -> list[str]:
+        """Names of stages that did not complete normally."""
+        return [timing.name for timing in self.timings if timing.degraded]
+
+    def timings_ms(self) -> dict[str, float]:
+        """Stage durations in milliseconds, keyed by stage name."""
+        return {timing.name: round(timing.duration_ms, 2) for timing in self.timings}
+
+    def server_timing(self) -> str:
+        """Stage timings formatted as a ``Server-Timing`` header value."""
+        entries = []
+        for timing in self.timings:
+            entry = f"{timing.name};dur={timing.duration_ms:.1f}"
+            if timing.degraded:
+                entry += f';desc="{timing.status}"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.deadline.elapsed_ms:.1f}")
+        return ", ".join(entries)
+
+    def _record(self, name: str, started_at: float, status: str) -> None:
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        self.timings.append(StageTiming(name, duration_ms, status))
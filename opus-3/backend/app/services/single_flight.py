@@ -0,0 +1,471 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent identical computations share one execution. Within a worker,
+duplicates await the same future; across workers, the first caller takes a
+Redis lock and publishes its result on a pub/sub channel that the others
+wait on. If the leader fails or runs out of time, waiters compute the
+result themselves, so coalescing never turns one failure into many.
+
+Streamed computations are shared the same way, delta by delta: the leader
+appends each delta to a log that every caller in its worker reads from,
+and to a Redis list plus pub/sub channel that followers in other workers
+replay and then tail. Late joiners therefore still receive the whole text.
+Followers in other workers are invisible to the leader, so once it holds
+the lock its generation keeps running (for at most the lock TTL) even when
+every local reader has gone.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+from typing import Any
+
+import redis.asyncio as redis
+import structlog
+
+logger = structlog.get_logger()
+
+# Release the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# In-flight computations of this worker, keyed by flight key
+_local_flights: dict[str, asyncio.Future] = {}
+
+# In-flight streamed computations of this worker, keyed by flight key
+_local_streams: dict[str, "_Broadcast"] = {}
+
+Emit = Callable[[str], Awaitable[None]]
+
+
+class StreamAborted(Exception):
+    """A shared stream failed after part of it had been delivered."""
+
+
+class _Broadcast:
+    """Append-only delta log of one stream, followed by any number of readers."""
+
+    def __init__(self) -> None:
+        self.deltas: list[str] = []
+        self.result: dict[str, Any] | None = None
+        self.error: Exception | None = None
+        self.done = False
+        self.from_remote = False
+        self.publishing = False  # deltas go to followers in other workers
+        self.readers = 0
+        self.pump: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    def append(self, delta: str) -> None:
+        self.deltas.append(delta)
+        self._notify()
+
+    def close(self, result: dict[str, Any] | None) -> None:
+        if not self.done:
+            self.result = result
+            self.done = True
+            self._notify()
+
+    async def changed(self) -> None:
+        await self._changed.wait()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def read(self) -> AsyncIterator[str]:
+        """Every delta from the start; stops the producer when the last reader leaves early,
+        unless it is publishing to other workers."""
+        self.readers += 1
+        seen = 0
+        try:
+            while True:
+                if seen < len(self.deltas):
+                    seen += 1
+                    yield self.deltas[seen - 1]
+                elif self.done:
+                    return
+                else:
+                    await self.changed()
+        finally:
+            self.readers -= 1
+            if self.readers == 0 and not self.publishing:
+                self.stop()
+
+    def stop(self) -> None:
+        """Cancel the producer if it is still running."""
+        if not self.done and self.pump is not None:
+            self.pump.cancel()
+
+
+class SharedStream:
+    """
+    Text deltas of a coalesced streamed computation.
+
+    Iterate for the deltas; once exhausted, ``result`` holds a copy of the
+    final result dict and ``shared`` whether it came from another caller.
+    Close it (``aclose``) when abandoning the iteration early.
+    """
+
+    def __init__(
+        self,
+        flight: "SingleFlight",
+        key: str | None,
+        compute: Callable[[Emit], Awaitable[dict[str, Any]]],
+        wait_timeout: float,
+    ):
+        self._flight = flight
+        self._key = key
+        self._compute = compute
+        self._wait_timeout = wait_timeout
+        self._iterator: AsyncIterator[str] | None = None
+        self.result: dict[str, Any] | None = None
+        self.shared = False
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+
+    async def aclose(self) -> None:
+        if self._iterator is not None:
+            await self._iterator.aclose()
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        flight = self._flight
+        key = self._key
+        broadcast = _local_streams.get(key) if key is not None else None
+        follower = broadcast is not None
+        if broadcast is None:
+            broadcast = _Broadcast()
+            if key is None:
+                run = flight._produce(broadcast, self._compute)
+            else:
+                _local_streams[key] = broadcast
+                run = flight._run_stream(key, broadcast, self._compute, self._wait_timeout)
+            broadcast.pump = asyncio.create_task(flight._pump(broadcast, run, key))
+
+        seen = 0
+        async with aclosing(broadcast.read()) as deltas:
+            async for delta in deltas:
+                seen += 1
+                yield delta
+
+        if broadcast.result is not None:
+            self.result = _copy(broadcast.result)
+            self.shared = follower or broadcast.from_remote
+            return
+        if broadcast.error is not None and not follower:
+            raise broadcast.error
+        if seen:
+            raise StreamAborted("shared stream ended before completing")
+
+        # The flight failed before any text arrived: compute privately
+        logger.info("Single-flight stream did not deliver, computing locally", key=key)
+        private = _Broadcast()
+        private.pump = asyncio.create_task(flight._pump(private, flight._produce(private, self._compute)))
+        async with aclosing(private.read()) as deltas:
+            async for delta in deltas:
+                yield delta
+        if private.error is not None:
+            raise private.error
+        self.result = private.result
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight computations in-process and across workers.
+
+    Results must be JSON-serializable dicts; each caller gets its own copy.
+    """
+
+    LOCK_PREFIX = "inflight:lock:"
+    RESULT_PREFIX = "inflight:result:"
+    CHANNEL_PREFIX = "inflight:done:"
+    DELTAS_PREFIX = "inflight:deltas:"
+    DELTA_CHANNEL_PREFIX = "inflight:delta:"
+
+    def __init__(self, client: redis.Redis, lock_ttl_ms: int, result_ttl_seconds: int = 5):
+        self.redis = client
+        self.lock_ttl_ms = lock_ttl_ms
+        self.result_ttl_seconds = result_ttl_seconds
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+        wait_timeout: float,
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Run ``compute`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Flight key identifying identical computations.
+            compute: Zero-argument coroutine function producing the result.
+            wait_timeout: Seconds a follower waits before computing itself.
+
+        Returns:
+            tuple: (result copy, whether it was shared from another caller).
+        """
+        flight = _local_flights.get(key)
+        if flight is not None:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(flight), wait_timeout)
+            except asyncio.TimeoutError:
+                result = None
+            if result is not None:
+                return _copy(result), True
+            return await compute(), False
+
+        # Resolves to None when the leader fails, so local waiters compute themselves
+        flight = asyncio.get_running_loop().create_future()
+        _local_flights[key] = flight
+        result = None
+        try:
+            result, shared = await self._do_distributed(key, compute, wait_timeout)
+            return _copy(result), shared
+        finally:
+            _local_flights.pop(key, None)
+            flight.set_result(result)
+
+    def stream(
+        self,
+        key: str | None,
+        compute: Callable[[Emit], Awaitable[dict[str, Any]]],
+        wait_timeout: float,
+    ) -> SharedStream:
+        """
+        Share a streamed computation between concurrent callers with the same key.
+
+        ``compute`` is called with an ``emit`` coroutine for each text delta
+        and returns the final result. Callers that join late replay the
+        deltas produced so far. If the leader fails before producing any
+        text, followers compute themselves; if it fails midway they raise
+        ``StreamAborted``.
+
+        Args:
+            key: Flight key identifying identical computations (None: do not share).
+            compute: Coroutine function taking ``emit`` and producing the result.
+            wait_timeout: Seconds a follower in another worker waits for the
+                leader's next event before giving up on it.
+
+        Returns:
+            SharedStream: Async iterator of deltas, then ``result``/``shared``.
+        """
+        return SharedStream(self, key, compute, wait_timeout)
+
+    async def _pump(
+        self,
+        broadcast: _Broadcast,
+        run: Awaitable[dict[str, Any] | None],
+        key: str | None = None,
+    ) -> None:
+        try:
+            broadcast.close(await run)
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            broadcast.close(None)
+            if key is not None and _local_streams.get(key) is broadcast:
+                del _local_streams[key]
+
+    async def _produce(
+        self,
+        broadcast: _Broadcast,
+        compute: Callable[[Emit], Awaitable[dict[str, Any]]],
+        publish: Emit | None = None,
+    ) -> dict[str, Any]:
+        async def emit(delta: str) -> None:
+            broadcast.append(delta)
+            if publish is not None:
+                await publish(delta)
+
+        return await compute(emit)
+
+    async def _run_stream(
+        self,
+        key: str,
+        broadcast: _Broadcast,
+        compute: Callable[[Emit], Awaitable[dict[str, Any]]],
+        wait_timeout: float,
+    ) -> dict[str, Any] | None:
+        token = uuid.uuid4().hex
+        lock_key = f"{self.LOCK_PREFIX}{key}"
+        try:
+            leader = await self.redis.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except Exception as e:
+            logger.warning("Single-flight lock unavailable", error=str(e))
+            return await self._produce(broadcast, compute)
+
+        if not leader:
+            broadcast.from_remote = True
+            return await self._follow_stream(key, broadcast, wait_timeout)
+
+        deltas_key = f"{self.DELTAS_PREFIX}{key}"
+        channel = f"{self.DELTA_CHANNEL_PREFIX}{key}"
+        broadcast.publishing = True
+
+        async def publish(delta: str) -> None:
+            if not broadcast.publishing:
+                return
+            event = json.dumps({"seq": len(broadcast.deltas) - 1, "delta": delta}, ensure_ascii=False)
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.rpush(deltas_key, delta)
+                pipe.pexpire(deltas_key, self.lock_ttl_ms)
+                pipe.publish(channel, event)
+                await pipe.execute()
+            except Exception as e:
+                # Remote followers time out and fall back; local readers are unaffected
+                broadcast.publishing = False
+                logger.warning("Single-flight delta publish failed", error=str(e))
+                if broadcast.readers == 0:
+                    broadcast.stop()
+
+        async def produce() -> dict[str, Any]:
+            # Followers elsewhere stop trusting the flight once the lock expires
+            return await asyncio.wait_for(
+                self._produce(broadcast, compute, publish), self.lock_ttl_ms / 1000
+            )
+
+        return await self._lead(key, lock_key, token, produce)
+
+    async def _follow_stream(self, key: str, broadcast: _Broadcast, wait_timeout: float) -> dict[str, Any] | None:
+        pubsub = self.redis.pubsub()
+        done_channel = f"{self.CHANNEL_PREFIX}{key}"
+        try:
+            # Subscribe before reading the backlog so no delta falls in between;
+            # deltas seen in both are told apart by sequence number
+            await pubsub.subscribe(f"{self.DELTA_CHANNEL_PREFIX}{key}", done_channel)
+            for delta in await self.redis.lrange(f"{self.DELTAS_PREFIX}{key}", 0, -1):
+                broadcast.append(delta)
+            raw = await self.redis.get(f"{self.RESULT_PREFIX}{key}")
+            deadline = time.monotonic() + wait_timeout
+            while raw is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is None or message["type"] != "message":
+                    continue
+                if message["channel"] == done_channel:
+                    raw = message["data"]
+                    continue
+                event = json.loads(message["data"])
+                if event["seq"] > len(broadcast.deltas):
+                    logger.warning("Single-flight stream lost deltas", key=key)
+                    return None
+                if event["seq"] == len(broadcast.deltas):
+                    broadcast.append(event["delta"])
+                deadline = time.monotonic() + wait_timeout
+        except Exception as e:
+            logger.warning("Single-flight stream wait failed", error=str(e))
+            return None
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+        outcome = json.loads(raw)
+        return outcome["result"] if outcome.get("ok") else None
+
+    async def _do_distributed(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+        wait_timeout: float,
+    ) -> tuple[dict[str, Any], bool]:
+        token = uuid.uuid4().hex
+        lock_key = f"{self.LOCK_PREFIX}{key}"
+        try:
+            leader = await self.redis.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except Exception as e:
+            logger.warning("Single-flight lock unavailable", error=str(e))
+            return await compute(), False
+
+        if leader:
+            return await self._lead(key, lock_key, token, compute), False
+
+        result = await self._follow(key, wait_timeout)
+        if result is not None:
+            return result, True
+        logger.info("Single-flight leader did not deliver, computing locally", key=key)
+        return await compute(), False
+
+    async def _lead(
+        self,
+        key: str,
+        lock_key: str,
+        token: str,
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        channel = f"{self.CHANNEL_PREFIX}{key}"
+        try:
+            result = await compute()
+        except BaseException:
+            await self._safe_publish(channel, json.dumps({"ok": False}))
+            await self._release(lock_key, token)
+            raise
+
+        payload = json.dumps({"ok": True, "result": result}, ensure_ascii=False, default=str)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(f"{self.RESULT_PREFIX}{key}", payload, ex=self.result_ttl_seconds)
+            pipe.publish(channel, payload)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Single-flight publish failed", error=str(e))
+        await self._release(lock_key, token)
+        return result
+
+    async def _follow(self, key: str, wait_timeout: float) -> dict[str, Any] | None:
+        pubsub = self.redis.pubsub()
+        try:
+            # Subscribe before checking the result key so a completion between
+            # the two cannot be missed
+            await pubsub.subscribe(f"{self.CHANNEL_PREFIX}{key}")
+            raw = await self.redis.get(f"{self.RESULT_PREFIX}{key}")
+            deadline = time.monotonic() + wait_timeout
+            while raw is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is not None and message["type"] == "message":
+                    raw = message["data"]
+        except Exception as e:
+            logger.warning("Single-flight wait failed", error=str(e))
+            return None
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+        outcome = json.loads(raw)
+        return outcome["result"] if outcome.get("ok") else None
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        try:
+            await self.redis.eval(_RELEASE_LOCK, 1, lock_key, token)
+        except Exception as e:
+            logger.warning("Single-flight lock release failed", error=str(e))
+
+    async def _safe_publish(self, channel: str, payload: str) -> None:
+        try:
+            await self.redis.publish(channel, payload)
+        except Exception as e:
+            logger.warning("Single-flight publish failed", error=str(e))
+
+
+def _copy(result: dict[str, Any]) -> dict[str, Any]:
+    return json.loads(json.dumps(result, default=str))
@@ -0,0 +1,136 @@
+"""
+Streamed Reply Coalescing
+
+Model deltas are often only a few characters long; sending one frame per
+delta multiplies per-frame overhead across thousands of sockets. Deltas are
+therefore batched into frames by size or by a short time window. A bounded
+queue between the model stream and the socket provides backpressure: while
+the socket is slow, reading from the model pauses instead of buffering
+without limit, and the next frame carries the backlog.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+
+
+class SlowConsumerError(Exception):
+    """The client did not accept a frame within the send timeout."""
+
+
+@dataclass(frozen=True, slots=True)
+class StreamResult:
+    """Outcome of a coalesced stream."""
+
+    text: str
+    deltas: int
+    frames: int
+
+
+async def stream_coalesced(
+    deltas: AsyncIterator[str],
+    send: Callable[[str], Awaitable[None]],
+    max_chars: int = 64,
+    window_ms: float = 50.0,
+    max_frame_chars: int = 2048,
+    max_pending: int = 256,
+    send_timeout: float = 10.0,
+) -> StreamResult:
+    """
+    Forward text deltas to ``send`` in coalesced frames.
+
+    A frame is sent once it holds ``max_chars`` characters or its first
+    delta has waited ``window_ms``. At most ``max_pending`` deltas are
+    buffered while a send is in progress.
+
+    Args:
+        deltas: Source of text deltas (e.g. an LLM stream).
+        send: Sends one frame of text to the client.
+        max_chars: Frame size that triggers an immediate send.
+        window_ms: Longest time a delta waits for company.
+        max_frame_chars: Upper bound when draining a backlog into one frame.
+        max_pending: Deltas buffered ahead of a slow socket.
+        send_timeout: Seconds a single send may take.
+
+    Returns:
+        StreamResult: Full text plus delta and frame counts.
+
+    Raises:
+        SlowConsumerError: A send exceeded ``send_timeout``.
+    """
+    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=max_pending)
+    errors: list[Exception] = []
+
+    async def read() -> None:
+        try:
+            async for delta in deltas:
+                if delta:
+                    await queue.put(delta)
+        except Exception as e:
+            errors.append(e)
+        await queue.put(None)
+
+    reader = asyncio.create_task(read())
+    window = window_ms / 1000
+    parts: list[str] = []
+    buffer: list[str] = []
+    buffered = 0
+    window_started = 0.0
+    delta_count = 0
+    frame_count = 0
+    ended = False
+
+    async def flush() -> None:
+        nonlocal buffered, frame_count
+        if not buffer:
+            return
+        frame = "".join(buffer)
+        buffer.clear()
+        buffered = 0
+        parts.append(frame)
+        frame_count += 1
+        try:
+            await asyncio.wait_for(send(frame), send_timeout)
+        except asyncio.TimeoutError:
+            raise SlowConsumerError(f"client did not accept a frame within {send_timeout}s")
+
+    def add(delta: str | None) -> None:
+        nonlocal buffered, window_started, delta_count, ended
+        if delta is None:
+            ended = True
+            return
+        if not buffer:
+            window_started = time.monotonic()
+        buffer.append(delta)
+        buffered += len(delta)
+        delta_count += 1
+
+    try:
+        while not ended:
+            if not buffer:
+                add(await queue.get())
+            # Take whatever queued up meanwhile (the backlog after a slow send)
+            while not ended and buffered < max_frame_chars and not queue.empty():
+                add(queue.get_nowait())
+
+            remaining = window_started + window - time.monotonic()
+            if ended or buffered >= max_chars or remaining <= 0:
+                await flush()
+                continue
+            try:
+                add(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                await flush()
+        await flush()
+    finally:
+        if not reader.done():
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+
+    if errors:
+        raise errors[0]
+    return StreamResult("".join(parts), delta_count, frame_count)
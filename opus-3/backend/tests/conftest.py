@@ -0,0 +1,12 @@
+"""
+Shared test configuration.
+
+app.config validates settings on first use, so required values get test
+defaults before any app module reads them.
+"""
+
+import os
+
+os.environ.setdefault("APP_SECRET_KEY", "test-secret-key-that-is-at-least-32-chars")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
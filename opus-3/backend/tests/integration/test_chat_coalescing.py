@@ -0,0 +1,61 @@
+"""
+Chat coalescing integration tests: identical questions share one answer.
+
+Point REDIS_URL at a disposable Redis (default redis://localhost:6379/15);
+the tests are skipped when it is not reachable.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+from qdrant_client import AsyncQdrantClient
+
+from app.config import Settings
+from app.services.chat_pipeline import ChatAnswer, ChatContext, ChatPipeline
+
+pytestmark = pytest.mark.asyncio
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await client.ping()
+    except (redis.RedisError, OSError):
+        pytest.skip(f"Redis is not reachable at {REDIS_URL}")
+    yield client
+    await client.aclose()
+
+
+async def test_followers_wait_for_a_leader_slower_than_the_latency_budget(client, monkeypatch):
+    settings = Settings(chat_latency_budget_ms=500, response_timeout_seconds=5, semantic_cache_enabled=False)
+    qdrant = AsyncQdrantClient(location=":memory:")
+    calls = 0
+
+    async def prepare(self, session_id, message, category="general", history=None):
+        nonlocal calls
+        calls += 1
+        return ChatContext(session_id, {}, [], "en", [], self.executor)
+
+    async def generate(self, context, message):
+        # Longer than the whole pre-generation budget
+        await asyncio.sleep(1.0)
+        return ChatAnswer(content="We open at 9am.", confidence=0.9, language="en")
+
+    monkeypatch.setattr(ChatPipeline, "prepare", prepare)
+    monkeypatch.setattr(ChatPipeline, "generate", generate)
+
+    message = f"What time do you open? {uuid.uuid4().hex}"
+    results = await asyncio.gather(*(
+        ChatPipeline(settings, client, qdrant).answer(uuid.uuid4(), message) for _ in range(5)
+    ))
+
+    assert calls == 1
+    assert [answer.content for answer, _ in results] == ["We open at 9am."] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
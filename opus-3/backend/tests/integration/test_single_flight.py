@@ -0,0 +1,89 @@
+"""
+Single-flight integration tests: shared streams coordinate through a real Redis.
+
+Point REDIS_URL at a disposable Redis (default redis://localhost:6379/15);
+the tests are skipped when it is not reachable. A follower in another
+worker is exercised through ``_follow_stream`` with its own delta log,
+since every stream in this process shares one local registry.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+
+from app.services.single_flight import SingleFlight, _Broadcast
+
+pytestmark = pytest.mark.asyncio
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await client.ping()
+    except (redis.RedisError, OSError):
+        pytest.skip(f"Redis is not reachable at {REDIS_URL}")
+    yield client
+    await client.aclose()
+
+
+async def until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+async def test_leader_disconnect_does_not_abort_remote_follower(client):
+    flight = SingleFlight(client, lock_ttl_ms=5000)
+    key = f"test:{uuid.uuid4().hex}"
+    resume = asyncio.Event()
+    finished = asyncio.Event()
+
+    async def compute(emit):
+        await emit("Our hours ")
+        await resume.wait()
+        await emit("are 9am-6pm.")
+        finished.set()
+        return {"answer": "Our hours are 9am-6pm."}
+
+    leader = flight.stream(key, compute, wait_timeout=5)
+    deltas = aiter(leader)
+    assert await anext(deltas) == "Our hours "
+
+    remote = _Broadcast()
+    follower = asyncio.create_task(flight._follow_stream(key, remote, wait_timeout=5))
+    await until(lambda: remote.deltas == ["Our hours "])
+
+    # The leader's own client goes away mid-answer
+    await leader.aclose()
+    resume.set()
+
+    assert await asyncio.wait_for(follower, 5) == {"answer": "Our hours are 9am-6pm."}
+    assert remote.deltas == ["Our hours ", "are 9am-6pm."]
+    assert finished.is_set()
+
+
+async def test_unshared_stream_stops_when_its_reader_leaves(client):
+    flight = SingleFlight(client, lock_ttl_ms=5000)
+    cancelled = asyncio.Event()
+
+    async def compute(emit):
+        await emit("partial")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {}
+
+    stream = flight.stream(None, compute, wait_timeout=5)
+    assert await anext(aiter(stream)) == "partial"
+    await stream.aclose()
+    await asyncio.wait_for(cancelled.wait(), 2)
@@ -0,0 +1,118 @@
+"""
+Chat pipeline tests: stages fan out concurrently and generation has a deadline.
+"""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+from app.config import Settings
+from app.rag.retriever import RetrievedChunk
+from app.rag.semantic_cache import CachedAnswer
+from app.services.chat_pipeline import ChatContext, ChatPipeline, GenerationTimeout
+
+STAGE_SECONDS = 0.2
+
+
+class FakeCache:
+    def __init__(self, exact: CachedAnswer | None = None):
+        self.exact = exact
+        self.similar_lookups = 0
+
+    async def get_exact(self, message, language, category):
+        return self.exact
+
+    async def get_similar(self, vector, language, category):
+        self.similar_lookups += 1
+        return None
+
+
+@pytest.fixture
+def pipeline(monkeypatch) -> ChatPipeline:
+    settings = Settings(chat_latency_budget_ms=5000, generation_reserve_ms=0, memory_timeout_ms=1000)
+    pipeline = ChatPipeline(settings, None, AsyncQdrantClient(location=":memory:"))
+    pipeline.started = {}
+    pipeline.cancelled = set()
+
+    def stage(name, result, seconds=STAGE_SECONDS):
+        async def run(*args, **kwargs):
+            pipeline.started[name] = time.perf_counter()
+            try:
+                await asyncio.sleep(seconds)
+            except asyncio.CancelledError:
+                pipeline.cancelled.add(name)
+                raise
+            return result
+
+        return run
+
+    chunk = RetrievedChunk(chunk_id="c1", text="We open at 9am.", source="faq.md", score=0.9)
+    monkeypatch.setattr(pipeline.memory, "load_history", stage("history", []))
+    monkeypatch.setattr(pipeline.memory, "load_session", stage("session", {}))
+    monkeypatch.setattr(pipeline.retriever, "embed", stage("embed", [0.1, 0.2]))
+    monkeypatch.setattr(pipeline.retriever, "search", stage("search", [chunk]))
+    monkeypatch.setattr(pipeline.retriever, "rerank", stage("rerank", [chunk]))
+    pipeline.stage = stage
+    return pipeline
+
+
+async def test_embedding_starts_without_waiting_for_history(pipeline):
+    pipeline.cache = FakeCache()
+    started = time.perf_counter()
+
+    context = await pipeline.prepare(uuid.uuid4(), "What time do you open?")
+
+    assert pipeline.started["embed"] - pipeline.started["history"] < STAGE_SECONDS / 2
+    assert pipeline.started["session"] - pipeline.started["history"] < STAGE_SECONDS / 2
+    assert pipeline.cache.similar_lookups == 1
+    assert [chunk.chunk_id for chunk in context.chunks] == ["c1"]
+    # history || (embed -> search) -> rerank, not history -> embed -> search -> rerank
+    assert time.perf_counter() - started < STAGE_SECONDS * 3.5
+
+
+async def test_exact_cache_hit_cancels_retrieval(pipeline, monkeypatch):
+    pipeline.cache = FakeCache(CachedAnswer(answer="We open at 9am.", confidence=0.9))
+    monkeypatch.setattr(pipeline.retriever, "embed", pipeline.stage("embed", [0.1, 0.2], STAGE_SECONDS * 2))
+
+    context = await pipeline.prepare(uuid.uuid4(), "What time do you open?")
+
+    assert context.cached is pipeline.cache.exact
+    assert "embed" in pipeline.cancelled
+    assert "search" not in pipeline.started
+
+
+async def test_semantic_cache_is_skipped_for_sessions_with_history(pipeline):
+    pipeline.cache = FakeCache()
+    history = [{"role": "user", "content": "Hi"}]
+
+    context = await pipeline.prepare(uuid.uuid4(), "What time do you open?", history=history)
+
+    assert context.history == history
+    assert pipeline.cache.similar_lookups == 0
+    assert [chunk.chunk_id for chunk in context.chunks] == ["c1"]
+
+
+async def test_stalled_generation_times_out(pipeline, monkeypatch):
+    pipeline.settings = pipeline.settings.model_copy(update={"response_timeout_seconds": 0.2})
+    closed = asyncio.Event()
+
+    async def stalled(*args, **kwargs):
+        try:
+            yield "We open"
+            await asyncio.Event().wait()
+            yield " at 9am."
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(pipeline.generator, "stream", stalled)
+    context = ChatContext(uuid.uuid4(), {}, [], "en", [], pipeline.executor)
+
+    received = []
+    with pytest.raises(GenerationTimeout):
+        async for delta in pipeline.stream(context, "What time do you open?"):
+            received.append(delta)
+    assert received == ["We open"]
+    assert closed.is_set()
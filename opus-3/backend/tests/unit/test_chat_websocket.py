@@ -0,0 +1,38 @@
+"""
+Chat WebSocket tests: session ids are validated when the socket connects.
+"""
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.routes.chat import router
+from app.dependencies import get_qdrant_client, get_redis_client
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+
+    async def no_client():
+        yield None
+
+    app.dependency_overrides[get_redis_client] = no_client
+    app.dependency_overrides[get_qdrant_client] = lambda: None
+    return TestClient(app)
+
+
+def test_non_uuid_session_id_is_closed_with_policy_violation(client):
+    with client.websocket_connect("/ws/chat/not-a-uuid") as websocket:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
+    assert closed.value.reason == "session_id must be a UUID"
+
+
+def test_uuid_session_id_is_accepted(client):
+    with client.websocket_connect("/ws/chat/6f1c2b0e-8a4e-4a55-9c2e-0d6c1f3b7a10") as websocket:
+        websocket.send_json({"type": "ping"})
+        assert websocket.receive_json() == {"type": "pong"}